@@ -0,0 +1,262 @@
+"""Benchmark end-to-end identifier lookups against replayed responses.
+
+Run with ``python -m benchmarks.lookups``. Every workload resolves all of its
+identifiers concurrently with :func:`wenxian.from_identifier.async_from_identifier`,
+as ``wenxian from`` does, while the shared session is answered by
+:class:`benchmarks.replay.Transport`, or with ``--server`` by a loopback
+:class:`wenxian.testing.MockServer` so that connection handling is measured
+too. Each workload is reported with its
+throughput, the p50/p95/p99 latency of single lookups, the number of lookups
+that returned nothing and the number of throttled requests.
+
+Responses come from a synthetic corpus by default. ``--record FILE`` resolves
+``--identifiers`` against the live services and saves their responses, and
+``--recording FILE`` replays such a capture instead of the corpus.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass
+from itertools import cycle, islice
+from typing import TYPE_CHECKING
+from unittest import mock
+
+from requests.adapters import HTTPAdapter
+from requests_ratelimiter import LimiterAdapter
+
+from benchmarks.replay import KINDS, Recording, Transport, corpus, record
+from wenxian.from_identifier import async_from_identifier
+from wenxian.logger import logger
+from wenxian.testing import Conditions, MockServer
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from benchmarks.replay import Responses
+
+SIZES = (10, 100, 1000)
+"""Default workload sizes. Pass ``--sizes 10 100 1000 10000`` for the full range."""
+
+
+@dataclass
+class Result:
+    """Measurements of one workload."""
+
+    workload: str
+    size: int
+    seconds: float
+    latencies: list[float]
+    missing: int
+    throttled: int
+
+    @property
+    def throughput(self) -> float:
+        """Resolved identifiers per second."""
+        return self.size / self.seconds
+
+    def percentile(self, percent: int) -> float:
+        """Return a latency percentile in seconds."""
+        if len(self.latencies) == 1:
+            return self.latencies[0]
+        return statistics.quantiles(self.latencies, n=100, method="inclusive")[
+            percent - 1
+        ]
+
+
+async def _lookup(identifier: str) -> tuple[float, bool]:
+    """Resolve one identifier and return its latency and whether it was found."""
+    start = time.perf_counter()
+    try:
+        reference = await async_from_identifier(identifier)
+    except Exception:
+        reference = None
+    found = reference is not None and not reference.is_empty()
+    return time.perf_counter() - start, found
+
+
+async def _resolve(identifiers: Sequence[str]) -> list[tuple[float, bool]]:
+    """Resolve identifiers concurrently."""
+    return await asyncio.gather(*(_lookup(identifier) for identifier in identifiers))
+
+
+def run_workload(
+    workload: str,
+    identifiers: Sequence[str],
+    transport: Transport,
+    *,
+    client_limits: bool = False,
+    server: bool = False,
+) -> Result:
+    """Resolve a workload through a replay transport or a loopback server."""
+    transport.statuses.clear()
+    with ExitStack() as stack:
+        if server:
+            stack.enter_context(
+                MockServer(transport.responses, transport.conditions).install()
+            )
+            if not client_limits:
+                stack.enter_context(
+                    mock.patch.object(LimiterAdapter, "send", HTTPAdapter.send)
+                )
+        else:
+            stack.enter_context(transport.install(client_limits=client_limits))
+        start = time.perf_counter()
+        lookups = asyncio.run(_resolve(identifiers))
+        seconds = time.perf_counter() - start
+    return Result(
+        workload=workload,
+        size=len(identifiers),
+        seconds=seconds,
+        latencies=[latency for latency, _ in lookups],
+        missing=sum(not found for _, found in lookups),
+        throttled=transport.statuses[429],
+    )
+
+
+def run(
+    kinds: Sequence[str] = KINDS,
+    sizes: Sequence[int] = SIZES,
+    *,
+    responses: Responses | None = None,
+    identifiers: Sequence[str] | None = None,
+    latency: float = 0.05,
+    jitter: float = 0.5,
+    rate_limits: dict[str, float] | None = None,
+    client_limits: bool = False,
+    server: bool = False,
+) -> list[Result]:
+    """Run every workload.
+
+    Parameters
+    ----------
+    kinds : Sequence[str]
+        Identifier kinds of the synthetic workloads.
+    sizes : Sequence[int]
+        Number of identifiers in each workload.
+    responses : Responses, optional
+        Response table to replay. Defaults to a corpus large enough for the
+        largest workload.
+    identifiers : Sequence[str], optional
+        Identifiers to resolve instead of the synthetic workloads. They are
+        repeated to fill each size.
+    latency, jitter, rate_limits
+        Passed to :class:`wenxian.testing.Conditions`.
+    client_limits : bool, default=False
+        Keep wenxian's own rate limiters.
+    server : bool, default=False
+        Serve responses from a loopback :class:`wenxian.testing.MockServer`
+        instead of answering inside the session.
+    """
+    records = corpus(max(sizes))
+    transport = Transport(
+        responses if responses is not None else records,
+        Conditions(latency=latency, jitter=jitter, rate_limits=rate_limits or {}),
+    )
+    if identifiers is not None:
+        workloads = {
+            "recorded": [list(islice(cycle(identifiers), size)) for size in sizes]
+        }
+    else:
+        workloads = {
+            kind: [records.identifiers(kind, size) for size in sizes] for kind in kinds
+        }
+    return [
+        run_workload(
+            workload, batch, transport, client_limits=client_limits, server=server
+        )
+        for workload, batches in workloads.items()
+        for batch in batches
+    ]
+
+
+def _rate_limit(value: str) -> tuple[str, float]:
+    """Parse a ``HOST=PER_SECOND`` option."""
+    host, _, rate = value.partition("=")
+    return host, float(rate)
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workloads", nargs="+", choices=KINDS, default=KINDS)
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES)
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="median response time in seconds"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.5, help="log-normal response time spread"
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=_rate_limit,
+        action="append",
+        default=[],
+        metavar="HOST=PER_SECOND",
+        help="requests per second accepted by a host before it answers 429",
+    )
+    parser.add_argument(
+        "--client-limits",
+        action="store_true",
+        help="keep wenxian's per-service rate limiters",
+    )
+    parser.add_argument(
+        "--server",
+        action="store_true",
+        help="serve responses over loopback HTTP instead of inside the session",
+    )
+    parser.add_argument(
+        "--identifiers", metavar="FILE", help="identifiers to resolve, one per line"
+    )
+    parser.add_argument("--recording", metavar="FILE", help="responses to replay")
+    parser.add_argument(
+        "--record", metavar="FILE", help="record live responses for --identifiers"
+    )
+    args = parser.parse_args()
+    logger.setLevel(logging.CRITICAL)
+
+    identifiers = None
+    if args.identifiers is not None:
+        with open(args.identifiers, encoding="utf-8") as f:
+            identifiers = [line.strip() for line in f if line.strip()]
+    if args.record is not None:
+        if identifiers is None:
+            parser.error("--record requires --identifiers")
+        with record(Recording()) as recording:
+            asyncio.run(_resolve(identifiers))
+        recording.save(args.record)
+        return
+
+    results = run(
+        args.workloads,
+        args.sizes,
+        responses=Recording.load(args.recording) if args.recording else None,
+        identifiers=identifiers,
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_limits=dict(args.rate_limit),
+        client_limits=args.client_limits,
+        server=args.server,
+    )
+    sys.stdout.write(
+        f"{'workload':<9} {'size':>6} {'ids/s':>9} {'p50 ms':>8} {'p95 ms':>8}"
+        f" {'p99 ms':>8} {'missing':>8} {'429s':>6}\n"
+    )
+    for result in results:
+        sys.stdout.write(
+            f"{result.workload:<9} {result.size:>6} {result.throughput:>9,.1f}"
+            f" {result.percentile(50) * 1000:>8.1f}"
+            f" {result.percentile(95) * 1000:>8.1f}"
+            f" {result.percentile(99) * 1000:>8.1f}"
+            f" {result.missing:>8} {result.throttled:>6}\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
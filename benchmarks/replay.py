@@ -0,0 +1,151 @@
+"""Replay transport for offline end-to-end benchmarks.
+
+Requests made through :data:`wenxian.feeder.session.SESSION` are answered
+from a response table instead of the network, with injected latency and
+per-host rate limits. The table is either a :class:`Recording` captured from
+the live services with :func:`record`, or a synthetic
+:class:`wenxian.testing.Corpus` seeded from the reference test cases by
+:func:`corpus`, so workloads of any size can be replayed without network
+access. Run the same tables over real sockets with
+:class:`wenxian.testing.MockServer`.
+"""
+
+from __future__ import annotations
+
+import json
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+from unittest import mock
+
+from requests import Response
+from requests.adapters import HTTPAdapter
+from requests_ratelimiter import LimiterAdapter
+
+from tests.cases import TEST_CASES
+from wenxian.reference import BibtexType
+from wenxian.testing import KINDS, Conditions, Corpus, Responses, request_key
+
+if TYPE_CHECKING:
+    import os
+    from collections import Counter
+    from collections.abc import Iterator
+
+    from requests import PreparedRequest
+
+
+class Recording(dict[str, tuple[int, bytes]]):
+    """Responses captured from the live services."""
+
+    def save(self, path: str | os.PathLike) -> None:
+        """Write the recording as JSON lines."""
+        with open(path, "w", encoding="utf-8") as f:
+            for key, (status, body) in self.items():
+                record = {"key": key, "status": status, "body": body.decode()}
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    @classmethod
+    def load(cls, path: str | os.PathLike) -> Recording:
+        """Read a recording written by :meth:`save`."""
+        recording = cls()
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                recording[record["key"]] = (record["status"], record["body"].encode())
+        return recording
+
+
+@contextmanager
+def record(recording: Recording) -> Iterator[Recording]:
+    """Capture every response received by the shared session."""
+    send = HTTPAdapter.send
+
+    def recording_send(adapter, request, **kwargs):
+        response = send(adapter, request, **kwargs)
+        recording[request_key(request.url)] = (response.status_code, response.content)
+        return response
+
+    with mock.patch.object(HTTPAdapter, "send", recording_send):
+        yield recording
+
+
+def corpus(size: int) -> Corpus:
+    """Return a synthetic corpus seeded from the reference test cases."""
+    return Corpus(
+        [
+            case.reference
+            for case in TEST_CASES
+            if case.reference.type == BibtexType.article
+            and isinstance(case.reference.pages, tuple)
+        ],
+        size,
+    )
+
+
+@dataclass
+class Transport:
+    """Answer session requests from a response table.
+
+    Parameters
+    ----------
+    responses : Responses
+        The response table. Unknown requests are answered with 404.
+    conditions : Conditions
+        Injected latency and rate limits. All requests count as one client.
+    """
+
+    responses: Responses
+    conditions: Conditions = field(default_factory=Conditions)
+
+    @property
+    def statuses(self) -> Counter[int]:
+        """Number of responses sent with each status."""
+        return self.conditions.statuses
+
+    def send(self, request: PreparedRequest) -> Response:
+        """Answer one request."""
+        assert request.url is not None
+        status, body, headers = self.conditions.respond(
+            self.responses, "localhost", request.url
+        )
+        response = Response()
+        response.url = request.url
+        response.request = request
+        response.encoding = "utf-8"
+        response.status_code = status
+        response.headers.update(headers)
+        response._content = body
+        return response
+
+    @contextmanager
+    def install(self, *, client_limits: bool = False) -> Iterator[Transport]:
+        """Route the shared session through this transport.
+
+        Parameters
+        ----------
+        client_limits : bool, default=False
+            Keep wenxian's own per-service rate limiters. They are bypassed by
+            default so that workloads measure scheduling and parsing instead
+            of the configured request spacing.
+        """
+
+        def send(adapter, request, **kwargs):
+            return self.send(request)
+
+        with mock.patch.object(HTTPAdapter, "send", send):
+            if client_limits:
+                yield self
+            else:
+                with mock.patch.object(LimiterAdapter, "send", send):
+                    yield self
+
+
+__all__ = [
+    "KINDS",
+    "Recording",
+    "Responses",
+    "Transport",
+    "corpus",
+    "record",
+    "request_key",
+]
@@ -0,0 +1,98 @@
+"""Benchmark title similarity engines.
+
+Run with ``python -m benchmarks.similarity``. Title pairs are derived from
+the reference test cases with the kinds of differences returned by title
+search services, plus unrelated pairs that must be rejected. Each engine is
+reported with its throughput and how often its accept/reject decision at
+:data:`wenxian.similarity.THRESHOLD` agrees with the ``difflib`` engine.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from itertools import permutations
+
+from tests.cases import TEST_CASES
+from wenxian.similarity import ENGINES, THRESHOLD, available_engines
+
+
+def title_pairs() -> list[tuple[str, str]]:
+    """Build query and result title pairs from the reference test cases."""
+    titles = list(
+        dict.fromkeys(
+            case.reference.title for case in TEST_CASES if case.reference.title
+        )
+    )
+    pairs = []
+    for title in titles:
+        words = title.split()
+        pairs.extend(
+            (
+                (title, title),
+                (title.lower(), title.upper() + "."),
+                (
+                    title,
+                    f"<mml:math><mml:mi>{words[0]}</mml:mi></mml:math> "
+                    + " ".join(words[1:]),
+                ),
+                (title, " ".join(words[: max(1, len(words) // 2)])),
+                (title, f"Correction to: {title}"),
+                (" ".join([title] * 4), " ".join([title.upper()] * 4)),
+            )
+        )
+    pairs.extend(permutations(titles, 2))
+    return pairs
+
+
+def run(engines: list[str], repeat: int = 20) -> list[tuple[str, float, float, int]]:
+    """Score every pair with each engine.
+
+    Returns
+    -------
+    list[tuple[str, float, float, int]]
+        ``(engine, pairs per second, agreement with difflib, disagreements)``.
+    """
+    pairs = title_pairs()
+    reference = [ENGINES["difflib"](a, b) >= THRESHOLD for a, b in pairs]
+    results = []
+    for name in engines:
+        engine = ENGINES[name]
+        start = time.perf_counter()
+        for _ in range(repeat):
+            scores = [engine(a, b) for a, b in pairs]
+        elapsed = time.perf_counter() - start
+        disagreements = sum(
+            (score >= THRESHOLD) != accepted
+            for score, accepted in zip(scores, reference, strict=True)
+        )
+        results.append(
+            (
+                name,
+                len(pairs) * repeat / elapsed,
+                1 - disagreements / len(pairs),
+                disagreements,
+            )
+        )
+    return results
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    available = available_engines()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--engines", nargs="+", choices=available, default=available)
+    args = parser.parse_args()
+    sys.stdout.write(
+        f"{'engine':<10} {'pairs/s':>12} {'agreement':>10} {'differ':>7}\n"
+    )
+    for name, throughput, agreement, disagreements in run(args.engines, args.repeat):
+        sys.stdout.write(
+            f"{name:<10} {throughput:>12,.0f} {agreement:>10.1%} {disagreements:>7}\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Benchmark the XML parsing backends.
+
+Run with ``python -m benchmarks.xml_parsing``. PubMed efetch and arXiv Atom
+documents are rendered from the reference test cases in the layout returned
+by the live services. Each backend parses them through the feeders and is
+reported with its throughput and whether its references match those of the
+ElementTree backend.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from io import BytesIO
+from typing import TYPE_CHECKING
+from unittest import mock
+
+from tests.cases import TEST_CASES
+from wenxian.feeder import xml_backend
+from wenxian.feeder.arxiv import Arxiv
+from wenxian.feeder.pubmed import Pubmed
+from wenxian.testing.corpus import render_atom_feed, render_pubmed_article
+
+if TYPE_CHECKING:
+    from wenxian.reference import Reference
+
+
+def fixtures(batch: int = 200) -> dict[str, tuple[bytes, ...]]:
+    """Render single-record and batched documents for each parser."""
+    pubmed = [
+        (case.pmid, case.reference) for case in TEST_CASES if case.pmid is not None
+    ]
+    articles = [
+        render_pubmed_article(pmid + offset, reference)
+        for offset in range(batch // len(pubmed) + 1)
+        for pmid, reference in pubmed
+    ][:batch]
+    return {
+        "pubmed": tuple(
+            f"<PubmedArticleSet>{render_pubmed_article(pmid, reference)}"
+            "</PubmedArticleSet>".encode()
+            for pmid, reference in pubmed
+        ),
+        "pubmed-batch": (
+            f"<PubmedArticleSet>{''.join(articles)}</PubmedArticleSet>".encode(),
+        ),
+        "arxiv": tuple(
+            render_atom_feed(case.arxiv, case.reference).encode()
+            for case in TEST_CASES
+            if case.arxiv is not None
+        ),
+    }
+
+
+def _parse(name: str, document: bytes) -> list[Reference | None]:
+    """Parse one fixture with the feeder that consumes it."""
+    if name == "arxiv":
+        return [Arxiv()._from_content(document, "0000.00000")]
+    if name == "pubmed":
+        return [Pubmed()._from_content(document)]
+    return [reference for _, reference in Pubmed()._iter_articles(BytesIO(document))]
+
+
+def run(backends: list[str], repeat: int = 50) -> list[tuple[str, str, float, bool]]:
+    """Parse every fixture with each backend.
+
+    Returns
+    -------
+    list[tuple[str, str, float, bool]]
+        ``(fixture, backend, documents per second, matches etree)``.
+    """
+    results = []
+    for name, documents in fixtures().items():
+        expected = None
+        for backend in ["etree", *(b for b in backends if b != "etree")]:
+            with mock.patch.object(xml_backend, "BACKEND", backend):
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    parsed = [_parse(name, document) for document in documents]
+                elapsed = time.perf_counter() - start
+            if expected is None:
+                expected = parsed
+            if backend in backends:
+                results.append(
+                    (
+                        name,
+                        backend,
+                        len(documents) * repeat / elapsed,
+                        parsed == expected,
+                    )
+                )
+    return results
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    available = [
+        name for name in xml_backend.BACKENDS if name != "lxml" or xml_backend._HAS_LXML
+    ]
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--backends", nargs="+", choices=available, default=available)
+    args = parser.parse_args()
+    sys.stdout.write(f"{'fixture':<14} {'backend':<8} {'docs/s':>10} {'same':>5}\n")
+    for name, backend, throughput, same in run(args.backends, args.repeat):
+        sys.stdout.write(
+            f"{name:<14} {backend:<8} {throughput:>10,.0f} {'yes' if same else 'NO':>5}\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -19,3 +19,10 @@ def tests(session: nox.Session) -> None:
         "--cov-report",
         "xml",
     )
+
+
+@nox.session
+def benchmarks(session: nox.Session) -> None:
+    """Run the offline end-to-end lookup benchmarks."""
+    session.install("-e.[speedups]")
+    session.run("python", "-m", "benchmarks.lookups", *session.posargs)
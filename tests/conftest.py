@@ -0,0 +1,15 @@
+"""Shared test fixtures."""
+
+from __future__ import annotations
+
+import pytest
+
+from wenxian.breaker import reset_breakers
+
+
+@pytest.fixture(autouse=True)
+def _close_breakers():
+    """Keep failures of one test from opening circuit breakers in the next."""
+    reset_breakers()
+    yield
+    reset_breakers()
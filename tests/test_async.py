@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import sys
 import threading
 from types import ModuleType
@@ -35,7 +36,7 @@ class _Response:
 
     def __init__(self, data=None, content: bytes = b"", status_code: int = 200):
         self._data = data
-        self.content = content
+        self.content = content if data is None else json.dumps(data).encode()
         self.status_code = status_code
 
     def json(self):
@@ -297,27 +298,27 @@ def test_async_fallbacks_and_dispatch(monkeypatch):
 
 def test_async_title_priority_and_browser_errors(monkeypatch):
     """Test title priority and Pyodide-specific error isolation."""
-    semantic_calls = []
+    fetched = []
 
     async def crossref(self, title):
-        return "10.1234/crossref"
+        return [("10.1234/crossref", "A matching paper title")]
 
     async def semantic(self, title):
-        semantic_calls.append(title)
-        return "10.1234/semantic"
+        return [("10.1234/semantic", "A matching paper title")]
 
     async def doi(identifier):
+        fetched.append(identifier)
         return Reference(title="A matching paper title", journal="Journal")
 
-    monkeypatch.setattr("wenxian.from_identifier.Crossref.async_from_title", crossref)
+    monkeypatch.setattr("wenxian.from_identifier.Crossref.async_search_title", crossref)
     monkeypatch.setattr(
-        "wenxian.from_identifier.Semanticscholar.async_from_title", semantic
+        "wenxian.from_identifier.Semanticscholar.async_search_title", semantic
     )
     monkeypatch.setattr("wenxian.from_identifier.async_from_doi", doi)
     assert asyncio.run(async_from_title("A matching paper title")) == Reference(
         title="A matching paper title", journal="Journal"
     )
-    assert semantic_calls == []
+    assert fetched == ["10.1234/crossref"]
 
     async def fail(identifier):
         raise ValueError("JavaScript fetch failed")
@@ -330,16 +331,21 @@ def test_async_crossref(monkeypatch):
     """Test shared parsing in Crossref async methods."""
 
     async def fake_get(url, **kwargs):
-        if url.endswith("/works"):
+        if "query.title" in kwargs["params"]:
             return _Response({"message": {"items": [{"DOI": "10.1234/example"}]}})
+        assert kwargs["params"]["filter"] == "doi:10.1234/example"
         return _Response(
             {
                 "message": {
-                    "title": ["Example"],
-                    "author": [{"given": "Ada", "family": "Lovelace"}],
-                    "published-online": {"date-parts": [[2024]]},
-                    "container-title": ["Journal of Tests"],
-                    "type": "journal-article",
+                    "items": [
+                        {
+                            "title": ["Example"],
+                            "author": [{"given": "Ada", "family": "Lovelace"}],
+                            "published-online": {"date-parts": [[2024]]},
+                            "container-title": ["Journal of Tests"],
+                            "type": "journal-article",
+                        }
+                    ]
                 }
             }
         )
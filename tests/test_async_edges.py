@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import asyncio
+import json
 
 import pytest
 
@@ -25,7 +26,7 @@ class _Response:
     def __init__(self, data=None, *, status_code: int = 200, content: bytes = b""):
         self._data = data
         self.status_code = status_code
-        self.content = content
+        self.content = content if data is None else json.dumps(data).encode()
 
     def json(self):
         """Return the configured JSON payload."""
@@ -150,23 +151,25 @@ def test_async_identifier_dispatches_all_supported_types(monkeypatch):
 
 
 def test_async_title_uses_semantic_fallback_and_handles_no_match(monkeypatch):
-    """Test title lookup falls back to Semantic Scholar and handles exhaustion."""
+    """Test title lookup uses Semantic Scholar hits and handles exhaustion."""
     semantic_calls = []
 
     async def missing_crossref(self, title):
-        return None
+        return []
 
     async def semantic(self, title):
         semantic_calls.append(title)
-        return "10.1234/example"
+        return [("10.1234/example", "A matching paper title")]
 
     async def lookup(identifier):
         return Reference(title="A matching paper title")
 
     monkeypatch.setattr(
-        identifier_module.Crossref, "async_from_title", missing_crossref
+        identifier_module.Crossref, "async_search_title", missing_crossref
+    )
+    monkeypatch.setattr(
+        identifier_module.Semanticscholar, "async_search_title", semantic
     )
-    monkeypatch.setattr(identifier_module.Semanticscholar, "async_from_title", semantic)
     monkeypatch.setattr(identifier_module, "async_from_identifier", lookup)
     assert asyncio.run(
         identifier_module.async_from_title("A matching paper title")
@@ -174,10 +177,10 @@ def test_async_title_uses_semantic_fallback_and_handles_no_match(monkeypatch):
     assert semantic_calls == ["A matching paper title"]
 
     async def no_identifier(self, title):
-        return None
+        return []
 
     monkeypatch.setattr(
-        identifier_module.Semanticscholar, "async_from_title", no_identifier
+        identifier_module.Semanticscholar, "async_search_title", no_identifier
     )
     assert (
         asyncio.run(identifier_module.async_from_title("No matching paper title"))
@@ -282,14 +285,14 @@ def test_semantic_scholar_async_error_paths(monkeypatch):
     monkeypatch.setattr("wenxian.feeder.semanticscholar.async_get", unavailable)
     assert asyncio.run(feeder.async_from_title("Example title")) is None
     assert asyncio.run(feeder.async_from_doi("10.1234/example")) is None
-    assert feeder._identifier_from_title_data({}) is None
+    assert feeder._candidates_from_title_data({}) == []
 
 
 def test_async_feeders_handle_http_misses(monkeypatch):
     """Test remaining asynchronous feeders return no result on misses."""
 
     async def crossref_get(url, **kwargs):
-        status = 503 if url == Crossref.API_URL else 404
+        status = 503 if "query.title" in kwargs["params"] else 404
         return _Response(status_code=status)
 
     monkeypatch.setattr("wenxian.feeder.crossref.async_get", crossref_get)
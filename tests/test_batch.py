@@ -0,0 +1,118 @@
+"""Tests for batch lookups."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import TYPE_CHECKING
+
+from benchmarks.replay import corpus
+from wenxian.feeder import session
+from wenxian.feeder.arxiv import Arxiv
+from wenxian.feeder.pubmed import Pubmed
+from wenxian.from_identifier import (
+    _executor,
+    async_from_identifiers,
+    from_doi,
+    from_identifiers,
+)
+from wenxian.reference import Reference
+from wenxian.testing import MockServer
+
+if TYPE_CHECKING:
+    import pytest
+
+
+def test_from_identifiers_keeps_input_order():
+    """Test results follow the input, with misses and failures in place."""
+    records = corpus(3)
+    identifiers = [
+        "10.5555/wenxian.2",
+        "10.5555/missing",
+        records.identifiers("pmid", 1)[0],
+        "10.5555/wenxian.0",
+    ]
+    with MockServer(records).install():
+        results = list(from_identifiers(identifiers, concurrency=2))
+    assert [identifier for identifier, _ in results] == identifiers
+    assert results[0][1].title == records.title(2)
+    assert isinstance(results[1][1], Reference)
+    assert results[1][1].is_empty()
+    assert results[2][1].title == records.title(0)
+    assert results[3][1].doi == "10.5555/wenxian.0"
+
+
+def test_from_identifiers_returns_exceptions(monkeypatch: pytest.MonkeyPatch):
+    """Test a failing lookup is reported without stopping the batch."""
+
+    def lookup(identifier):
+        if identifier == "bad":
+            raise ValueError(identifier)
+        return None
+
+    monkeypatch.setattr("wenxian.from_identifier.from_identifier", lookup)
+    results = dict(from_identifiers(["bad", "good"]))
+    assert isinstance(results["bad"], ValueError)
+    assert results["good"] == Reference()
+
+
+def test_source_lookups_share_a_bounded_pool():
+    """Test repeated lookups reuse one pool no larger than the concurrency."""
+    with MockServer(corpus(1)).install():
+        for _ in range(3):
+            from_doi("10.5555/wenxian.0")
+    assert _executor() is _executor()
+    workers = [
+        thread for thread in threading.enumerate() if thread.name.startswith("wenxian_")
+    ]
+    assert 0 < len(workers) <= session.CONCURRENCY
+
+
+async def _collect(identifiers, **kwargs):
+    return [item async for item in async_from_identifiers(identifiers, **kwargs)]
+
+
+def test_async_from_identifiers_batches_and_dedupes():
+    """Test PMIDs and arXiv identifiers share requests and duplicates run once."""
+    records = corpus(4)
+    pmids = records.identifiers("pmid", 4)
+    arxivs = records.identifiers("arxiv", 4)
+    identifiers = [*pmids, *arxivs, "10.5555/wenxian.1", f" {pmids[0]} "]
+    with MockServer(records).install() as server:
+        results = dict(asyncio.run(_collect(identifiers, concurrency=2)))
+    assert sorted(results) == sorted(set(pmids + arxivs + ["10.5555/wenxian.1"]))
+    for index, (pmid, arxiv) in enumerate(zip(pmids, arxivs, strict=True)):
+        assert results[pmid].title == records.title(index)
+        assert results[arxiv].title == records.title(index)
+    assert results["10.5555/wenxian.1"].doi == "10.5555/wenxian.1"
+    # one efetch and one arXiv query answer all eight, then one DOI lookup
+    assert sum(server.conditions.statuses.values()) < 10
+
+
+def test_async_from_identifiers_reports_failures(monkeypatch: pytest.MonkeyPatch):
+    """Test misses are empty references and failures are yielded, not raised."""
+
+    async def lookup(identifier):
+        if identifier == "bad":
+            raise ValueError(identifier)
+        return None
+
+    monkeypatch.setattr("wenxian.from_identifier.async_from_identifier", lookup)
+    results = dict(asyncio.run(_collect(["bad", "good"])))
+    assert isinstance(results["bad"], ValueError)
+    assert isinstance(results["good"], Reference)
+    assert results["good"].is_empty()
+
+
+def test_pubmed_and_arxiv_batch_feeders():
+    """Test the batch feeders key references by the requested identifiers."""
+    records = corpus(2)
+    with MockServer(records).install():
+        pubmed = Pubmed().from_pmids(records.identifiers("pmid", 2))
+        arxiv = Arxiv().from_arxivs(["2401.0", "2401.1", "2401.9"])
+    assert [reference.title for reference in pubmed.values()] == [
+        records.title(0),
+        records.title(1),
+    ]
+    assert sorted(arxiv) == ["2401.0", "2401.1"]
+    assert arxiv["2401.1"].title == records.title(1)
@@ -0,0 +1,125 @@
+"""Tests for the per-source circuit breakers."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from wenxian.breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    THRESHOLD,
+    CircuitBreaker,
+    circuit_breaker,
+)
+from wenxian.feeder import session
+from wenxian.from_identifier import _async_fetch_safely, _fetch_safely
+from wenxian.metrics import METRICS
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    """Start every test with empty metrics."""
+    METRICS.reset()
+    yield
+    METRICS.reset()
+
+
+def test_breaker_opens_after_consecutive_failures():
+    """Test the breaker opens after consecutive failures and fails fast."""
+    breaker = CircuitBreaker("Test", threshold=2, cooldown=60)
+    permit = breaker.allow()
+    assert permit is not None
+    breaker.record_failure(permit)
+    breaker.record_success(permit)
+    breaker.record_failure(permit)
+    assert breaker.state == CLOSED
+    breaker.record_failure(permit)
+    assert breaker.state == OPEN
+    assert breaker.allow() is None
+    assert METRICS.breakers["Test"].state == OPEN
+    assert METRICS.breakers["Test"].rejected == 1
+
+
+def test_breaker_probes_once_when_half_open():
+    """Test a single probe closes or reopens the breaker after the cooldown."""
+    breaker = CircuitBreaker("Test", threshold=1, cooldown=0)
+    stale = breaker.allow()
+    assert stale is not None
+    breaker.record_failure(stale)
+    probe = breaker.allow()
+    assert probe is not None
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() is None
+    # a lookup started before the breaker opened is not the probe
+    breaker.release(stale)
+    assert breaker.allow() is None
+    breaker.release(probe)
+    probe = breaker.allow()
+    assert probe is not None
+    breaker.record_failure(probe)
+    assert breaker.state == OPEN
+    probe = breaker.allow()
+    assert probe is not None
+    breaker.record_success(probe)
+    assert breaker.state == CLOSED
+    assert breaker.allow() is not None
+    assert breaker.allow() is not None
+    assert METRICS.breakers["Test"].transitions == {OPEN: 2, HALF_OPEN: 2, CLOSED: 1}
+
+
+def test_lookups_fail_fast_while_open():
+    """Test failing lookups open the breaker of their source only."""
+    calls = 0
+
+    def unreachable(identifier):
+        nonlocal calls
+        calls += 1
+        raise ConnectionError("down")
+
+    for _ in range(THRESHOLD + 3):
+        assert _fetch_safely("Down", unreachable, "x") is None
+    assert calls == THRESHOLD
+    assert circuit_breaker("Down").state == OPEN
+    assert circuit_breaker("Up").state == CLOSED
+    assert "Down" in METRICS.summary()
+    assert (
+        'wenxian_circuit_breaker_state{source="Down",state="open"} 1'
+        in METRICS.prometheus()
+    )
+
+
+def test_async_lookups_count_throttling_as_failures():
+    """Test throttled lookups open the breaker and cancelled probes release it."""
+    calls = 0
+
+    async def throttled(identifier):
+        nonlocal calls
+        calls += 1
+        session._collect_status(429)
+
+    async def lookups():
+        for _ in range(THRESHOLD + 1):
+            await _async_fetch_safely("Throttled", throttled, "x")
+
+    asyncio.run(lookups())
+    assert calls == THRESHOLD
+    breaker = circuit_breaker("Throttled")
+    assert breaker.state == OPEN
+
+    async def hanging(identifier):
+        await asyncio.sleep(10)
+
+    async def probe():
+        task = asyncio.ensure_future(_async_fetch_safely("Throttled", hanging, "x"))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    breaker.cooldown = 0
+    asyncio.run(probe())
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() is not None
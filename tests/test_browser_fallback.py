@@ -78,12 +78,12 @@ def test_title_falls_back_to_semantic_scholar(monkeypatch):
     """Test title lookup falls back when Crossref is unavailable."""
     title = "Fallback title"
     monkeypatch.setattr(
-        "wenxian.from_identifier.Crossref.from_title",
+        "wenxian.from_identifier.Crossref.search_title",
         lambda *args: _raise(OSError("CORS")),
     )
     monkeypatch.setattr(
-        "wenxian.from_identifier.Semanticscholar.from_title",
-        lambda *args: "10.1234/example",
+        "wenxian.from_identifier.Semanticscholar.search_title",
+        lambda *args: [("10.1234/example", None)],
     )
     monkeypatch.setattr(
         "wenxian.from_identifier.from_identifier",
@@ -98,10 +98,10 @@ def test_title_falls_back_to_semantic_scholar(monkeypatch):
 def test_title_returns_none_when_search_sources_fail(monkeypatch):
     """Test title lookup returns None when all search sources fail."""
     monkeypatch.setattr(
-        "wenxian.from_identifier.Crossref.from_title", lambda *args: None
+        "wenxian.from_identifier.Crossref.search_title", lambda *args: []
     )
     monkeypatch.setattr(
-        "wenxian.from_identifier.Semanticscholar.from_title", lambda *args: None
+        "wenxian.from_identifier.Semanticscholar.search_title", lambda *args: []
     )
 
     assert from_title("Missing title") is None
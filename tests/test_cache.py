@@ -0,0 +1,277 @@
+"""Tests for the response, miss, reference and render caches."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import pytest
+
+import wenxian.from_identifier as identifier_module
+from benchmarks.replay import corpus
+from wenxian.breaker import Permit, circuit_breaker, reset_breakers
+from wenxian.cache import (
+    MissCache,
+    ReferenceCache,
+    RenderCache,
+    ResponseCache,
+    cache_key,
+    reference_key,
+    set_cache,
+    set_miss_cache,
+    set_reference_cache,
+    set_render_cache,
+)
+from wenxian.feeder.crossref import Crossref
+from wenxian.feeder.session import SESSION
+from wenxian.from_identifier import (
+    _remember_miss,
+    _resolve_title_candidates,
+    async_from_identifier,
+    async_from_identifiers,
+    from_identifier,
+)
+from wenxian.reference import Reference, renderer_version
+from wenxian.testing import MockServer
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.fixture
+def cache(tmp_path: Path):
+    """Install a disk-backed response cache for one test."""
+    cache = ResponseCache(tmp_path / "responses.sqlite")
+    previous = set_cache(cache)
+    yield cache
+    set_cache(previous)
+    cache.close()
+
+
+def test_cache_key_sorts_params():
+    """Test the cache key does not depend on the order of the parameters."""
+    assert cache_key("https://a.test/x", {"b": 2, "a": "1"}) == cache_key(
+        "https://a.test/x", {"a": 1, "b": "2"}
+    )
+    assert cache_key("https://a.test/x?q=1", {"a": 1}) == "https://a.test/x?q=1&a=1"
+    assert cache_key("https://a.test/x") == "https://a.test/x"
+
+
+def test_memory_tier_is_bounded(tmp_path: Path):
+    """Test the memory tier evicts the least recently used body."""
+    cache = ResponseCache(maxsize=2)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    assert cache.get("a") == b"1"
+    cache.set("c", b"3")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+
+
+def test_disk_tier_persists_and_expires(tmp_path: Path):
+    """Test bodies survive a new cache on the same file until they expire."""
+    path = tmp_path / "responses.sqlite"
+    cache = ResponseCache(path)
+    cache.set("a", b"1")
+    cache.close()
+    cache = ResponseCache(path)
+    assert cache.get("a") == b"1"
+    cache.close()
+    cache = ResponseCache(path, ttl=0)
+    assert cache.get("a") is None
+    cache.clear()
+    cache.close()
+
+
+def test_session_serves_repeated_requests_from_cache(cache: ResponseCache):
+    """Test a repeated lookup does not reach the services again."""
+    records = corpus(1)
+    with MockServer(records).install() as server:
+        first = from_identifier("10.5555/wenxian.0")
+        served = sum(server.conditions.statuses.values())
+        second = from_identifier("10.5555/wenxian.0")
+        assert sum(server.conditions.statuses.values()) == served
+        url, params = Crossref()._doi_request("10.5555/wenxian.0")
+        response = SESSION.get(url, params=params)
+    assert response.headers["X-Wenxian-Cache"] == "hit"
+    assert first.title == second.title == records.title(0)
+
+
+@pytest.fixture
+def misses():
+    """Install an in-memory miss cache for one test."""
+    misses = MissCache()
+    previous = set_miss_cache(misses)
+    yield misses
+    set_miss_cache(previous)
+
+
+def test_known_misses_are_skipped(misses: MissCache):
+    """Test sources that found nothing are not asked again."""
+    with MockServer(corpus(1)).install() as server:
+        assert from_identifier("10.5555/missing").is_empty()
+        served = dict(server.conditions.statuses)
+        assert from_identifier("10.5555/missing").is_empty()
+        assert dict(server.conditions.statuses) == served
+    assert "Crossref|from_doi|10.5555/missing" in misses
+    assert "PubMed|from_doi|10.5555/missing" in misses
+
+
+def test_misses_expire(tmp_path: Path):
+    """Test misses persist on disk, apart from responses, until they expire."""
+    path = tmp_path / "responses.sqlite"
+    misses = MissCache(path, ttl=60)
+    misses.add("Crossref|from_doi|10.1/x")
+    misses.close()
+    assert "Crossref|from_doi|10.1/x" in MissCache(path, ttl=60)
+    assert "Crossref|from_doi|10.1/x" not in MissCache(path, ttl=0)
+    assert ResponseCache(path).get("Crossref|from_doi|10.1/x") is None
+
+
+def test_misses_need_definitive_answers(misses: MissCache):
+    """Test lookups without requests, or with failed ones, are not misses."""
+    _remember_miss("a", [200, 404])
+    _remember_miss("b", [200, 503])
+    _remember_miss("c", [429])
+    _remember_miss("d", [0])
+    _remember_miss("e", [])
+    assert "a" in misses
+    assert not any(key in misses for key in "bcde")
+
+
+def test_rejected_title_candidates_are_skipped(
+    misses: MissCache, monkeypatch: pytest.MonkeyPatch
+):
+    """Test a candidate rejected for a title is not fetched again."""
+    fetched = []
+
+    def lookup(identifier):
+        fetched.append(identifier)
+        return Reference(title="Something else entirely", doi=identifier)
+
+    monkeypatch.setattr("wenxian.from_identifier.from_identifier", lookup)
+    title = "Deep residual learning for image recognition"
+    candidates = [[("10.1234/x", None)]]
+    assert _resolve_title_candidates(title, candidates) is None
+    assert _resolve_title_candidates(title, candidates) is None
+    assert fetched == ["10.1234/x"]
+
+
+@pytest.fixture
+def references(tmp_path: Path):
+    """Install a disk-backed reference cache for one test."""
+    references = ReferenceCache(tmp_path / "responses.sqlite")
+    previous = set_reference_cache(references)
+    yield references
+    set_reference_cache(previous)
+    references.close()
+
+
+@pytest.mark.parametrize(
+    ("identifier", "key"),
+    [
+        ("10.5555/Wenxian.0", "DOI:10.5555/wenxian.0"),
+        (" 10.5555/wenxian.0 ", "DOI:10.5555/wenxian.0"),
+        ("00012345", "PMID:12345"),
+        ("2401.00001V2", "arXiv:2401.00001v2"),
+        ("Deep residual learning for image recognition", None),
+    ],
+)
+def test_reference_key(identifier: str, key: str | None):
+    """Test identifiers are normalized into reference cache keys."""
+    assert reference_key(identifier) == key
+
+
+def test_merged_references_are_cached(references: ReferenceCache):
+    """Test repeated lookups are answered without contacting any source."""
+    with MockServer(corpus(1)).install() as server:
+        first = from_identifier("10.5555/wenxian.0")
+        served = dict(server.conditions.statuses)
+        assert from_identifier("10.5555/WENXIAN.0") == first
+        assert dict(server.conditions.statuses) == served
+
+        async def collect():
+            return [
+                item async for item in async_from_identifiers(["10.5555/wenxian.0"])
+            ]
+
+        assert asyncio.run(collect()) == [("10.5555/wenxian.0", first)]
+        assert dict(server.conditions.statuses) == served
+    assert ReferenceCache(references.path).get_reference("10.5555/wenxian.0") == first
+
+
+def test_partial_references_are_not_cached(
+    references: ReferenceCache, monkeypatch: pytest.MonkeyPatch
+):
+    """Test references merged while a source failed are not cached."""
+
+    def unreachable(doi):
+        raise ConnectionError("down")
+
+    async def async_unreachable(doi):
+        raise ConnectionError("down")
+
+    with MockServer(corpus(1)).install():
+        with monkeypatch.context() as patch:
+            patch.setattr(identifier_module._CROSSREF, "from_doi", unreachable)
+            patch.setattr(
+                identifier_module._CROSSREF, "async_from_doi", async_unreachable
+            )
+            assert from_identifier("10.5555/wenxian.0") is not None
+            assert asyncio.run(async_from_identifier("10.5555/wenxian.0"))
+            assert references.get_reference("10.5555/wenxian.0") is None
+        breaker = circuit_breaker("Crossref")
+        breaker.threshold = 1
+        breaker.record_failure(Permit())
+        assert breaker.allow() is None
+        from_identifier("10.5555/wenxian.0")
+        assert references.get_reference("10.5555/wenxian.0") is None
+        reset_breakers()
+        complete = from_identifier("10.5555/wenxian.0")
+    assert references.get_reference("10.5555/wenxian.0") == complete
+
+
+def test_reference_schema_mismatch(references: ReferenceCache):
+    """Test references stored with another schema version are ignored."""
+    references.set(reference_key("10.1234/x"), b'{"v":0,"title":"Old"}')
+    assert references.get_reference("10.1234/x") is None
+    references.set_reference("10.1234/x", Reference())
+    assert references.get_reference("10.1234/x") is None
+    references.set_reference("10.1234/x", Reference(title="New"))
+    assert references.get_reference("10.1234/x") == Reference(title="New")
+
+
+def test_rendered_output_is_memoized(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Test unchanged references are rendered once per format and version."""
+    renders = []
+    render = Reference._bibtex
+
+    def counted(self):
+        renders.append(self.title)
+        return render(self)
+
+    monkeypatch.setattr(Reference, "_bibtex", counted)
+    rendered = RenderCache(tmp_path / "responses.sqlite")
+    previous = set_render_cache(rendered)
+    try:
+        reference = Reference(title="A", journal="Physical Review E", year=2024)
+        bibtex = reference.bibtex
+        assert (
+            Reference(title="A", journal="Physical Review E", year=2024).bibtex
+            == bibtex
+        )
+        assert renders == ["A"]
+        reference.title = "B"
+        assert "{{B}}" in reference.bibtex
+        assert renders == ["A", "B"]
+        assert reference.text != reference.markdown
+        set_render_cache(RenderCache(rendered.path))
+        monkeypatch.setattr("wenxian.reference.RENDERER_VERSION", 0)
+        assert reference.bibtex == render(reference)
+        assert renders == ["A", "B"]
+        renderer_version.cache_clear()
+        reference.bibtex
+        assert renders == ["A", "B", "B"]
+    finally:
+        set_render_cache(previous)
+        renderer_version.cache_clear()
@@ -40,7 +40,9 @@ def test_cmd_from_uses_async_fetches_concurrently(monkeypatch, capsys):
         await asyncio.wait_for(all_started.wait(), timeout=1)
         return _Reference(identifier)
 
-    monkeypatch.setattr(cli, "async_from_identifier", fake_from_identifier)
+    monkeypatch.setattr(
+        "wenxian.from_identifier.async_from_identifier", fake_from_identifier
+    )
     cli.cmd_from(IDENTIFIER=[" first ", "second"], output_type="text")
 
     assert capsys.readouterr().out == "first\nsecond"
@@ -54,7 +56,9 @@ def test_cmd_from_preserves_async_error_handling(monkeypatch, capsys):
             raise RuntimeError("boom")
         return _Reference(identifier)
 
-    monkeypatch.setattr(cli, "async_from_identifier", fake_from_identifier)
+    monkeypatch.setattr(
+        "wenxian.from_identifier.async_from_identifier", fake_from_identifier
+    )
     cli.cmd_from(
         IDENTIFIER=["bad", "good"],
         ignore_errors=True,
@@ -83,7 +87,9 @@ def test_cmd_from_wraps_async_error_and_cancels_pending(monkeypatch):
             cancelled = True
             raise
 
-    monkeypatch.setattr(cli, "async_from_identifier", fake_from_identifier)
+    monkeypatch.setattr(
+        "wenxian.from_identifier.async_from_identifier", fake_from_identifier
+    )
     with pytest.raises(ValueError, match="Failed to fetch reference from bad: boom"):
         cli.cmd_from(IDENTIFIER=["bad", "slow"])
 
@@ -102,7 +108,9 @@ def test_cmd_from_writes_default_single_file(
     async def fake_from_identifier(identifier):
         return _Reference(identifier)
 
-    monkeypatch.setattr(cli, "async_from_identifier", fake_from_identifier)
+    monkeypatch.setattr(
+        "wenxian.from_identifier.async_from_identifier", fake_from_identifier
+    )
     monkeypatch.chdir(tmp_path)
     cli.cmd_from(IDENTIFIER=["item"], output=0, output_type=output_type)
 
@@ -115,7 +123,9 @@ def test_cmd_from_writes_default_multiple_file(monkeypatch, tmp_path):
     async def fake_from_identifier(identifier):
         return _Reference(identifier)
 
-    monkeypatch.setattr(cli, "async_from_identifier", fake_from_identifier)
+    monkeypatch.setattr(
+        "wenxian.from_identifier.async_from_identifier", fake_from_identifier
+    )
     monkeypatch.chdir(tmp_path)
     cli.cmd_from(IDENTIFIER=["one", "two"], output=0)
 
@@ -129,7 +139,9 @@ def test_cmd_from_writes_explicit_file(monkeypatch, tmp_path):
         return _Reference(identifier)
 
     output = tmp_path / "output.bib"
-    monkeypatch.setattr(cli, "async_from_identifier", fake_from_identifier)
+    monkeypatch.setattr(
+        "wenxian.from_identifier.async_from_identifier", fake_from_identifier
+    )
     cli.cmd_from(IDENTIFIER=["item"], output=str(output))
 
     assert output.read_text() == "item"
@@ -142,7 +154,9 @@ def test_cmd_from_rejects_empty_reference(monkeypatch, result):
     async def fake_from_identifier(identifier):
         return result
 
-    monkeypatch.setattr(cli, "async_from_identifier", fake_from_identifier)
+    monkeypatch.setattr(
+        "wenxian.from_identifier.async_from_identifier", fake_from_identifier
+    )
     with pytest.raises(ValueError, match="Failed to fetch reference from missing"):
         cli.cmd_from(IDENTIFIER=["missing"])
 
@@ -154,7 +168,9 @@ def test_cmd_from_ignores_empty_reference(monkeypatch, capsys):
     async def fake_from_identifier(identifier):
         return None
 
-    monkeypatch.setattr(cli, "async_from_identifier", fake_from_identifier)
+    monkeypatch.setattr(
+        "wenxian.from_identifier.async_from_identifier", fake_from_identifier
+    )
     monkeypatch.setattr(cli.logger, "error", errors.append)
     cli.cmd_from(IDENTIFIER=["missing"], ignore_errors=True)
 
@@ -168,7 +184,9 @@ def test_cmd_from_rejects_unknown_output_type(monkeypatch):
     async def fake_from_identifier(identifier):
         return _Reference(identifier)
 
-    monkeypatch.setattr(cli, "async_from_identifier", fake_from_identifier)
+    monkeypatch.setattr(
+        "wenxian.from_identifier.async_from_identifier", fake_from_identifier
+    )
     with pytest.raises(ValueError, match="Unknown output type: yaml"):
         cli.cmd_from(IDENTIFIER=["item"], output_type="yaml")
 
@@ -0,0 +1,75 @@
+"""Tests for the Crossref feeder."""
+
+from __future__ import annotations
+
+import json
+
+from wenxian import __email__
+from wenxian.feeder.crossref import Crossref
+
+
+class _Response:
+    """Minimal Crossref response."""
+
+    def __init__(self, data, status_code: int = 200):
+        self._data = data
+        self.content = json.dumps(data).encode()
+        self.status_code = status_code
+
+    def json(self):
+        """Return the configured JSON payload."""
+        return self._data
+
+
+def test_from_doi_selects_only_parsed_fields(monkeypatch):
+    """Test DOI lookups request only the fields the parser reads."""
+    calls = []
+
+    def fake_get(url, params=None):
+        calls.append((url, params))
+        return _Response(
+            {"message": {"items": [{"title": ["Example"], "volume": "12"}]}}
+        )
+
+    monkeypatch.setattr("wenxian.feeder.crossref.SESSION.get", fake_get)
+    reference = Crossref().from_doi("10.1234/example")
+    assert reference is not None
+    assert reference.title == "Example"
+    assert reference.volume == 12
+
+    url, params = calls[0]
+    assert url == Crossref.API_URL
+    assert params["filter"] == "doi:10.1234/example"
+    assert params["mailto"] == __email__
+    assert "reference" not in params["select"].split(",")
+    assert set(params["select"].split(",")) == set(Crossref.WORK_FIELDS)
+
+
+def test_from_doi_missing_and_comma_dois(monkeypatch):
+    """Test empty filtered results and DOIs that cannot be filtered."""
+    calls = []
+
+    def fake_get(url, params=None):
+        calls.append((url, params))
+        if url == Crossref.API_URL:
+            return _Response({"message": {"items": []}})
+        return _Response({"message": {"title": ["With comma"]}})
+
+    monkeypatch.setattr("wenxian.feeder.crossref.SESSION.get", fake_get)
+    assert Crossref().from_doi("10.1234/missing") is None
+    assert Crossref().from_doi("10.1234/a,b").title == "With comma"
+    assert calls[1] == (f"{Crossref.API_URL}/10.1234/a,b", {"mailto": __email__})
+
+
+def test_title_search_selects_candidate_fields(monkeypatch):
+    """Test title search asks only for DOIs and titles."""
+    calls = []
+
+    def fake_get(url, params=None):
+        calls.append(params)
+        return _Response({"message": {"items": []}})
+
+    monkeypatch.setattr("wenxian.feeder.crossref.SESSION.get", fake_get)
+    assert Crossref().search_title("Example") == []
+    assert calls[0]["select"] == "DOI,title"
+    assert calls[0]["mailto"] == __email__
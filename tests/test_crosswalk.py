@@ -0,0 +1,66 @@
+"""Tests for the identifier crosswalk."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from benchmarks.replay import corpus
+from wenxian.cache import Crosswalk, set_crosswalk
+from wenxian.feeder.pubmed import Pubmed
+from wenxian.feeder.semanticscholar import Semanticscholar
+from wenxian.from_identifier import _rank_title_candidates
+from wenxian.testing import MockServer
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.fixture
+def crosswalk(tmp_path: Path):
+    """Install a disk-backed crosswalk for one test."""
+    crosswalk = Crosswalk(tmp_path / "responses.sqlite")
+    previous = set_crosswalk(crosswalk)
+    yield crosswalk
+    set_crosswalk(previous)
+    crosswalk.close()
+
+
+def test_link(crosswalk: Crosswalk):
+    """Test identifiers are normalized and links are merged."""
+    crosswalk.link(doi="10.5555/ABC", arxiv="2401.00001v2")
+    crosswalk.link(arxiv="2401.00001", pmid="0042", pmcid="7")
+    crosswalk.link(doi="10.5555/lonely")
+    expected = {
+        "doi": "10.5555/ABC",
+        "arxiv": "2401.00001",
+        "pmid": "42",
+        "pmcid": "PMC7",
+    }
+    assert crosswalk.identifiers("doi", "10.5555/abc") == expected
+    assert crosswalk.identifiers("pmid", 42) == expected
+    assert crosswalk.identifiers("arxiv", "2401.00001v1") == expected
+    assert Crosswalk(crosswalk.path).identifiers("pmcid", "pmc7") == expected
+    assert crosswalk.identifiers("doi", "10.5555/lonely") == {}
+
+
+def test_pubmed_skips_known_conversions(crosswalk: Crosswalk):
+    """Test PubMed looks a DOI up by its linked PMID without idconv."""
+    pubmed = Pubmed()
+    with MockServer(corpus(1)).install() as server:
+        reference = pubmed.from_doi("10.5555/wenxian.0")
+        assert sum(server.conditions.statuses.values()) == 2
+        assert crosswalk.identifiers("doi", "10.5555/wenxian.0")["pmid"]
+        assert pubmed.from_doi("10.5555/wenxian.0") == reference
+        assert sum(server.conditions.statuses.values()) == 3
+
+
+def test_title_hits_are_linked(crosswalk: Crosswalk):
+    """Test search hits are linked and candidates of one work are merged."""
+    Semanticscholar._candidates_from_title_data(
+        {"data": [{"externalIds": {"DOI": "10.5555/x", "ArXiv": "2401.00001"}}]}
+    )
+    candidates = [[("2401.00001", "A title")], [("10.5555/X", "A title")]]
+    assert _rank_title_candidates("A title", candidates) == ["10.5555/x"]
+    assert _rank_title_candidates("A title", candidates[::-1]) == ["10.5555/X"]
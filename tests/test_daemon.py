@@ -0,0 +1,161 @@
+"""Tests for the lookup daemon."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import socket
+import stat
+import threading
+from pathlib import Path
+
+import pytest
+
+from benchmarks.replay import corpus
+from wenxian import daemon
+from wenxian.__main__ import cmd_from
+from wenxian.sources import PROFILES, select_sources
+from wenxian.testing import MockServer
+
+
+@pytest.fixture
+def address(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Run a daemon on a temporary socket against the mock server."""
+    address = f"unix:{tmp_path / 'wenxian.sock'}"
+    monkeypatch.setenv("WENXIAN_DAEMON", address)
+    with MockServer(corpus(2)).install():
+        server = daemon.make_server()
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield address
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+def test_default_address(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Test the address comes from the environment or the runtime directory."""
+    monkeypatch.setenv("WENXIAN_DAEMON", "http://127.0.0.1:1")
+    assert daemon.default_address() == "http://127.0.0.1:1"
+    monkeypatch.delenv("WENXIAN_DAEMON")
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    assert daemon.default_address().startswith(f"unix:{tmp_path}")
+    assert not daemon.ping()
+
+
+def test_batch_lookup(address: str):
+    """Test a batch resolves in order with errors reported per identifier."""
+    assert daemon.ping(address)
+    with pytest.raises(RuntimeError, match="already running"):
+        daemon.make_server(address)
+    results = daemon.lookup(
+        ["10.5555/wenxian.1", "10.5555/missing", "10.5555/wenxian.0"], "markdown"
+    )
+    assert results is not None
+    assert [result["identifier"] for result in results] == [
+        "10.5555/wenxian.1",
+        "10.5555/missing",
+        "10.5555/wenxian.0",
+    ]
+    assert results[0]["reference"]["doi"] == "10.5555/wenxian.1"
+    assert "badge.dimensions.ai" in results[0]["rendered"]
+    assert results[1]["rendered"] is None
+    with pytest.raises(ValueError, match="Unknown output type"):
+        daemon.lookup(["10.5555/wenxian.0"], "html")
+
+
+def test_single_lookup_and_metrics(address: str):
+    """Test the GET endpoints."""
+    connection = daemon._connection(address, 5)
+    connection.request("GET", "/lookup?id=10.5555/wenxian.0")
+    data = json.loads(connection.getresponse().read())
+    assert data["results"][0]["rendered"].startswith("@Article")
+    connection.request("GET", "/metrics")
+    assert b"wenxian_" in connection.getresponse().read()
+    connection.close()
+
+
+def test_cli_uses_daemon(address: str, tmp_path: Path, monkeypatch):
+    """Test ``wenxian from`` writes what the daemon rendered."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        "wenxian.__main__._async_cmd_from",
+        lambda **kwargs: pytest.fail("resolved in-process"),
+    )
+    cmd_from(IDENTIFIER=["10.5555/wenxian.0"], output=0)
+    (output,) = tmp_path.glob("*.bib")
+    assert "10.5555/wenxian.0" in output.read_text()
+    with pytest.raises(ValueError, match=r"Failed to fetch reference from 10\.5555/x"):
+        cmd_from(IDENTIFIER=["10.5555/x"])
+
+
+def test_cli_sends_its_sources(address: str, monkeypatch):
+    """Test the daemon consults the sources selected by the client."""
+    requested = []
+    resolve = daemon.resolve
+
+    def spy(identifiers, output_type="bibtex", fields=None, sources=None):
+        requested.append(sources)
+        return resolve(identifiers, output_type, fields, sources)
+
+    monkeypatch.setattr(daemon, "resolve", spy)
+    with select_sources("physics"):
+        cmd_from(IDENTIFIER=["10.5555/wenxian.0"])
+    cmd_from(IDENTIFIER=["10.5555/wenxian.0"], sources="fast")
+    assert requested == [list(PROFILES["physics"]), list(PROFILES["fast"])]
+
+
+def test_socket_is_private(address: str):
+    """Test only the owner may connect to the daemon socket."""
+    path = Path(address.removeprefix("unix:"))
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
+
+
+def test_cli_falls_back_from_wedged_daemon(
+    address: str, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """Test ``wenxian from`` resolves in-process when the daemon hangs."""
+    release = threading.Event()
+
+    async def wedged(*args, **kwargs):
+        await asyncio.to_thread(release.wait, 10)
+        return []
+
+    monkeypatch.setattr(daemon, "resolve", wedged)
+    monkeypatch.setattr(daemon, "CONNECT_TIMEOUT", 0.2)
+    monkeypatch.setattr(daemon, "IDENTIFIER_TIMEOUT", 0.1)
+    monkeypatch.chdir(tmp_path)
+    try:
+        with pytest.raises(TimeoutError):
+            daemon.lookup(["10.5555/wenxian.0"])
+        cmd_from(IDENTIFIER=["10.5555/wenxian.0"], output=0)
+    finally:
+        release.set()
+    (output,) = tmp_path.glob("*.bib")
+    assert "10.5555/wenxian.0" in output.read_text()
+
+
+def test_sockets_of_other_users_are_ignored(
+    address: str, monkeypatch: pytest.MonkeyPatch
+):
+    """Test clients do not trust a socket another user created."""
+    assert daemon.ping(address)
+    uid = os.getuid()
+    monkeypatch.setattr(os, "getuid", lambda: uid + 1)
+    assert not daemon.ping(address)
+    assert daemon.lookup(["10.5555/wenxian.0"]) is None
+
+
+def test_tcp_fallback_needs_explicit_address(monkeypatch: pytest.MonkeyPatch):
+    """Test clients only connect to the default TCP port when told to."""
+    monkeypatch.delattr(socket, "AF_UNIX")
+    monkeypatch.delenv("WENXIAN_DAEMON", raising=False)
+    monkeypatch.setattr(
+        daemon, "ping", lambda *args, **kwargs: pytest.fail("connected")
+    )
+    assert daemon.default_address() == f"http://127.0.0.1:{daemon.DEFAULT_PORT}"
+    assert daemon.lookup(["10.5555/wenxian.0"]) is None
+    monkeypatch.setenv("WENXIAN_DAEMON", "http://127.0.0.1:1")
+    assert daemon._client_address() == "http://127.0.0.1:1"
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import json
+
 from wenxian.feeder.datacite import Datacite
 from wenxian.reference import Author, Reference
 
@@ -9,6 +11,11 @@ from wenxian.reference import Author, Reference
 class _Response:
     status_code = 200
 
+    @property
+    def content(self):
+        """Return the encoded response body."""
+        return json.dumps(self.json()).encode()
+
     def json(self):
         """Return a minimal DataCite response."""
         return {
@@ -36,6 +43,11 @@ class _NotFoundResponse:
 class _EmptyResponse:
     status_code = 200
 
+    @property
+    def content(self):
+        """Return the encoded response body."""
+        return json.dumps(self.json()).encode()
+
     def json(self):
         """Return a DataCite response without DOI attributes."""
         return {"data": {}}
@@ -0,0 +1,66 @@
+"""Tests for the service endpoint registry."""
+
+from __future__ import annotations
+
+import pytest
+
+from benchmarks.replay import corpus
+from wenxian.feeder import session
+from wenxian.feeder.crossref import Crossref
+from wenxian.feeder.endpoints import DEFAULT_ENDPOINTS, endpoint, set_endpoint
+from wenxian.feeder.pubmed import Pubmed
+from wenxian.testing import MockServer
+
+
+@pytest.fixture
+def restore_endpoints():
+    """Restore the public endpoints after a test."""
+    yield
+    for service in DEFAULT_ENDPOINTS:
+        set_endpoint(service, None)
+
+
+@pytest.mark.usefixtures("restore_endpoints")
+def test_feeder_urls_follow_overrides():
+    """Test feeder URLs are resolved from the registry at request time."""
+    assert Pubmed.EFETCH_URL == (
+        "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
+    )
+    set_endpoint("eutils", "http://proxy.test/eutils/")
+    assert endpoint("eutils") == "http://proxy.test/eutils"
+    assert Pubmed.EFETCH_URL == "http://proxy.test/eutils/efetch.fcgi"
+    assert Pubmed().ESEARCH_URL == "http://proxy.test/eutils/esearch.fcgi"
+    set_endpoint("eutils", None)
+    assert Pubmed.EFETCH_URL.startswith("https://eutils.ncbi.nlm.nih.gov/")
+
+
+def test_unknown_service():
+    """Test unknown services are rejected."""
+    with pytest.raises(ValueError, match="Unknown service"):
+        endpoint("example")
+    with pytest.raises(ValueError, match="Unknown service"):
+        set_endpoint("example", "http://proxy.test")
+
+
+@pytest.mark.usefixtures("restore_endpoints")
+def test_limiters_follow_overrides():
+    """Test the service rate limiter is mounted under the overridden URL."""
+    limiter = session.SESSION.get_adapter("https://api.crossref.org/works")
+    set_endpoint("crossref", "http://proxy.test/crossref")
+    assert session.SESSION.get_adapter("http://proxy.test/crossref/works") is limiter
+    assert session.SESSION.get_adapter("https://api.crossref.org/works") is not limiter
+    set_endpoint("crossref", None)
+    assert session.SESSION.get_adapter("https://api.crossref.org/works") is limiter
+    assert "http://proxy.test/crossref/" not in session.SESSION.adapters
+
+
+@pytest.mark.usefixtures("restore_endpoints")
+def test_lookup_through_proxy():
+    """Test a feeder resolves through an overridden endpoint."""
+    records = corpus(1)
+    with MockServer(records) as server:
+        set_endpoint("crossref", f"{server.url}/api.crossref.org")
+        reference = Crossref().from_doi("10.5555/wenxian.0")
+    assert reference is not None
+    assert reference.title == records.title(0)
+    assert server.conditions.statuses[200] == 1
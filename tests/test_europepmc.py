@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import json
+
 from wenxian.feeder.europepmc import Europepmc
 from wenxian.reference import Author, Reference
 
@@ -9,6 +11,11 @@ from wenxian.reference import Author, Reference
 class _Response:
     status_code = 200
 
+    @property
+    def content(self):
+        """Return the encoded response body."""
+        return json.dumps(self.json()).encode()
+
     def json(self):
         """Return a minimal Europe PMC response."""
         return {
@@ -41,6 +48,11 @@ class _NotFoundResponse:
 class _EmptyResponse:
     status_code = 200
 
+    @property
+    def content(self):
+        """Return the encoded response body."""
+        return json.dumps(self.json()).encode()
+
     def json(self):
         """Return a Europe PMC response without results."""
         return {"resultList": {"result": []}}
@@ -0,0 +1,180 @@
+"""Tests for field-driven lookups."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+from benchmarks.replay import corpus
+from wenxian.__main__ import cmd_from, main_parser
+from wenxian.feeder.crossref import Crossref
+from wenxian.feeder.semanticscholar import Semanticscholar
+from wenxian.fields import (
+    FIELDS,
+    OUTPUT_FIELDS,
+    is_complete,
+    parse_fields,
+    request_fields,
+    requested_fields,
+    restrict,
+)
+from wenxian.from_identifier import (
+    _async_fetch_and_merge,
+    _fetch_and_merge,
+    from_identifiers,
+)
+from wenxian.reference import Author, Reference
+from wenxian.testing import MockServer
+
+COMPLETE = Reference(
+    author=[Author("A.", "Author")],
+    title="Title",
+    journal="Journal",
+    year=2024,
+    volume=1,
+    issue=2,
+    pages=(3, 4),
+    annote="Abstract",
+    doi="10.5555/x",
+)
+
+
+def test_parse_fields():
+    """Test field names, aliases and unknown fields."""
+    assert parse_fields("title, Abstract,authors") == {"title", "annote", "author"}
+    assert parse_fields(["number"]) == {"issue"}
+    with pytest.raises(ValueError, match="Unknown field"):
+        parse_fields("title,citations")
+
+
+def test_request_fields():
+    """Test requested fields are scoped to a context and drive completeness."""
+    reference = restrict(COMPLETE, FIELDS - {"annote"})
+    assert reference.annote is None
+    assert restrict(COMPLETE, FIELDS) is COMPLETE
+    assert is_complete(COMPLETE)
+    assert not is_complete(reference)
+    with request_fields(OUTPUT_FIELDS["markdown"]) as fields:
+        assert requested_fields() == fields
+        assert is_complete(reference)
+    assert requested_fields() == FIELDS
+
+
+def test_lighter_payloads():
+    """Test abstracts are only requested when needed."""
+    assert "abstract" in Crossref()._doi_request("10.5555/x")[1]["select"]
+    assert "abstract" in Semanticscholar._paper_fields()
+    with request_fields(OUTPUT_FIELDS["text"]):
+        assert "abstract" not in Crossref()._doi_request("10.5555/x")[1]["select"]
+        assert "abstract" not in Semanticscholar._paper_fields()
+
+
+def test_merging_stops_once_fields_are_filled():
+    """Test lower-priority sources are not waited for once fields are filled."""
+    release = threading.Event()
+
+    def slow(doi):
+        release.wait(10)
+        return Reference(title="Slow")
+
+    try:
+        with request_fields(OUTPUT_FIELDS["markdown"]):
+            merged = _fetch_and_merge(
+                (("First", lambda doi: COMPLETE, "x"), ("Slow", slow, "x"))
+            )
+        assert merged == COMPLETE
+        assert not release.is_set()
+    finally:
+        release.set()
+
+
+def test_merging_replaces_empty_values():
+    """Test empty values are merged from lower-priority sources."""
+    empty = Reference(
+        author=[],
+        title="Title",
+        journal="Journal",
+        year=2024,
+        volume=1,
+        issue=2,
+        pages="",
+        annote="Abstract",
+        doi="10.5555/x",
+    )
+    assert not is_complete(empty)
+    merged = _fetch_and_merge(
+        (("First", lambda doi: empty, "x"), ("Second", lambda doi: COMPLETE, "x"))
+    )
+    assert merged == empty | COMPLETE == COMPLETE
+
+    async def first(doi):
+        return empty
+
+    async def second(doi):
+        return COMPLETE
+
+    merged = asyncio.run(
+        _async_fetch_and_merge((("First", first), ("Second", second)), "x")
+    )
+    assert merged == COMPLETE
+
+
+def test_async_merging_stops_once_fields_are_filled():
+    """Test lower-priority lookups are cancelled once fields are filled."""
+    cancelled = False
+
+    async def first(doi):
+        return COMPLETE
+
+    async def slow(doi):
+        nonlocal cancelled
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+
+    async def merge():
+        return await _async_fetch_and_merge((("First", first), ("Slow", slow)), "x")
+
+    assert asyncio.run(asyncio.wait_for(merge(), 5)) == COMPLETE
+    assert cancelled
+
+
+def test_worker_threads_see_fields(monkeypatch: pytest.MonkeyPatch):
+    """Test lookups in worker threads see the requested fields."""
+    seen = []
+
+    def fake(identifier):
+        seen.append(requested_fields())
+        return COMPLETE
+
+    monkeypatch.setattr("wenxian.from_identifier.from_identifier", fake)
+    assert dict(from_identifiers(["x"], fields=["title"])) == {"x": COMPLETE}
+    with request_fields(["doi"]):
+        assert dict(from_identifiers(["x"])) == {"x": COMPLETE}
+        _fetch_and_merge((("Fake", fake, "x"),))
+    assert seen == [{"title"}, {"doi"}, {"doi"}]
+
+
+def test_cli_no_abstract(capsys):
+    """Test ``--no-abstract`` and ``--fields`` narrow the BibTeX output."""
+    args = main_parser().parse_args(
+        ["from", "10.5555/wenxian.0", "--fields", "title,doi", "--no-abstract"]
+    )
+    assert args.fields == "title,doi"
+    assert args.no_abstract
+    with MockServer(corpus(1)).install():
+        cmd_from(IDENTIFIER=["10.5555/wenxian.0"], daemon=False)
+        full = capsys.readouterr().out
+        cmd_from(IDENTIFIER=["10.5555/wenxian.0"], daemon=False, no_abstract=True)
+        light = capsys.readouterr().out
+        cmd_from(IDENTIFIER=["10.5555/wenxian.0"], daemon=False, fields="title")
+        titled = capsys.readouterr().out
+    assert "abstract" in full
+    assert "abstract" not in light
+    assert "number" not in titled
+    assert "doi" not in titled
+    assert "journal" in titled
@@ -0,0 +1,45 @@
+"""Tests for the shared JSON decoding hook."""
+
+from __future__ import annotations
+
+import json
+import sys
+
+import pytest
+
+from wenxian.feeder import session
+
+
+class _Response:
+    """Minimal response carrying a raw body."""
+
+    def __init__(self, content: bytes):
+        self.content = content
+
+
+def test_decode_json_reads_response_body():
+    """Test responses are decoded from their raw bytes."""
+    body = {"message": {"title": ["Schrödinger"], "volume": "12"}}
+    content = json.dumps(body, ensure_ascii=False).encode()
+    assert session.decode_json(_Response(content)) == body
+    with pytest.raises(ValueError):
+        session.decode_json(_Response(b"<html>busy</html>"))
+    with pytest.raises(ValueError):
+        session.decode_json(_Response(b""))
+
+
+def test_fast_decoder_is_preferred_when_installed():
+    """Test orjson is used when it can be imported."""
+    orjson = pytest.importorskip("orjson")
+    assert session._json_loads() is orjson.loads
+
+
+def test_stdlib_fallback(monkeypatch):
+    """Test the standard library is used without optional decoders or in Pyodide."""
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    monkeypatch.setitem(sys.modules, "msgspec", None)
+    assert session._json_loads() is json.loads
+
+    monkeypatch.undo()
+    monkeypatch.setattr(session.sys, "platform", "emscripten")
+    assert session._json_loads() is json.loads
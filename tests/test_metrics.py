@@ -0,0 +1,113 @@
+"""Tests for the request and lookup metrics."""
+
+from __future__ import annotations
+
+import pytest
+
+from benchmarks.replay import Recording, corpus
+from wenxian.__main__ import cmd_from
+from wenxian.feeder.session import SESSION
+from wenxian.from_identifier import from_identifier
+from wenxian.metrics import METRICS, Histogram, Metrics
+from wenxian.reference import Reference
+from wenxian.testing import Conditions, MockServer
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    """Start every test with empty metrics."""
+    METRICS.reset()
+    yield
+    METRICS.reset()
+
+
+def test_histogram_quantiles():
+    """Test quantiles are reported as bucket upper bounds."""
+    histogram = Histogram()
+    assert histogram.quantile(0.5) != histogram.quantile(0.5)
+    for seconds in (0.001, 0.02, 0.02, 0.3):
+        histogram.observe(seconds)
+    assert histogram.count == 4
+    assert histogram.quantile(0.5) == 0.025
+    assert histogram.quantile(1.0) == 0.5
+    histogram.observe(60)
+    assert histogram.quantile(1.0) == float("inf")
+
+
+def test_merge_attribution():
+    """Test each merged field is credited to the first source that has it."""
+    metrics = Metrics()
+    metrics.record_merge(
+        [
+            ("A", Reference(title="t", year=2020)),
+            ("B", None),
+            ("C", Reference(title="u", journal="j", year=2021)),
+        ]
+    )
+    assert metrics.sources["A"].fields == {"title": 1, "year": 1}
+    assert metrics.sources["C"].fields == {"journal": 1}
+    assert "B" not in metrics.sources
+
+
+def test_lookup_metrics():
+    """Test a lookup records services, sources and merged fields."""
+    records = corpus(1)
+    with MockServer(records).install():
+        reference = from_identifier("10.5555/wenxian.0")
+    assert reference is not None
+    crossref = METRICS.services["crossref"]
+    assert crossref.requests == 1
+    assert crossref.statuses == {200: 1}
+    assert crossref.bytes > 0
+    assert crossref.latency.count == 1
+    assert METRICS.sources["Crossref"].outcomes == {"hit": 1}
+    assert METRICS.sources["ChemRxiv"].outcomes == {"empty": 1}
+    assert METRICS.sources["PubMed"].fields["title"] == 1
+    assert sum(stats.fields["doi"] for stats in METRICS.sources.values()) == 1
+
+
+def test_retries_are_counted():
+    """Test requests retried after a 429 are counted once with their retries."""
+    conditions = Conditions(rate_limits={"api.crossref.org": 1}, retry_after=0)
+    responses = Recording({"api.crossref.org/works": (200, b"{}")})
+    with MockServer(responses, conditions).install():
+        for _ in range(2):
+            assert SESSION.get("https://api.crossref.org/works").status_code == 200
+    crossref = METRICS.services["crossref"]
+    assert crossref.requests == 2
+    assert crossref.statuses == {200: 2}
+    assert crossref.retries == conditions.statuses[429] > 0
+
+
+def test_prometheus_exposition():
+    """Test the Prometheus exposition lists every family with its samples."""
+    METRICS.record_request("crossref", 0.02, status=200, size=10)
+    METRICS.record_request("crossref", 0.5)
+    METRICS.record_lookup("Crossref", 0.02, "hit")
+    METRICS.record_cache("mirror", hit=False)
+    text = METRICS.prometheus()
+    assert "# TYPE wenxian_http_requests_total counter" in text
+    assert 'wenxian_http_requests_total{service="crossref",status="200"} 1' in text
+    assert 'wenxian_http_requests_total{service="crossref",status="error"} 1' in text
+    assert (
+        'wenxian_http_request_duration_seconds_bucket{service="crossref",le="0.025"} 1'
+        in text
+    )
+    assert (
+        'wenxian_http_request_duration_seconds_bucket{service="crossref",le="+Inf"} 2'
+        in text
+    )
+    assert 'wenxian_lookups_total{source="Crossref",outcome="hit"} 1' in text
+    assert 'wenxian_cache_requests_total{cache="mirror",result="miss"} 1' in text
+    for line in text.splitlines():
+        assert line.startswith("#") or line.startswith("wenxian_")
+
+
+def test_cli_stats(capsys):
+    """Test ``--stats`` prints the summary to stderr."""
+    with MockServer(corpus(1)).install():
+        cmd_from(IDENTIFIER=["10.5555/wenxian.0"], stats=True)
+    captured = capsys.readouterr()
+    assert "@Article" in captured.out
+    assert "crossref" in captured.err
+    assert "Semantic Scholar" in captured.err
@@ -0,0 +1,171 @@
+"""Tests for the local offline mirror."""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+
+import wenxian.from_identifier as identifier_module
+from wenxian.__main__ import main_parser
+from wenxian.feeder.mirror import Mirror
+from wenxian.mirror import build, lookup
+from wenxian.reference import Author, BibtexType, Reference
+from wenxian.serialization import dumps, loads
+
+from .cases import TEST_CASES
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+CROSSREF_ITEMS = [
+    {
+        "DOI": "10.1234/Crossref",
+        "title": ["Crossref paper"],
+        "author": [{"given": "Ada", "family": "Lovelace"}],
+        "container-title": ["Journal of Tests"],
+        "published-print": {"date-parts": [[2024, 1]]},
+        "volume": "3",
+        "page": "10-20",
+        "type": "journal-article",
+    },
+    {
+        "DOI": "10.1234/both",
+        "title": ["Shared paper"],
+        "container-title": ["Journal of Tests"],
+        "published-online": {"date-parts": [[2023]]},
+        "volume": "7",
+        "type": "proceedings-article",
+    },
+]
+
+PUBMED_XML = b"""<?xml version="1.0"?>
+<PubmedArticleSet>
+<PubmedArticle>
+  <MedlineCitation><PMID>123</PMID><Article>
+    <Journal><Title>Journal of Tests</Title>
+    <JournalIssue><PubDate><Year>2023</Year></PubDate></JournalIssue></Journal>
+    <ArticleTitle>Shared paper.</ArticleTitle>
+    <Abstract><AbstractText>PubMed abstract</AbstractText></Abstract>
+    <AuthorList><Author><LastName>Curie</LastName><ForeName>Marie</ForeName></Author></AuthorList>
+  </Article></MedlineCitation>
+  <PubmedData><ArticleIdList>
+    <ArticleId IdType="doi">10.1234/both</ArticleId>
+  </ArticleIdList></PubmedData>
+</PubmedArticle>
+<PubmedArticle>
+  <MedlineCitation><PMID>456</PMID><Article>
+    <Journal><Title>Other Journal</Title></Journal>
+    <ArticleTitle>PubMed only.</ArticleTitle>
+  </Article></MedlineCitation>
+</PubmedArticle>
+</PubmedArticleSet>
+"""
+
+
+@pytest.fixture
+def dumps_dir(tmp_path: Path) -> list[Path]:
+    """Write a small set of Crossref and PubMed dump files."""
+    crossref = tmp_path / "0.json.gz"
+    with gzip.open(crossref, "wt", encoding="utf-8") as f:
+        json.dump({"items": CROSSREF_ITEMS[:1]}, f)
+    crossref_lines = tmp_path / "1.jsonl"
+    crossref_lines.write_text(
+        "\n".join(json.dumps(item) for item in CROSSREF_ITEMS[1:]), encoding="utf-8"
+    )
+    pubmed = tmp_path / "pubmed.xml.gz"
+    with gzip.open(pubmed, "wb") as f:
+        f.write(PUBMED_XML)
+    return [crossref, crossref_lines, pubmed]
+
+
+@pytest.mark.parametrize("case", TEST_CASES)
+def test_serialization_round_trip(case):
+    """Test mirrored references survive serialization unchanged."""
+    assert loads(dumps(case.reference)) == case.reference
+
+
+def test_build_and_lookup(tmp_path: Path, dumps_dir: list[Path]):
+    """Test dumps are ingested and merged in online source priority."""
+    database = tmp_path / "mirror.sqlite"
+    assert build(database, dumps_dir, jobs=1) == 5
+
+    assert lookup(database, "doi", "10.1234/crossref") == Reference(
+        author=[Author(first="Ada", last="Lovelace")],
+        title="Crossref paper",
+        journal="Journal of Tests",
+        year=2024,
+        volume=3,
+        pages=(10, 20),
+        doi="10.1234/Crossref",
+    )
+    assert lookup(database, "doi", "10.1234/BOTH") == Reference(
+        author=[Author(first="Marie", last="Curie")],
+        title="Shared paper",
+        journal="Journal of Tests",
+        year=2023,
+        volume=7,
+        annote="PubMed abstract",
+        doi="10.1234/both",
+        type=BibtexType.article,
+    )
+    assert lookup(database, "pmid", 456).title == "PubMed only"
+    assert lookup(database, "pmid", "789") is None
+
+
+def test_build_resumes_and_runs_in_parallel(tmp_path: Path, dumps_dir: list[Path]):
+    """Test completed dumps are skipped and parallel ingestion is equivalent."""
+    database = tmp_path / "mirror.sqlite"
+    assert build(database, dumps_dir[:1], jobs=1) == 1
+    assert build(database, dumps_dir, jobs=2) == 4
+    assert build(database, dumps_dir, jobs=2) == 0
+    assert lookup(database, "pmid", "123").doi == "10.1234/both"
+
+
+def test_mirror_short_circuits_online_sources(
+    tmp_path: Path, dumps_dir: list[Path], monkeypatch
+):
+    """Test mirrored identifiers never reach the online feeders."""
+    database = tmp_path / "mirror.sqlite"
+    build(database, dumps_dir, jobs=1)
+    monkeypatch.setattr(Mirror, "PATH", str(database))
+
+    def forbidden(self, identifier):
+        raise AssertionError("online source should not be queried")
+
+    async def async_forbidden(self, identifier):
+        raise AssertionError("online source should not be queried")
+
+    for feeder in ("Pubmed", "Crossref", "Arxiv", "Chemrxiv", "Semanticscholar"):
+        cls = getattr(identifier_module, feeder)
+        monkeypatch.setattr(cls, "from_doi", forbidden)
+        monkeypatch.setattr(cls, "async_from_doi", async_forbidden)
+    monkeypatch.setattr(identifier_module.Pubmed, "from_pmid", forbidden)
+    monkeypatch.setattr(identifier_module.Pubmed, "async_from_pmid", async_forbidden)
+
+    assert identifier_module.from_doi("10.1234/crossref").title == "Crossref paper"
+    assert (
+        asyncio.run(identifier_module.async_from_doi("10.1234/both")).title
+        == "Shared paper"
+    )
+    assert identifier_module.from_pmid("456").title == "PubMed only"
+    assert asyncio.run(identifier_module.async_from_pmid(123)).doi == "10.1234/both"
+
+
+def test_missing_mirror_is_a_miss(tmp_path: Path, monkeypatch):
+    """Test an unreadable mirror does not abort online lookups."""
+    monkeypatch.setattr(Mirror, "PATH", str(tmp_path / "missing.sqlite"))
+    assert Mirror().from_doi("10.1234/example") is None
+
+
+def test_mirror_build_cli_arguments():
+    """Test the mirror subcommand parses its arguments."""
+    args = main_parser().parse_args(
+        ["mirror", "build", "mirror.sqlite", "a.json.gz", "b.xml.gz", "-j", "4"]
+    )
+    assert args.DATABASE == "mirror.sqlite"
+    assert args.DUMP == ["a.json.gz", "b.xml.gz"]
+    assert args.jobs == 4
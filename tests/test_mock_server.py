@@ -0,0 +1,63 @@
+"""Tests for the loopback mock server."""
+
+from __future__ import annotations
+
+import asyncio
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+from benchmarks.replay import Recording, corpus
+from wenxian.feeder import session
+from wenxian.from_identifier import async_from_identifier, from_identifier
+from wenxian.testing import Conditions, MockServer
+
+
+@pytest.mark.parametrize("kind", ["doi", "pmid", "arxiv", "title"])
+def test_mock_server_resolves_identifiers(kind):
+    """Test lookups resolve end to end through the loopback server."""
+    records = corpus(3)
+    identifier = records.identifiers(kind, 3)[2]
+    with MockServer(records).install() as server:
+        reference = from_identifier(identifier)
+    assert reference.title == records.title(2)
+    assert reference.author
+    assert server.conditions.statuses[200] > 0
+
+
+def test_mock_server_async_lookup():
+    """Test the async lookup path follows the base URL override."""
+    records = corpus(1)
+    with MockServer(records).install():
+        reference = asyncio.run(async_from_identifier("10.5555/wenxian.0"))
+    assert reference.doi == "10.5555/wenxian.0"
+
+
+def test_mock_server_rate_limits_per_client():
+    """Test requests over the per-client limit get 429 and Retry-After."""
+    conditions = Conditions(rate_limits={"example.test": 1}, retry_after=7)
+    with MockServer(Recording({"example.test/a": (200, b"ok")}), conditions) as server:
+        with urlopen(f"{server.url}/example.test/a") as response:
+            assert response.read() == b"ok"
+        with pytest.raises(HTTPError) as excinfo:
+            urlopen(f"{server.url}/example.test/a")
+    assert excinfo.value.code == 429
+    assert excinfo.value.headers["Retry-After"] == "7"
+    assert conditions.statuses == {200: 1, 429: 1}
+
+
+def test_set_base_url_moves_adapters():
+    """Test the service adapters are mounted under the base URL and restored."""
+    crossref = session.SESSION.get_adapter("https://api.crossref.org/works")
+    with MockServer(Recording()).install() as server:
+        assert session.BASE_URL == server.url
+        assert (
+            session.SESSION.get_adapter(f"{server.url}/api.crossref.org/works")
+            is crossref
+        )
+        assert (
+            session.SESSION.get(f"https://example.test/{id(server)}").status_code == 404
+        )
+    assert session.BASE_URL is None
+    assert not any(prefix.startswith(server.url) for prefix in session.SESSION.adapters)
@@ -0,0 +1,62 @@
+"""Tests for connection pool sizing."""
+
+from __future__ import annotations
+
+import logging
+import socket
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from benchmarks.replay import Recording
+from wenxian.feeder import session
+from wenxian.metrics import METRICS
+from wenxian.testing import Conditions, MockServer
+
+
+@pytest.fixture(autouse=True)
+def restore_pools():
+    """Restore the default pools and empty metrics after each test."""
+    METRICS.reset()
+    yield
+    session.configure_pools()
+    METRICS.reset()
+
+
+def test_pools_are_sized_from_concurrency():
+    """Test pools follow the concurrency, service limits and overrides."""
+    session.configure_pools(24, sizes={"datacite": 40})
+    assert session.CONCURRENCY == 24
+    assert session.adapter_crossref._pool_maxsize == 24
+    assert session.adapter_arxiv._pool_maxsize == session.POOL_LIMITS["arxiv"]
+    assert session._DEFAULT_ADAPTER._pool_maxsize == 40
+
+
+def test_keepalive_socket_options():
+    """Test TCP keep-alive is enabled unless disabled."""
+    keepalive = (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    assert keepalive in session._socket_options(30)
+    assert keepalive not in session._socket_options(None)
+
+
+def test_concurrent_requests_reuse_connections(caplog: pytest.LogCaptureFixture):
+    """Test concurrent requests stay within the pool and reuse its connections."""
+    session.configure_pools(16)
+    responses = Recording({"example.test/a": (200, b"ok")})
+    with (
+        MockServer(responses, Conditions(latency=0.02)).install(),
+        ThreadPoolExecutor(16) as executor,
+        caplog.at_level(logging.WARNING, logger="urllib3"),
+    ):
+        statuses = list(
+            executor.map(
+                lambda _: session.SESSION.get("https://example.test/a").status_code,
+                range(64),
+            )
+        )
+    assert statuses == [200] * 64
+    assert "Connection pool is full" not in caplog.text
+    (counts,) = METRICS.connections.values()
+    assert 0 < counts["connections"] <= 16
+    assert counts["handshakes"] == 0
+    assert "wenxian_connections_total" in METRICS.prometheus()
@@ -0,0 +1,70 @@
+"""Tests for the profiling mode."""
+
+from __future__ import annotations
+
+import json
+import pstats
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+import pytest
+
+from benchmarks.replay import corpus
+from wenxian.__main__ import cmd_from
+from wenxian.profiling import Profiler, categorize
+from wenxian.testing import MockServer
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.mark.parametrize(
+    ("filename", "function", "category"),
+    [
+        ("<frozen importlib._bootstrap>", "_find_and_load", "import"),
+        ("~", "<method 'recv_into' of '_socket.socket' objects>", "network"),
+        ("/lib/site-packages/urllib3/response.py", "read", "network"),
+        ("~", "<built-in method time.sleep>", "waits"),
+        ("~", "<method 'Parse' of 'pyexpat.xmlparser' objects>", "XML/JSON parsing"),
+        ("~", "<built-in method orjson.loads>", "XML/JSON parsing"),
+        ("/lib/python3.11/json/decoder.py", "decode", "XML/JSON parsing"),
+        ("/site-packages/pylatexenc/latexencode/x.py", "f", "LaTeX encoding"),
+        ("C:\\site-packages\\pyiso4\\ltwa.py", "__call__", "journal abbreviation"),
+        ("/src/wenxian/reference.py", "bibtex", "wenxian"),
+        ("~", "<built-in method builtins.len>", "other"),
+    ],
+)
+def test_categorize(filename, function, category):
+    """Test profiled functions are attributed to their stage."""
+    assert categorize(filename, function) == category
+
+
+def test_profiler_covers_worker_threads():
+    """Test functions running in threads started while profiling are counted."""
+
+    def work():
+        time.sleep(0.05)
+        return json.loads("[1]")
+
+    with Profiler() as profiler, ThreadPoolExecutor(2) as executor:
+        assert list(executor.map(lambda _: work(), range(2))) == [[1], [1]]
+    categories = profiler.categories()
+    if sys.version_info < (3, 12):
+        assert categories["waits"] >= 0.09
+        assert "XML/JSON parsing" in categories
+    assert "category" in profiler.report()
+
+
+def test_cli_profile(tmp_path: Path):
+    """Test ``--profile FILE`` writes a report or raw statistics."""
+    report = tmp_path / "profile.txt"
+    raw = tmp_path / "profile.prof"
+    with MockServer(corpus(1)).install():
+        cmd_from(IDENTIFIER=["10.5555/wenxian.0"], profile=str(report))
+        cmd_from(IDENTIFIER=["10.5555/wenxian.0"], profile=str(raw))
+    text = report.read_text()
+    assert "LaTeX encoding" in text
+    assert "Ordered by: internal time" in text
+    assert pstats.Stats(str(raw)).total_calls > 0
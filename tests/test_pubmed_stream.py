@@ -0,0 +1,80 @@
+"""Tests for the streaming PubMed XML extractor."""
+
+from __future__ import annotations
+
+from io import BytesIO
+
+from wenxian.feeder.pubmed import Pubmed
+from wenxian.reference import Author
+
+
+def _article(pmid: int, doi: str, title: str) -> str:
+    return f"""
+  <PubmedArticle>
+    <MedlineCitation>
+      <PMID Version="1">{pmid}</PMID>
+      <Article>
+        <Journal>
+          <JournalIssue>
+            <Volume>{pmid}</Volume>
+            <Issue>2</Issue>
+            <PubDate><Year>2020</Year></PubDate>
+          </JournalIssue>
+          <Title>Physical chemistry chemical physics : PCCP</Title>
+        </Journal>
+        <ArticleTitle>{title}.</ArticleTitle>
+        <ELocationID EIdType="doi">{doi}</ELocationID>
+        <ELocationID EIdType="pii">e{pmid}</ELocationID>
+        <AuthorList>
+          <Author><LastName>Doe</LastName><ForeName>J A</ForeName></Author>
+          <Author><CollectiveName>The Consortium</CollectiveName></Author>
+        </AuthorList>
+      </Article>
+    </MedlineCitation>
+    <PubmedData>
+      <ArticleIdList>
+        <ArticleId IdType="pubmed">{pmid}</ArticleId>
+        <ArticleId IdType="doi">{doi}</ArticleId>
+      </ArticleIdList>
+      <ReferenceList>
+        <Reference>
+          <ArticleIdList><ArticleId IdType="doi">10.9999/cited</ArticleId></ArticleIdList>
+        </Reference>
+      </ReferenceList>
+    </PubmedData>
+  </PubmedArticle>"""
+
+
+DOCUMENT = (
+    "<PubmedArticleSet>"
+    + _article(1, "10.1234/one", "First <i>article</i>")
+    + "<DeleteCitation><PMID>9</PMID></DeleteCitation>"
+    + _article(2, "10.1234/two", "Second article")
+    + "</PubmedArticleSet>"
+).encode()
+
+
+def test_iter_articles_yields_each_article():
+    """Test every article is extracted once with its own fields."""
+    articles = list(Pubmed()._iter_articles(BytesIO(DOCUMENT)))
+    assert [pmid for pmid, _ in articles] == ["1", "2"]
+    first = articles[0][1]
+    assert first.title == "First article"
+    assert first.doi == "10.1234/one"
+    assert first.journal == "Physical chemistry chemical physics"
+    assert (first.year, first.volume, first.issue) == (2020, 1, 2)
+    assert first.pages == "e1"
+    assert first.author == [
+        Author(first="J. A.", last="Doe"),
+        Author(first="", last="The Consortium"),
+    ]
+    assert articles[1][1].doi == "10.1234/two"
+
+
+def test_from_content_uses_first_article():
+    """Test single-record parsing keeps DOI validation."""
+    feeder = Pubmed()
+    assert feeder._from_content(DOCUMENT).doi == "10.1234/one"
+    assert feeder._from_content(DOCUMENT, "10.1234/one").title == "First article"
+    assert feeder._from_content(DOCUMENT, "10.1234/two") is None
+    assert feeder._from_content(b"<PubmedArticleSet></PubmedArticleSet>") is None
@@ -0,0 +1,78 @@
+"""Tests for the offline replay benchmarks."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import pytest
+
+from benchmarks.lookups import run
+from benchmarks.replay import Recording, Transport, corpus, request_key
+from wenxian.feeder.session import SESSION
+from wenxian.from_identifier import async_from_identifier
+from wenxian.testing import Conditions
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_request_key_ignores_client_parameters():
+    """Test replay keys do not depend on parameter order or contact details."""
+    assert (
+        request_key("https://api.crossref.org/works?rows=1&mailto=a%40b&filter=doi%3Ax")
+        == "api.crossref.org/works?filter=doi%3Ax&rows=1"
+    )
+    assert request_key("https://api.datacite.org/dois/10.1%2Fa") == (
+        "api.datacite.org/dois/10.1/a"
+    )
+
+
+@pytest.mark.parametrize("kind", ["doi", "pmid", "arxiv", "title"])
+def test_corpus_resolves_every_workload(kind):
+    """Test every identifier kind resolves offline through the real feeders."""
+    records = corpus(4)
+    identifier = records.identifiers(kind, 4)[3]
+    transport = Transport(records)
+    with transport.install():
+        reference = asyncio.run(async_from_identifier(identifier))
+    assert reference.title == records.title(3)
+    assert reference.doi == (
+        "10.48550/arXiv.2401.00003" if kind == "arxiv" else "10.5555/wenxian.3"
+    )
+    assert reference.author
+    assert transport.statuses[200] > 0
+
+
+def test_transport_injects_rate_limits():
+    """Test requests over a host limit are answered with 429."""
+    transport = Transport(Recording(), Conditions(rate_limits={"example.test": 2}))
+    with transport.install():
+        statuses = [SESSION.get("https://example.test/a").status_code for _ in range(3)]
+    assert statuses == [404, 404, 429]
+
+
+def test_recording_round_trip(tmp_path: Path):
+    """Test saved recordings replay the captured responses."""
+    recording = Recording({"example.test/a?x=1": (200, "π".encode())})
+    recording.save(tmp_path / "recording.jsonl")
+    loaded = Recording.load(tmp_path / "recording.jsonl")
+    with Transport(loaded).install():
+        response = SESSION.get("https://example.test/a", params={"x": 1})
+    assert response.status_code == 200
+    assert response.text == "π"
+
+
+def test_lookup_benchmark_reports_percentiles():
+    """Test the benchmark reports every workload without missing lookups."""
+    results = run(["doi", "title"], [1, 5], latency=0.001, jitter=0.5)
+    assert [(result.workload, result.size) for result in results] == [
+        ("doi", 1),
+        ("doi", 5),
+        ("title", 1),
+        ("title", 5),
+    ]
+    for result in results:
+        assert result.missing == 0
+        assert result.throughput > 0
+        assert result.percentile(50) <= result.percentile(99)
@@ -8,6 +8,10 @@ from wenxian.feeder import session
 class _Response:
     """Minimal response returned by the patched requests session."""
 
+    raw = None
+    status_code = 200
+    content = b""
+
 
 def test_native_session_applies_default_timeout(monkeypatch):
     """Test native requests get a bounded timeout unless explicitly overridden."""
@@ -0,0 +1,84 @@
+"""Tests for title similarity engines."""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from wenxian import similarity
+from wenxian.from_identifier import _title_similarity
+from wenxian.similarity import THRESHOLD, normalize_title, title_similarity
+
+
+def test_normalize_title_removes_markup_and_folds():
+    """Test normalization strips markup, LaTeX, accents and punctuation."""
+    assert (
+        normalize_title(
+            "The <i>Schrödinger</i> equation for "
+            "<mml:math><mml:msub><mml:mi>H</mml:mi><mml:mn>2</mml:mn></mml:msub></mml:math>"
+            r" and \textit{$\alpha$-helices}: a study."
+        )
+        == "the schrodinger equation for h 2 and helices a study"
+    )
+
+
+@pytest.mark.parametrize("engine", ["difflib", "token", "rapidfuzz", "auto"])
+def test_engines_accept_matches_and_reject_unrelated(engine):
+    """Test every engine agrees on clear matches and mismatches."""
+    if engine == "rapidfuzz":
+        pytest.importorskip("rapidfuzz")
+    title = "Deep residual learning for image recognition"
+    assert title_similarity(title, title, engine) == pytest.approx(1.0)
+    assert title_similarity(title, title.upper() + ".", engine) >= THRESHOLD
+    assert (
+        title_similarity(
+            "A specific matching paper title", "A completely unrelated result", engine
+        )
+        < THRESHOLD
+    )
+
+
+def test_token_engine_ignores_markup_differences():
+    """Test the normalized engines accept titles differing only in markup."""
+    assert (
+        title_similarity(
+            "PBS: Portable Batch System",
+            "<mml:math><mml:mi>PBS:</mml:mi></mml:math> Portable Batch System",
+            "token",
+        )
+        == 1.0
+    )
+
+
+def test_engine_selection(monkeypatch):
+    """Test the configured engine is used by title validation."""
+    calls = []
+
+    def engine(title1, title2):
+        calls.append((title1, title2))
+        return 0.5
+
+    monkeypatch.setitem(similarity.ENGINES, "custom", engine)
+    monkeypatch.setattr(similarity, "ENGINE", "custom")
+    assert _title_similarity("a", "b") == 0.5
+    assert calls == [("a", "b")]
+    with pytest.raises(ValueError, match="Unknown similarity engine"):
+        title_similarity("a", "b", "missing")
+
+
+def test_default_engine_and_available_engines():
+    """Test title validation keeps difflib unless another engine is chosen."""
+    assert similarity.ENGINE == os.environ.get("WENXIAN_SIMILARITY", "difflib")
+    assert {"difflib", "token"} <= set(similarity.available_engines())
+    assert set(similarity.available_engines()) <= set(similarity.ENGINES)
+
+
+def test_similarity_benchmark_runs():
+    """Test the benchmark reports throughput and agreement for each engine."""
+    from benchmarks.similarity import run
+
+    results = run(["difflib", "token"], repeat=1)
+    assert [name for name, *_ in results] == ["difflib", "token"]
+    assert results[0][2] == 1.0
+    assert all(throughput > 0 for _, throughput, _, _ in results)
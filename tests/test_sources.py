@@ -0,0 +1,82 @@
+"""Tests for source profiles."""
+
+from __future__ import annotations
+
+import pytest
+
+from benchmarks.replay import corpus
+from wenxian.__main__ import main_parser
+from wenxian.from_identifier import from_identifier
+from wenxian.sources import (
+    PROFILES,
+    SOURCES,
+    parse_sources,
+    prioritize,
+    select_sources,
+    selected_sources,
+)
+from wenxian.testing import MockServer
+
+NCBI_HOSTS = ("eutils.ncbi.nlm.nih.gov", "www.ncbi.nlm.nih.gov", "www.ebi.ac.uk")
+
+
+class _Recorder:
+    """Record the hosts of the requests answered by a corpus."""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.hosts: list[str] = []
+
+    def get(self, key: str) -> tuple[int, bytes] | None:
+        self.hosts.append(key.partition("/")[0])
+        return self.responses.get(key)
+
+
+def test_parse_sources():
+    """Test profiles, case-insensitive lists and unknown sources."""
+    assert parse_sources("default") == SOURCES
+    assert parse_sources(" Physics ") == PROFILES["physics"]
+    assert parse_sources("arxiv, crossref,arXiv") == ("arXiv", "Crossref")
+    assert parse_sources(["Semantic Scholar"]) == ("Semantic Scholar",)
+    with pytest.raises(ValueError, match="Unknown source or profile"):
+        parse_sources("crossref,scopus")
+
+
+def test_prioritize():
+    """Test fetches follow the selected sources and their order."""
+    fetches = (("PubMed", 1), ("Crossref", 2), ("arXiv", 3))
+    assert prioritize(fetches) == fetches
+    with select_sources("arXiv,Crossref") as selected:
+        assert selected_sources() == selected
+        assert prioritize(fetches) == (("arXiv", 3), ("Crossref", 2))
+    assert selected_sources() == SOURCES
+
+
+def test_profile_skips_sources():
+    """Test lookups do not contact sources outside the selected profile."""
+    recorder = _Recorder(corpus(2))
+    with MockServer(recorder).install():
+        reference = from_identifier("10.5555/wenxian.0", sources="physics")
+        assert reference is not None
+        assert reference.title is not None
+        assert not set(recorder.hosts).intersection(NCBI_HOSTS)
+        assert "api.crossref.org" in recorder.hosts
+        recorder.hosts.clear()
+        from_identifier("10.5555/wenxian.1")
+        assert set(recorder.hosts).intersection(NCBI_HOSTS)
+
+
+def test_profile_skips_pubmed_for_pmids():
+    """Test PMIDs are resolved without PubMed when it is not selected."""
+    recorder = _Recorder(corpus(1))
+    pmid = corpus(1).identifiers("pmid", 1)[0]
+    with MockServer(recorder).install():
+        from_identifier(pmid, sources="Semantic Scholar")
+    assert recorder.hosts
+    assert set(recorder.hosts) == {"api.semanticscholar.org"}
+
+
+def test_cli_sources():
+    """Test the ``--sources`` option."""
+    args = main_parser().parse_args(["from", "10.5555/x", "--sources", "fast"])
+    assert args.sources == "fast"
@@ -0,0 +1,157 @@
+"""Tests for multi-candidate title search."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+
+import wenxian.from_identifier as identifier_module
+from wenxian import similarity
+from wenxian.feeder.crossref import Crossref
+from wenxian.feeder.semanticscholar import Semanticscholar
+from wenxian.from_identifier import _rank_title_candidates
+from wenxian.reference import Reference
+
+QUERY = "Deep residual learning for image recognition"
+
+
+class _Response:
+    """Minimal response object for title-search tests."""
+
+    status_code = 200
+
+    def __init__(self, data):
+        self._data = data
+        self.content = json.dumps(data).encode()
+
+    def json(self):
+        """Return the configured JSON payload."""
+        return self._data
+
+
+def test_rank_title_candidates_scores_before_fetching(monkeypatch):
+    """Test candidates are ordered by similarity and mismatches are dropped."""
+    # normalized titles tie, so the order of the search sources is kept
+    monkeypatch.setattr(similarity, "ENGINE", "token")
+    assert _rank_title_candidates(
+        QUERY,
+        [
+            [
+                ("10.1/other", "Attention is all you need"),
+                ("10.1/close", "Deep residual learning for image recognition."),
+            ],
+            None,
+            [
+                ("10.1/CLOSE", QUERY),
+                ("10.1/untitled", None),
+                ("10.1/exact", QUERY),
+            ],
+        ],
+    ) == ["10.1/close", "10.1/exact", "10.1/untitled"]
+
+
+def test_feeders_request_multiple_candidates(monkeypatch):
+    """Test both search services are asked for several titled candidates."""
+    calls = []
+
+    def crossref_get(url, params=None):
+        calls.append(params)
+        return _Response(
+            {
+                "message": {
+                    "items": [
+                        {"DOI": "10.1/a", "title": ["Paper A"]},
+                        {"DOI": "10.1/b"},
+                        {"title": ["No DOI"]},
+                    ]
+                }
+            }
+        )
+
+    def semantic_get(url, params=None):
+        calls.append(params)
+        return _Response(
+            {
+                "data": [
+                    {"externalIds": {"ArXiv": "1512.03385"}, "title": "Paper C"},
+                    {"externalIds": {}, "title": "No identifier"},
+                ]
+            }
+        )
+
+    monkeypatch.setattr("wenxian.feeder.crossref.SESSION.get", crossref_get)
+    assert Crossref().search_title("Paper", limit=3) == [
+        ("10.1/a", "Paper A"),
+        ("10.1/b", None),
+    ]
+    assert Crossref().from_title("Paper") == "10.1/a"
+    monkeypatch.setattr("wenxian.feeder.semanticscholar.SESSION.get", semantic_get)
+    assert Semanticscholar().search_title("Paper", limit=3) == [
+        ("1512.03385", "Paper C")
+    ]
+    assert calls[0]["rows"] == "3"
+    assert calls[1]["rows"] == "1"
+    assert calls[2]["limit"] == "3"
+    assert "title" in calls[2]["fields"].split(",")
+
+
+def test_sync_title_searches_race(monkeypatch):
+    """Test sync title search queries both services concurrently."""
+    barrier = threading.Barrier(2)
+    lookups = []
+
+    def crossref(self, title):
+        barrier.wait(timeout=1)
+        return [("10.1234/crossref", "An unrelated review article")]
+
+    def semantic(self, title):
+        barrier.wait(timeout=1)
+        return [("10.1234/semantic", QUERY)]
+
+    def lookup(identifier):
+        lookups.append(identifier)
+        return Reference(title=QUERY)
+
+    monkeypatch.setattr(identifier_module.Crossref, "search_title", crossref)
+    monkeypatch.setattr(identifier_module.Semanticscholar, "search_title", semantic)
+    monkeypatch.setattr(identifier_module, "from_identifier", lookup)
+    assert identifier_module.from_title(QUERY) == Reference(title=QUERY)
+    assert lookups == ["10.1234/semantic"]
+
+
+def test_async_title_searches_race(monkeypatch):
+    """Test async title search starts both services before either finishes."""
+
+    async def run():
+        started = 0
+        both_started = asyncio.Event()
+
+        def make_search(candidates):
+            async def search(self, title):
+                nonlocal started
+                started += 1
+                if started == 2:
+                    both_started.set()
+                await asyncio.wait_for(both_started.wait(), timeout=1)
+                return candidates
+
+            return search
+
+        async def lookup(identifier):
+            return Reference(title=QUERY, doi=identifier)
+
+        monkeypatch.setattr(
+            identifier_module.Crossref,
+            "async_search_title",
+            make_search([("10.1234/crossref", "Deep residual learning")]),
+        )
+        monkeypatch.setattr(
+            identifier_module.Semanticscholar,
+            "async_search_title",
+            make_search([("10.1234/semantic", QUERY)]),
+        )
+        monkeypatch.setattr(identifier_module, "async_from_identifier", lookup)
+        return await identifier_module.async_from_title(QUERY)
+
+    assert asyncio.run(run()) == Reference(title=QUERY, doi="10.1234/semantic")
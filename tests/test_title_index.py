@@ -0,0 +1,120 @@
+"""Tests for the local title index."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import TYPE_CHECKING
+
+import wenxian.from_identifier as identifier_module
+from wenxian.feeder.mirror import Mirror
+from wenxian.mirror import build
+from wenxian.title_index import _decode, _encode, index_titles, search, tokenize
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+ITEMS = [
+    {
+        "DOI": "10.1234/resnet",
+        "title": ["Deep Residual Learning for Image Recognition"],
+        "container-title": ["CVPR"],
+    },
+    {
+        "DOI": "10.1234/attention",
+        "title": ["Attention Is All You Need"],
+        "container-title": ["NeurIPS"],
+    },
+    {
+        "DOI": "10.1234/dp",
+        "title": ["Deep Potential Molecular Dynamics: A Scalable Model"],
+        "container-title": ["Phys. Rev. Lett."],
+    },
+]
+
+
+def _mirror(tmp_path: Path, items: list[dict], name: str = "0.jsonl") -> Path:
+    """Build and index a mirror from Crossref items."""
+    dump = tmp_path / name
+    dump.write_text("\n".join(json.dumps(item) for item in items), encoding="utf-8")
+    database = tmp_path / "mirror.sqlite"
+    build(database, [dump], jobs=1)
+    index_titles(database)
+    return database
+
+
+def test_postings_round_trip():
+    """Test varint delta encoding of posting lists, including appends."""
+    ids = [1, 2, 130, 20000, 20001, 3_000_000]
+    assert _decode(_encode(ids, 0)) == ids
+    assert _decode(_encode(ids[:3], 0) + _encode(ids[3:], ids[2])) == ids
+    assert len(_encode(range(1, 1001), 0)) == 1000
+
+
+def test_tokenize_folds_case_accents_and_markup():
+    """Test index tokens ignore case, accents, markup and stop words."""
+    assert tokenize("The <i>Schrödinger</i> Equation of  Motion") == [
+        "schrodinger",
+        "equation",
+        "motion",
+    ]
+
+
+def test_search_ranks_by_token_overlap(tmp_path: Path):
+    """Test the best matching indexed title is ranked first."""
+    database = _mirror(tmp_path, ITEMS)
+    assert search(database, "deep residual learning for image recognition")[0] == (
+        "10.1234/resnet",
+        "Deep Residual Learning for Image Recognition",
+    )
+    assert search(database, "Deep potential molecular dynamics")[0][0] == "10.1234/dp"
+    assert search(database, "completely unknown words") == []
+
+
+def test_index_is_incremental(tmp_path: Path):
+    """Test rebuilding only indexes newly mirrored titles."""
+    database = _mirror(tmp_path, ITEMS[:2])
+    dump = tmp_path / "1.jsonl"
+    dump.write_text(json.dumps(ITEMS[2]), encoding="utf-8")
+    build(database, [dump], jobs=1)
+    assert index_titles(database) == 1
+    assert index_titles(database) == 0
+    assert search(database, "attention is all you need")[0][0] == "10.1234/attention"
+    assert search(database, "scalable deep potential")[0][0] == "10.1234/dp"
+
+
+def test_title_lookup_stays_local(tmp_path: Path, monkeypatch):
+    """Test indexed titles resolve without querying online search services."""
+    database = _mirror(tmp_path, ITEMS)
+    monkeypatch.setattr(Mirror, "PATH", str(database))
+
+    def forbidden(self, title):
+        raise AssertionError("online search should not be queried")
+
+    async def async_forbidden(self, title):
+        raise AssertionError("online search should not be queried")
+
+    for feeder in (identifier_module.Crossref, identifier_module.Semanticscholar):
+        monkeypatch.setattr(feeder, "search_title", forbidden)
+        monkeypatch.setattr(feeder, "async_search_title", async_forbidden)
+
+    assert (
+        identifier_module.from_title("Attention is all you need").doi
+        == "10.1234/attention"
+    )
+    result = asyncio.run(
+        identifier_module.async_from_title(
+            "Deep residual learning for image recognition"
+        )
+    )
+    assert result.doi == "10.1234/resnet"
+
+
+def test_unindexed_mirror_falls_back_to_online_search(tmp_path: Path, monkeypatch):
+    """Test a mirror without a title index is treated as a miss."""
+    dump = tmp_path / "0.jsonl"
+    dump.write_text(json.dumps(ITEMS[0]), encoding="utf-8")
+    database = tmp_path / "mirror.sqlite"
+    build(database, [dump], jobs=1)
+    monkeypatch.setattr(Mirror, "PATH", str(database))
+    assert Mirror().from_title("Deep residual learning for image recognition") is None
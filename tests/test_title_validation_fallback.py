@@ -11,21 +11,21 @@ from wenxian.reference import Reference
 def test_title_mismatch_falls_back_to_semantic_scholar(monkeypatch):
     """Test a mismatched Crossref hit does not stop title fallback."""
     query = "A specific matching paper title"
-    semantic_calls = []
+    lookups = []
 
     monkeypatch.setattr(
         identifier_module.Crossref,
-        "from_title",
-        lambda self, title: "10.1234/wrong",
+        "search_title",
+        lambda self, title: [("10.1234/wrong", "A completely unrelated result")],
+    )
+    monkeypatch.setattr(
+        identifier_module.Semanticscholar,
+        "search_title",
+        lambda self, title: [("10.1234/right", query)],
     )
-
-    def semantic(self, title):
-        semantic_calls.append(title)
-        return "10.1234/right"
-
-    monkeypatch.setattr(identifier_module.Semanticscholar, "from_title", semantic)
 
     def lookup(identifier):
+        lookups.append(identifier)
         if identifier == "10.1234/wrong":
             return Reference(title="A completely unrelated result")
         return Reference(title=query)
@@ -33,31 +33,34 @@ def test_title_mismatch_falls_back_to_semantic_scholar(monkeypatch):
     monkeypatch.setattr(identifier_module, "from_identifier", lookup)
 
     assert identifier_module.from_title(query) == Reference(title=query)
-    assert semantic_calls == [query]
+    # the mismatched candidate is rejected locally before any full lookup
+    assert lookups == ["10.1234/right"]
 
 
 def test_async_title_mismatch_falls_back_to_semantic_scholar(monkeypatch):
-    """Test async title lookup follows the same validation fallback behavior."""
+    """Test async title lookup falls back when a fetched record mismatches."""
     query = "A specific matching paper title"
-    semantic_calls = []
+    lookups = []
 
     async def crossref(self, title):
-        return "10.1234/wrong"
+        return [("10.1234/wrong", query)]
 
     async def semantic(self, title):
-        semantic_calls.append(title)
-        return "10.1234/right"
+        return [("10.1234/right", query)]
 
     async def lookup(identifier):
+        lookups.append(identifier)
         if identifier == "10.1234/wrong":
             return Reference(title="A completely unrelated result")
         return Reference(title=query)
 
-    monkeypatch.setattr(identifier_module.Crossref, "async_from_title", crossref)
-    monkeypatch.setattr(identifier_module.Semanticscholar, "async_from_title", semantic)
+    monkeypatch.setattr(identifier_module.Crossref, "async_search_title", crossref)
+    monkeypatch.setattr(
+        identifier_module.Semanticscholar, "async_search_title", semantic
+    )
     monkeypatch.setattr(identifier_module, "async_from_identifier", lookup)
 
     assert asyncio.run(identifier_module.async_from_title(query)) == Reference(
         title=query
     )
-    assert semantic_calls == [query]
+    assert lookups == ["10.1234/wrong", "10.1234/right"]
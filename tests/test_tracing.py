@@ -0,0 +1,114 @@
+"""Tests for the tracing hooks."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+import pytest
+
+from benchmarks.replay import corpus
+from wenxian.__main__ import cmd_from
+from wenxian.from_identifier import async_from_identifier
+from wenxian.testing import MockServer
+from wenxian.tracing import ChromeTracer, OpenTelemetryTracer, set_tracer, span
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.fixture
+def tracer():
+    """Install a Chrome tracer for one test."""
+    tracer = ChromeTracer()
+    set_tracer(tracer)
+    yield tracer
+    set_tracer(None)
+
+
+def test_spans_are_dropped_by_default():
+    """Test spans are no-ops without a tracer."""
+    with span("stage", key="value") as current:
+        current.set_attribute("other", 1)
+    assert span("stage") is span("other")
+
+
+def test_chrome_trace_covers_every_stage(tracer: ChromeTracer, tmp_path: Path):
+    """Test a lookup emits spans for each stage and saves as trace events."""
+    records = corpus(1)
+    with MockServer(records).install():
+        reference = asyncio.run(async_from_identifier("10.5555/wenxian.0"))
+    assert reference is not None
+    reference.bibtex
+    tracer.save(tmp_path / "trace.json")
+    with open(tmp_path / "trace.json", encoding="utf-8") as f:
+        events = json.load(f)["traceEvents"]
+    spans = [event for event in events if event["ph"] == "X"]
+    names = {event["name"] for event in spans}
+    assert {
+        "from_identifier",
+        "lookup",
+        "async_get",
+        "rate_limit",
+        "http",
+        "decode_json",
+        "parse",
+        "merge",
+        "render",
+    } <= names
+    http = [event for event in spans if event["name"] == "http"]
+    assert all(event["args"]["status"] in (200, 404) for event in http)
+    lookups = {
+        event["args"]["source"]: event["args"]["outcome"]
+        for event in spans
+        if event["name"] == "lookup"
+    }
+    assert lookups["Crossref"] == "hit"
+    assert lookups["ChemRxiv"] == "empty"
+    lanes = {event["tid"] for event in events if event["ph"] == "M"}
+    assert lanes == {event["tid"] for event in spans}
+
+
+def test_chrome_span_records_errors(tracer: ChromeTracer):
+    """Test a span closed by an exception is marked with its type."""
+    with pytest.raises(KeyError), span("stage"):
+        raise KeyError("x")
+    assert tracer.events[-1]["args"] == {"error": "KeyError"}
+
+
+def test_opentelemetry_tracer():
+    """Test spans are forwarded with a prefix and OpenTelemetry attribute types."""
+    opened = []
+
+    class FakeTracer:
+        @contextmanager
+        def start_as_current_span(self, name, attributes):
+            opened.append((name, attributes))
+            yield self
+
+        def set_attribute(self, key, value):
+            opened.append((key, value))
+
+    set_tracer(OpenTelemetryTracer(FakeTracer()))
+    try:
+        with span("http", status=200, url=None, size=1.5, items=[1]) as current:
+            current.set_attribute("retries", 0)
+    finally:
+        set_tracer(None)
+    assert opened == [
+        ("wenxian.http", {"status": 200, "size": 1.5, "items": "[1]"}),
+        ("retries", 0),
+    ]
+
+
+def test_cli_trace(tmp_path: Path):
+    """Test ``--trace`` writes a timeline of the run."""
+    path = tmp_path / "trace.json"
+    with MockServer(corpus(1)).install():
+        cmd_from(IDENTIFIER=["10.5555/wenxian.0"], trace=str(path))
+    with open(path, encoding="utf-8") as f:
+        events = json.load(f)["traceEvents"]
+    assert any(event["name"] == "render" for event in events)
+    assert span("stage") is span("other")
@@ -0,0 +1,86 @@
+"""Tests for the XML parsing backends."""
+
+from __future__ import annotations
+
+from io import BytesIO
+
+import pytest
+
+from tests.test_pubmed_stream import DOCUMENT
+from wenxian.feeder import xml_backend
+from wenxian.feeder.arxiv import Arxiv
+from wenxian.feeder.pubmed import Pubmed
+
+ATOM = b"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>arXiv Query</title>
+  <entry>
+    <updated>2019-10-28T16:46:09Z</updated>
+    <title>DeePMD-kit: A deep learning package
+      for many-body potential energy representation</title>
+    <summary>An abstract.</summary>
+    <author><name>Han Wang</name></author>
+    <author><name>Linfeng Zhang</name></author>
+  </entry>
+</feed>
+"""
+
+
+@pytest.fixture(params=["etree", "lxml"])
+def backend(request, monkeypatch):
+    """Select each XML backend in turn."""
+    if request.param == "lxml":
+        pytest.importorskip("lxml")
+    monkeypatch.setattr(xml_backend, "BACKEND", request.param)
+    return request.param
+
+
+def test_backends_parse_identically(backend):
+    """Test both backends produce the same PubMed and arXiv references."""
+    articles = list(Pubmed()._iter_articles(BytesIO(DOCUMENT)))
+    assert [pmid for pmid, _ in articles] == ["1", "2"]
+    assert articles[0][1].title == "First article"
+    assert articles[0][1].doi == "10.1234/one"
+    assert articles[0][1].pages == "e1"
+    assert articles[1][1].author[1].last == "The Consortium"
+
+    reference = Arxiv()._from_content(ATOM, "1910.12690")
+    assert reference.title == (
+        "DeePMD-kit: A deep learning package for many-body potential energy "
+        "representation"
+    )
+    assert [author.last for author in reference.author] == ["Wang", "Zhang"]
+    assert reference.year == 2019
+    assert (
+        Arxiv()._from_content(b"<feed xmlns='http://www.w3.org/2005/Atom'/>", "x")
+        is None
+    )
+
+
+def test_iter_elements_releases_previous_elements(backend):
+    """Test streamed elements are cleared once the next one is requested."""
+    seen = []
+    for element in xml_backend.iter_elements(BytesIO(DOCUMENT), "PubmedArticle"):
+        assert len(element) > 0
+        seen.append(element)
+    assert len(seen) == 2
+    assert len(seen[0]) == 0
+
+
+def test_backend_selection(monkeypatch):
+    """Test automatic selection, validation and the Pyodide fallback."""
+    monkeypatch.setattr(xml_backend, "_HAS_LXML", False)
+    assert xml_backend.resolve("auto") == "etree"
+    monkeypatch.setattr(xml_backend, "_HAS_LXML", True)
+    assert xml_backend.resolve("auto") == "lxml"
+    with pytest.raises(ValueError, match="Unknown XML backend"):
+        xml_backend.resolve("expat")
+
+
+def test_xml_benchmark_runs():
+    """Test the benchmark reports matching references for each backend."""
+    from benchmarks.xml_parsing import run
+
+    results = run(["etree"], repeat=1)
+    assert {name for name, *_ in results} == {"pubmed", "pubmed-batch", "arxiv"}
+    assert all(same for *_, same in results)
@@ -5,9 +5,73 @@ from __future__ import annotations
 import argparse
 import asyncio
 import sys
+from contextlib import nullcontext
+from typing import TYPE_CHECKING
 
-from wenxian.from_identifier import async_from_identifier
+from wenxian.feeder.mirror import Mirror
+from wenxian.fields import KEY_FIELDS, OUTPUT_FIELDS, parse_fields, restrict
+from wenxian.from_identifier import async_from_identifiers
 from wenxian.logger import logger
+from wenxian.metrics import METRICS
+from wenxian.profiling import Profiler
+from wenxian.sources import PROFILES, SOURCES, parse_sources, selected_sources
+from wenxian.tracing import ChromeTracer, set_tracer
+
+if TYPE_CHECKING:
+    from wenxian.reference import Reference
+
+
+def _render(reference: Reference, output_type: str) -> str:
+    """Render a reference in an output format."""
+    if output_type == "bibtex":
+        return reference.bibtex
+    elif output_type == "markdown":
+        return reference.markdown
+    elif output_type == "text":
+        return reference.text
+    raise ValueError(f"Unknown output type: {output_type}")
+
+
+def _output_fields(
+    output_type: str, fields: str | None = None, no_abstract: bool = False
+) -> frozenset[str]:
+    """Return the fields an output needs.
+
+    ``fields`` replaces the fields of the output type, apart from those of
+    the BibTeX key, and ``no_abstract`` drops the abstract.
+    """
+    if fields is not None:
+        needed = parse_fields(fields) | KEY_FIELDS
+    elif output_type in OUTPUT_FIELDS:
+        needed = OUTPUT_FIELDS[output_type]
+    else:
+        raise ValueError(f"Unknown output type: {output_type}")
+    if no_abstract:
+        needed -= {"annote"}
+    return needed
+
+
+def _write_output(
+    buff: list[str], keys: list[str], output: str | None, output_type: str
+) -> None:
+    """Write rendered references to stdout or a file."""
+    if output is None:
+        sys.stdout.write("\n".join(buff))
+        return
+    if output == 0:
+        extension = {
+            "bibtex": ".bib",
+            "markdown": ".md",
+            "text": ".txt",
+        }.get(output_type)
+        if extension is None:
+            raise ValueError(f"Unknown output type: {output_type}")
+        if len(keys) == 1:
+            output = f"{keys[0]}{extension}"
+        else:
+            output = f"references{extension}"
+    with open(output, "w") as f:
+        f.write("\n".join(buff))
 
 
 async def _async_cmd_from(
@@ -16,64 +80,105 @@ async def _async_cmd_from(
     output: str | None = None,
     ignore_errors: bool = False,
     output_type: str = "bibtex",
+    fields: frozenset[str] | None = None,
+    restrict_output: bool = False,
+    sources: tuple[str, ...] | None = None,
 ):
-    """Generate references concurrently from identifiers."""
-    identifiers = [identifier.strip() for identifier in IDENTIFIER]
-    tasks = [
-        asyncio.create_task(async_from_identifier(identifier))
-        for identifier in identifiers
-    ]
+    """Generate references concurrently from identifiers.
 
-    buff = []
-    references = []
+    With ``restrict_output``, fields other than ``fields`` are dropped from
+    the output.
+    """
+    identifiers = [identifier.strip() for identifier in IDENTIFIER]
+    references: dict[str, Reference] = {}
+    results = async_from_identifiers(identifiers, fields=fields, sources=sources)
     try:
-        for identifier, task in zip(identifiers, tasks, strict=True):
-            try:
-                ref = await task
-            except Exception as e:
-                msg = f"Failed to fetch reference from {identifier}: {e}"
+        async for identifier, result in results:
+            if isinstance(result, Exception):
+                msg = f"Failed to fetch reference from {identifier}: {result}"
                 if ignore_errors:
-                    logger.exception(msg)
+                    logger.error(msg, exc_info=result)
                     continue
-                raise ValueError(msg) from e
-            if ref is None or ref.is_empty():
+                raise ValueError(msg) from result
+            if result.is_empty():
                 msg = f"Failed to fetch reference from {identifier}"
                 if ignore_errors:
                     logger.error(msg)
                     continue
                 raise ValueError(msg)
-            references.append(ref)
-            if output_type == "bibtex":
-                buff.append(ref.bibtex)
-            elif output_type == "markdown":
-                buff.append(ref.markdown)
-            elif output_type == "text":
-                buff.append(ref.text)
-            else:
-                raise ValueError(f"Unknown output type: {output_type}")
+            if restrict_output and fields is not None:
+                result = restrict(result, fields)
+            references[identifier] = result
     finally:
-        for task in tasks:
-            if not task.done():
-                task.cancel()
-        await asyncio.gather(*tasks, return_exceptions=True)
+        await results.aclose()
+    found = [
+        references[identifier] for identifier in identifiers if identifier in references
+    ]
+    _write_output(
+        [_render(reference, output_type) for reference in found],
+        [reference.key for reference in found],
+        output,
+        output_type,
+    )
 
-    if output is None:
-        sys.stdout.write("\n".join(buff))
-        return
-    if output == 0:
-        extension = {
-            "bibtex": ".bib",
-            "markdown": ".md",
-            "text": ".txt",
-        }.get(output_type)
-        if extension is None:
-            raise ValueError(f"Unknown output type: {output_type}")
-        if len(references) == 1:
-            output = f"{references[0].key}{extension}"
+
+def _daemon_cmd_from(
+    *,
+    IDENTIFIER: list[str],
+    output: str | None = None,
+    ignore_errors: bool = False,
+    output_type: str = "bibtex",
+    fields: frozenset[str] | None = None,
+    sources: tuple[str, ...] | None = None,
+) -> bool:
+    """Generate references through a running daemon.
+
+    Returns
+    -------
+    bool
+        False if no daemon is running.
+    """
+    from wenxian import daemon
+
+    try:
+        results = daemon.lookup(IDENTIFIER, output_type, fields=fields, sources=sources)
+    except OSError:
+        # including a daemon that stopped answering
+        logger.warning("Lost the wenxian daemon; resolving in-process.")
+        return False
+    if results is None:
+        return False
+    buff = []
+    keys = []
+    for result in results:
+        identifier = result["identifier"]
+        if result["error"] is not None:
+            msg = f"Failed to fetch reference from {identifier}: {result['error']}"
+        elif result["rendered"] is None:
+            msg = f"Failed to fetch reference from {identifier}"
         else:
-            output = f"references{extension}"
-    with open(output, "w") as f:
-        f.write("\n".join(buff))
+            buff.append(result["rendered"])
+            keys.append(result["key"])
+            continue
+        if not ignore_errors:
+            raise ValueError(msg)
+        logger.error(msg)
+    _write_output(buff, keys, output, output_type)
+    return True
+
+
+def _write_profile(profiler: Profiler, path: str | None) -> None:
+    """Write a profile report to stderr, or to a file.
+
+    A path ending with ``.prof`` receives the raw statistics instead.
+    """
+    if path is None or path == "-":
+        sys.stderr.write("\n" + profiler.report())
+    elif path.endswith(".prof"):
+        profiler.dump(path)
+    else:
+        with open(path, "w") as f:
+            f.write(profiler.report())
 
 
 def cmd_from(
@@ -82,17 +187,111 @@ def cmd_from(
     output: str | None = None,
     ignore_errors: bool = False,
     output_type: str = "bibtex",
+    mirror: str | None = None,
+    stats: bool = False,
+    trace: str | None = None,
+    profile: str | None = None,
+    daemon: bool = True,
+    fields: str | None = None,
+    no_abstract: bool = False,
+    sources: str | None = None,
     **kwargs,
 ):
-    """Generate references from identifiers using asynchronous lookups."""
-    asyncio.run(
-        _async_cmd_from(
+    """Generate references from identifiers using asynchronous lookups.
+
+    Only the fields the output needs are looked up, which ``fields`` and
+    ``no_abstract`` narrow further, from the online ``sources`` selected by
+    a profile or a list. Identifiers are sent to a running
+    ``wenxian serve`` daemon unless ``daemon`` is False or the run is
+    inspected with a mirror, statistics, a trace or a profile, all of which
+    apply to this process only.
+    """
+    needed = _output_fields(output_type, fields, no_abstract)
+    # the daemon is sent the selection of this process, not left to its own
+    selected = parse_sources(sources) if sources is not None else selected_sources()
+    if mirror is not None:
+        Mirror.PATH = mirror
+    if (
+        daemon
+        and mirror is None
+        and not stats
+        and trace is None
+        and profile is None
+        and _daemon_cmd_from(
             IDENTIFIER=IDENTIFIER,
             output=output,
             ignore_errors=ignore_errors,
             output_type=output_type,
+            fields=needed,
+            sources=selected,
         )
-    )
+    ):
+        return
+    tracer = None
+    if trace is not None:
+        tracer = ChromeTracer()
+        set_tracer(tracer)
+    profiler = Profiler() if profile is not None else nullcontext()
+    try:
+        with profiler:
+            asyncio.run(
+                _async_cmd_from(
+                    IDENTIFIER=IDENTIFIER,
+                    output=output,
+                    ignore_errors=ignore_errors,
+                    output_type=output_type,
+                    fields=needed,
+                    restrict_output=fields is not None or no_abstract,
+                    sources=selected,
+                )
+            )
+    finally:
+        if isinstance(profiler, Profiler):
+            _write_profile(profiler, profile)
+        if trace is not None and tracer is not None:
+            set_tracer(None)
+            tracer.save(trace)
+        if stats:
+            sys.stderr.write("\n" + METRICS.summary())
+
+
+def cmd_serve(
+    *,
+    socket: str | None = None,
+    host: str | None = None,
+    port: int | None = None,
+    cache: str | None = None,
+    no_disk_cache: bool = False,
+    mirror: str | None = None,
+    **kwargs,
+):
+    """Run the lookup daemon."""
+    from wenxian.daemon import DEFAULT_PORT, serve
+
+    if mirror is not None:
+        Mirror.PATH = mirror
+    address = None
+    if socket is not None:
+        address = f"unix:{socket}"
+    elif host is not None or port is not None:
+        address = f"http://{host or '127.0.0.1'}:{port or DEFAULT_PORT}"
+    serve(address, cache=cache, disk_cache=not no_disk_cache)
+
+
+def cmd_mirror_build(
+    *,
+    DATABASE: str,
+    DUMP: list[str],
+    jobs: int | None = None,
+    **kwargs,
+):
+    """Build a local mirror from bulk dump files."""
+    from wenxian.mirror import build
+    from wenxian.title_index import index_titles
+
+    count = build(DATABASE, DUMP, jobs=jobs)
+    titles = index_titles(DATABASE)
+    sys.stderr.write(f"Wrote {count} records and {titles} titles to {DATABASE}\n")
 
 
 def main_parser() -> argparse.ArgumentParser:
@@ -140,7 +339,164 @@ def main_parser() -> argparse.ArgumentParser:
         default="bibtex",
         help="Output type.",
     )
+    parser_from.add_argument(
+        "--fields",
+        type=str,
+        default=None,
+        metavar="FIELDS",
+        help=(
+            "Comma-separated fields to look up and output, e.g. title,doi,abstract;"
+            " the fields of the BibTeX key are always included. Defaults to the"
+            " fields the output type shows."
+        ),
+    )
+    parser_from.add_argument(
+        "--no-abstract",
+        action="store_true",
+        help="Do not look up or output abstracts.",
+    )
+    parser_from.add_argument(
+        "--sources",
+        type=str,
+        default=None,
+        help=(
+            f"Online sources to consult: a profile ({', '.join(PROFILES)}) or a"
+            f" comma-separated list in priority order from {', '.join(SOURCES)}."
+            " Defaults to the WENXIAN_SOURCES environment variable, or all sources."
+        ),
+    )
+    parser_from.add_argument(
+        "--mirror",
+        type=str,
+        default=None,
+        help=(
+            "Local mirror database built by `wenxian mirror build`, consulted before"
+            " online sources. Defaults to the WENXIAN_MIRROR environment variable."
+        ),
+    )
+    parser_from.add_argument(
+        "--stats",
+        action="store_true",
+        help=(
+            "Print per-service request and per-source lookup statistics to"
+            " stderr when done."
+        ),
+    )
+    parser_from.add_argument(
+        "--trace",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help=(
+            "Write a Chrome trace-event JSON timeline of the requests, lookups,"
+            " merges and rendering to FILE."
+        ),
+    )
+    parser_from.add_argument(
+        "--profile",
+        type=str,
+        nargs="?",
+        const="-",
+        default=None,
+        metavar="FILE",
+        help=(
+            "Profile the run and report the time spent in imports, network,"
+            " waits, XML/JSON parsing, LaTeX encoding and journal abbreviation."
+            " The report is printed to stderr unless FILE is given; a FILE"
+            " ending with .prof receives the raw pstats data."
+        ),
+    )
+    parser_from.add_argument(
+        "--no-daemon",
+        dest="daemon",
+        action="store_false",
+        help="Resolve in this process even if a `wenxian serve` daemon is running.",
+    )
     parser_from.set_defaults(func=cmd_from)
+
+    parser_serve = subparsers.add_parser(
+        "serve",
+        help="Run a lookup daemon with a warm cache for `wenxian from`.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser_serve.add_argument(
+        "--socket",
+        type=str,
+        default=None,
+        help=(
+            "Unix socket to listen on. Defaults to the WENXIAN_DAEMON environment"
+            " variable, or a per-user socket in XDG_RUNTIME_DIR or the temporary"
+            " directory."
+        ),
+    )
+    parser_serve.add_argument(
+        "--host",
+        type=str,
+        default=None,
+        help="Listen on a TCP host instead of a Unix socket.",
+    )
+    parser_serve.add_argument(
+        "--port",
+        type=int,
+        default=None,
+        help="Listen on a TCP port instead of a Unix socket (8765 by default).",
+    )
+    parser_serve.add_argument(
+        "--cache",
+        type=str,
+        default=None,
+        help=(
+            "SQLite file of the persistent response cache. Defaults to"
+            " $XDG_CACHE_HOME/wenxian/responses.sqlite."
+        ),
+    )
+    parser_serve.add_argument(
+        "--no-disk-cache",
+        action="store_true",
+        help="Cache responses in memory only.",
+    )
+    parser_serve.add_argument(
+        "--mirror",
+        type=str,
+        default=None,
+        help="Local mirror database consulted before online sources.",
+    )
+    parser_serve.set_defaults(func=cmd_serve)
+
+    parser_mirror = subparsers.add_parser(
+        "mirror",
+        help="Manage a local offline mirror.",
+    )
+    mirror_subparsers = parser_mirror.add_subparsers(
+        dest="mirror_command", required=True
+    )
+    parser_mirror_build = mirror_subparsers.add_parser(
+        "build",
+        help="Build or resume a mirror from Crossref and PubMed bulk dumps.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser_mirror_build.add_argument(
+        "DATABASE",
+        type=str,
+        help="Mirror database to create or update.",
+    )
+    parser_mirror_build.add_argument(
+        "DUMP",
+        type=str,
+        nargs="+",
+        help=(
+            "Crossref public-data files (.json/.jsonl, optionally gzipped) and"
+            " PubMed baseline files (.xml, optionally gzipped)."
+        ),
+    )
+    parser_mirror_build.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of parallel worker processes. Defaults to the number of CPUs.",
+    )
+    parser_mirror_build.set_defaults(func=cmd_mirror_build)
     return parser
 
 
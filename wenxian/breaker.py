@@ -0,0 +1,174 @@
+"""Per-source circuit breakers.
+
+A source that is down or throttling hard would otherwise make every lookup
+wait through its retries and timeouts. After :data:`THRESHOLD` consecutive
+failed lookups, the breaker of the source opens and its lookups fail fast
+for :data:`COOLDOWN` seconds. The breaker then lets a single lookup probe
+the source: it closes if the probe succeeds and opens again otherwise.
+Transitions are logged and recorded in :data:`wenxian.metrics.METRICS`.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+
+from wenxian.logger import logger
+from wenxian.metrics import METRICS
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+THRESHOLD = int(os.environ.get("WENXIAN_BREAKER_THRESHOLD") or 5)
+"""Consecutive failed lookups opening a breaker."""
+
+COOLDOWN = float(os.environ.get("WENXIAN_BREAKER_COOLDOWN") or 60)
+"""Seconds an open breaker fails fast before probing its source."""
+
+
+class Permit:
+    """Permission for one lookup to contact a source.
+
+    Only the permit of the half-open probe frees the breaker for another
+    probe, so lookups that started earlier cannot let a second one through.
+    """
+
+    __slots__ = ()
+
+
+class CircuitBreaker:
+    """Circuit breaker of one source.
+
+    Parameters
+    ----------
+    source : str
+        The source name, e.g. ``Semantic Scholar``.
+    threshold : int, optional
+        Consecutive failed lookups opening the breaker.
+    cooldown : float, optional
+        Seconds the open breaker fails fast before probing the source.
+    """
+
+    def __init__(
+        self, source: str, threshold: int = THRESHOLD, cooldown: float = COOLDOWN
+    ):
+        self.source = source
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe: Permit | None = None
+
+    @property
+    def state(self) -> str:
+        """The state: ``closed``, ``open`` or ``half-open``."""
+        return self._state
+
+    def _transition(self, state: str) -> None:
+        """Change the state, and log and record the change."""
+        previous, self._state = self._state, state
+        METRICS.record_breaker(self.source, state)
+        if state == OPEN:
+            logger.warning(
+                "%s circuit breaker opened after %d consecutive failures;"
+                " failing fast for %g s.",
+                self.source,
+                self._failures,
+                self.cooldown,
+            )
+        elif state == HALF_OPEN:
+            logger.info("%s circuit breaker half-open; probing.", self.source)
+        elif previous != CLOSED:
+            logger.warning("%s circuit breaker closed.", self.source)
+
+    def allow(self) -> Permit | None:
+        """Let a lookup contact the source, unless the breaker fails it fast.
+
+        Returns
+        -------
+        Permit or None
+            The permit of the lookup, whose result must be reported with
+            :meth:`record_success`, :meth:`record_failure` or :meth:`release`,
+            or None if the lookup must fail fast. A lookup allowed while
+            half-open is the probe.
+        """
+        with self._lock:
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.cooldown:
+                    METRICS.record_breaker_rejection(self.source)
+                    return None
+                self._transition(HALF_OPEN)
+            permit = Permit()
+            if self._state == HALF_OPEN:
+                if self._probe is not None:
+                    METRICS.record_breaker_rejection(self.source)
+                    return None
+                self._probe = permit
+            return permit
+
+    def _end(self, permit: Permit) -> None:
+        """End the lookup of a permit, freeing the breaker if it was the probe."""
+        if permit is self._probe:
+            self._probe = None
+
+    def record_success(self, permit: Permit) -> None:
+        """Record a lookup answered by the source."""
+        with self._lock:
+            self._end(permit)
+            self._failures = 0
+            if self._state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self, permit: Permit) -> None:
+        """Record a lookup cut short by network errors, throttling or outages."""
+        with self._lock:
+            self._end(permit)
+            self._failures += 1
+            if self._state == HALF_OPEN or (
+                self._state == CLOSED and self._failures >= self.threshold
+            ):
+                self._opened_at = time.monotonic()
+                self._transition(OPEN)
+
+    def release(self, permit: Permit) -> None:
+        """Record a lookup that did not show whether the source is healthy.
+
+        If it was the probe, another lookup may probe the half-open breaker.
+        """
+        with self._lock:
+            self._end(permit)
+
+
+_BREAKERS: dict[str, CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def circuit_breaker(source: str) -> CircuitBreaker:
+    """Return the circuit breaker of a source, shared by this process."""
+    with _BREAKERS_LOCK:
+        if source not in _BREAKERS:
+            _BREAKERS[source] = CircuitBreaker(source)
+        return _BREAKERS[source]
+
+
+def reset_breakers() -> None:
+    """Close every circuit breaker by discarding them."""
+    with _BREAKERS_LOCK:
+        _BREAKERS.clear()
+
+
+__all__ = [
+    "CLOSED",
+    "COOLDOWN",
+    "HALF_OPEN",
+    "OPEN",
+    "THRESHOLD",
+    "CircuitBreaker",
+    "Permit",
+    "circuit_breaker",
+    "reset_breakers",
+]
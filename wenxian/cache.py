@@ -0,0 +1,539 @@
+"""Caches of service responses and of known misses.
+
+:class:`ResponseCache` keeps response bodies in a bounded in-memory LRU and,
+optionally, in a SQLite file shared across processes and runs. When a cache
+is installed with :func:`set_cache`, the shared session answers repeated GET
+requests from it without contacting the service.
+
+:class:`MissCache` remembers, for a shorter time, which sources found
+nothing for an identifier, so that lookups skip them without any request.
+
+:class:`ReferenceCache` keeps the merged reference of each DOI, PMID and
+arXiv identifier, so that repeated lookups skip the sources altogether.
+
+:class:`RenderCache` keeps the BibTeX, Markdown and text output of each
+reference, keyed on a hash of its fields and the renderer version, so that
+unchanged entries are not rendered again.
+
+:class:`Crosswalk` links the DOI, PMID, PMCID and arXiv identifier of each
+work seen in a response, so that identifier conversions are not repeated.
+
+``wenxian serve`` installs all of them for the lifetime of the daemon; other
+processes opt in with the ``WENXIAN_CACHE`` environment variable, which
+names the SQLite file.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING
+from urllib.parse import urlencode
+
+from wenxian.identifier import Identifier, get_identifier_type
+from wenxian.metrics import METRICS
+
+if TYPE_CHECKING:
+    import sqlite3
+    from collections.abc import Mapping
+
+    from wenxian.reference import Reference
+
+DEFAULT_TTL = 7 * 24 * 3600
+"""Seconds a cached response stays valid."""
+
+DEFAULT_MISS_TTL = 24 * 3600
+"""Seconds a known miss stays valid."""
+
+DEFAULT_CROSSWALK_TTL = 365 * 24 * 3600
+"""Seconds a link between identifiers stays valid."""
+
+CROSSWALK_KINDS = ("doi", "pmid", "pmcid", "arxiv")
+"""Identifier kinds linked by :class:`Crosswalk`."""
+
+_ARXIV_VERSION = re.compile(r"v\d+$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    key TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    stored REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def default_path() -> Path:
+    """Return the default location of the on-disk cache."""
+    root = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(root) / "wenxian" / "responses.sqlite"
+
+
+def cache_key(url: str, params: Mapping[str, str | int] | None = None) -> str:
+    """Return the cache key of a GET request."""
+    if not params:
+        return url
+    query = urlencode(sorted((key, str(value)) for key, value in params.items()))
+    return f"{url}{'&' if '?' in url else '?'}{query}"
+
+
+class ResponseCache:
+    """Two-tier cache of response bodies.
+
+    Parameters
+    ----------
+    path : str or os.PathLike, optional
+        SQLite file of the persistent tier. Without it, responses are only
+        kept in memory.
+    maxsize : int, default=4096
+        Number of responses kept in memory.
+    ttl : float, default=DEFAULT_TTL
+        Seconds a response stays valid.
+    """
+
+    TABLE = "responses"
+    """SQLite table of the persistent tier."""
+    TIERS = ("memory", "disk")
+    """Cache names of the tiers in :data:`wenxian.metrics.METRICS`."""
+
+    def __init__(
+        self,
+        path: str | os.PathLike | None = None,
+        *,
+        maxsize: int = 4096,
+        ttl: float = DEFAULT_TTL,
+    ):
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._memory: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        if path is not None:
+            import sqlite3
+
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(
+                path, timeout=60, check_same_thread=False
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.executescript(_SCHEMA.format(table=self.TABLE))
+
+    def get(self, key: str) -> bytes | None:
+        """Return a cached body, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            item = self._memory.get(key)
+            if item is not None and now - item[1] < self.ttl:
+                self._memory.move_to_end(key)
+                METRICS.record_cache(self.TIERS[0], hit=True)
+                return item[0]
+            METRICS.record_cache(self.TIERS[0], hit=False)
+            if self._connection is None:
+                return None
+            row = self._connection.execute(
+                f"SELECT body, stored FROM {self.TABLE} WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None or now - row[1] >= self.ttl:
+                METRICS.record_cache(self.TIERS[1], hit=False)
+                return None
+            METRICS.record_cache(self.TIERS[1], hit=True)
+            self._remember(key, row[0], row[1])
+            return row[0]
+
+    def set(self, key: str, body: bytes) -> None:
+        """Store a body."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, body, now)
+            if self._connection is not None:
+                with self._connection:
+                    self._connection.execute(
+                        f"INSERT OR REPLACE INTO {self.TABLE} VALUES (?, ?, ?)",
+                        (key, body, now),
+                    )
+
+    def _remember(self, key: str, body: bytes, stored: float) -> None:
+        """Put a body in the memory tier, evicting the least recently used."""
+        self._memory[key] = (body, stored)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        with self._lock:
+            self._memory.clear()
+            if self._connection is not None:
+                with self._connection:
+                    self._connection.execute(f"DELETE FROM {self.TABLE}")
+
+    def close(self) -> None:
+        """Close the SQLite file."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class MissCache(ResponseCache):
+    """Two-tier cache of lookups known to find nothing.
+
+    Parameters
+    ----------
+    path : str or os.PathLike, optional
+        SQLite file of the persistent tier, which may be shared with a
+        :class:`ResponseCache`.
+    maxsize : int, default=4096
+        Number of misses kept in memory.
+    ttl : float, default=DEFAULT_MISS_TTL
+        Seconds a miss stays valid. Records get added to the services, so
+        misses expire sooner than responses.
+    """
+
+    TABLE = "misses"
+    TIERS = ("miss memory", "miss disk")
+
+    def __init__(
+        self,
+        path: str | os.PathLike | None = None,
+        *,
+        maxsize: int = 4096,
+        ttl: float = DEFAULT_MISS_TTL,
+    ):
+        super().__init__(path, maxsize=maxsize, ttl=ttl)
+
+    def __contains__(self, key: str) -> bool:
+        """Return whether a lookup is a known miss."""
+        return self.get(key) is not None
+
+    def add(self, key: str) -> None:
+        """Record a lookup that found nothing."""
+        self.set(key, b"")
+
+
+def reference_key(identifier: str) -> str | None:
+    """Return the cache key of the merged reference of an identifier.
+
+    DOIs are case-insensitive and arXiv identifiers are matched without
+    regard to case. Titles have no key, as their results depend on search
+    rankings.
+    """
+    identifier = identifier.strip()
+    identifier_type = get_identifier_type(identifier)
+    if identifier_type == Identifier.DOI or identifier_type == Identifier.ARXIV:
+        return f"{identifier_type.value}:{identifier.lower()}"
+    if identifier_type == Identifier.PMID:
+        return f"{identifier_type.value}:{int(identifier)}"
+    return None
+
+
+class ReferenceCache(ResponseCache):
+    """Two-tier cache of merged references.
+
+    References are stored with :func:`wenxian.serialization.dumps`; entries
+    written with another schema version are treated as missing.
+
+    Parameters
+    ----------
+    path : str or os.PathLike, optional
+        SQLite file of the persistent tier, which may be shared with a
+        :class:`ResponseCache`.
+    maxsize : int, default=4096
+        Number of references kept in memory.
+    ttl : float, default=DEFAULT_TTL
+        Seconds a reference stays valid.
+    """
+
+    TABLE = "merged_references"
+    TIERS = ("reference memory", "reference disk")
+
+    def get_reference(self, identifier: str) -> Reference | None:
+        """Return the cached reference of an identifier, or None on a miss."""
+        from wenxian.serialization import loads
+
+        key = reference_key(identifier)
+        body = self.get(key) if key is not None else None
+        if body is None:
+            return None
+        try:
+            return loads(body)
+        except ValueError:
+            return None
+
+    def set_reference(self, identifier: str, reference: Reference) -> None:
+        """Store the merged reference of an identifier."""
+        from wenxian.serialization import dumps
+
+        key = reference_key(identifier)
+        if key is not None and not reference.is_empty():
+            self.set(key, dumps(reference))
+
+
+class RenderCache(ResponseCache):
+    """Two-tier cache of rendered references.
+
+    Keys combine the output format, :func:`wenxian.reference.renderer_version`
+    and :attr:`wenxian.reference.Reference.content_hash`, so output is
+    reused only for references with the same fields rendered by the same
+    code.
+
+    Parameters
+    ----------
+    path : str or os.PathLike, optional
+        SQLite file of the persistent tier, which may be shared with a
+        :class:`ResponseCache`.
+    maxsize : int, default=16384
+        Number of rendered strings kept in memory.
+    ttl : float, default=DEFAULT_TTL
+        Seconds a rendered string stays valid.
+    """
+
+    TABLE = "rendered"
+    TIERS = ("render memory", "render disk")
+
+    def __init__(
+        self,
+        path: str | os.PathLike | None = None,
+        *,
+        maxsize: int = 16384,
+        ttl: float = DEFAULT_TTL,
+    ):
+        super().__init__(path, maxsize=maxsize, ttl=ttl)
+
+
+def _normalize_identifier(kind: str, identifier: str | int) -> str | None:
+    """Normalize an identifier of a :data:`CROSSWALK_KINDS` kind.
+
+    DOIs keep their case, which some sources compare, and are matched
+    case-insensitively by :func:`_crosswalk_key`.
+    """
+    value = str(identifier).strip()
+    if not value:
+        return None
+    if kind == "doi":
+        return value
+    if kind == "pmid":
+        return str(int(value)) if value.isdigit() else None
+    if kind == "pmcid":
+        value = value.upper()
+        return value if value.startswith("PMC") else f"PMC{value}"
+    if kind == "arxiv":
+        return _ARXIV_VERSION.sub("", value.lower().removeprefix("arxiv:"))
+    raise ValueError(f"Unknown identifier kind: {kind}")
+
+
+def _crosswalk_key(kind: str, value: str) -> str:
+    """Return the key of a normalized identifier in a :class:`Crosswalk`."""
+    return f"{kind}:{value.lower() if kind == 'doi' else value}"
+
+
+class Crosswalk(ResponseCache):
+    """Two-tier index linking the identifiers of each work.
+
+    Each known identifier maps to all the identifiers linked to it, so one
+    read answers a conversion. DOIs are matched case-insensitively, and
+    arXiv identifiers without their version.
+
+    Parameters
+    ----------
+    path : str or os.PathLike, optional
+        SQLite file of the persistent tier, which may be shared with a
+        :class:`ResponseCache`.
+    maxsize : int, default=16384
+        Number of identifiers kept in memory.
+    ttl : float, default=DEFAULT_CROSSWALK_TTL
+        Seconds a link stays valid.
+    """
+
+    TABLE = "crosswalk"
+    TIERS = ("crosswalk memory", "crosswalk disk")
+
+    def __init__(
+        self,
+        path: str | os.PathLike | None = None,
+        *,
+        maxsize: int = 16384,
+        ttl: float = DEFAULT_CROSSWALK_TTL,
+    ):
+        super().__init__(path, maxsize=maxsize, ttl=ttl)
+
+    def identifiers(self, kind: str, identifier: str | int) -> dict[str, str]:
+        """Return the identifiers linked to an identifier, keyed by kind.
+
+        Parameters
+        ----------
+        kind : {"doi", "pmid", "pmcid", "arxiv"}
+            The kind of the identifier.
+        identifier : str or int
+            The identifier.
+
+        Returns
+        -------
+        dict[str, str]
+            The linked identifiers, including the given one, or an empty
+            dictionary if the identifier is unknown.
+        """
+        value = _normalize_identifier(kind, identifier)
+        body = self.get(_crosswalk_key(kind, value)) if value is not None else None
+        return json.loads(body) if body is not None else {}
+
+    def link(self, **identifiers: str | int | None) -> None:
+        """Record that identifiers, keyed by kind, belong to the same work.
+
+        Identifiers already linked to any of them are merged in. Fewer than
+        two identifiers are ignored.
+        """
+        linked: dict[str, str] = {}
+        for kind, identifier in identifiers.items():
+            if identifier is None:
+                continue
+            value = _normalize_identifier(kind, identifier)
+            if value is not None:
+                linked[kind] = value
+        if len(linked) < 2:
+            return
+        merged: dict[str, str] = {}
+        for kind, value in linked.items():
+            merged.update(self.identifiers(kind, value))
+        if merged.items() >= linked.items():
+            return
+        merged.update(linked)
+        body = json.dumps(merged, sort_keys=True).encode()
+        for kind, value in merged.items():
+            self.set(_crosswalk_key(kind, value), body)
+
+
+CACHE: ResponseCache | None = None
+"""The cache consulted by the shared session, if any."""
+
+MISSES: MissCache | None = None
+"""The known misses consulted by lookups, if any."""
+
+REFERENCES: ReferenceCache | None = None
+"""The merged references consulted by lookups, if any."""
+
+RENDERED: RenderCache | None = None
+"""The rendered output consulted by references, if any."""
+
+CROSSWALK: Crosswalk | None = None
+"""The identifier links consulted by lookups and feeders, if any."""
+
+
+def set_cache(cache: ResponseCache | None) -> ResponseCache | None:
+    """Install a response cache, or None to disable caching.
+
+    Returns
+    -------
+    ResponseCache or None
+        The previously installed cache.
+    """
+    global CACHE
+    previous, CACHE = CACHE, cache
+    return previous
+
+
+def set_miss_cache(cache: MissCache | None) -> MissCache | None:
+    """Install a cache of known misses, or None to disable it.
+
+    Returns
+    -------
+    MissCache or None
+        The previously installed cache.
+    """
+    global MISSES
+    previous, MISSES = MISSES, cache
+    return previous
+
+
+def set_reference_cache(cache: ReferenceCache | None) -> ReferenceCache | None:
+    """Install a cache of merged references, or None to disable it.
+
+    Returns
+    -------
+    ReferenceCache or None
+        The previously installed cache.
+    """
+    global REFERENCES
+    previous, REFERENCES = REFERENCES, cache
+    return previous
+
+
+def set_render_cache(cache: RenderCache | None) -> RenderCache | None:
+    """Install a cache of rendered references, or None to disable it.
+
+    Returns
+    -------
+    RenderCache or None
+        The previously installed cache.
+    """
+    global RENDERED
+    previous, RENDERED = RENDERED, cache
+    return previous
+
+
+def set_crosswalk(crosswalk: Crosswalk | None) -> Crosswalk | None:
+    """Install an identifier crosswalk, or None to disable it.
+
+    Returns
+    -------
+    Crosswalk or None
+        The previously installed crosswalk.
+    """
+    global CROSSWALK
+    previous, CROSSWALK = CROSSWALK, crosswalk
+    return previous
+
+
+def linked_identifiers(kind: str, identifier: str | int) -> dict[str, str]:
+    """Return the identifiers linked to an identifier in :data:`CROSSWALK`."""
+    if CROSSWALK is None:
+        return {}
+    return CROSSWALK.identifiers(kind, identifier)
+
+
+def link_identifiers(**identifiers: str | int | None) -> None:
+    """Link identifiers of the same work in :data:`CROSSWALK`, if installed."""
+    if CROSSWALK is not None:
+        CROSSWALK.link(**identifiers)
+
+
+if os.environ.get("WENXIAN_CACHE"):
+    set_cache(ResponseCache(os.environ["WENXIAN_CACHE"]))
+    set_miss_cache(MissCache(os.environ["WENXIAN_CACHE"]))
+    set_reference_cache(ReferenceCache(os.environ["WENXIAN_CACHE"]))
+    set_render_cache(RenderCache(os.environ["WENXIAN_CACHE"]))
+    set_crosswalk(Crosswalk(os.environ["WENXIAN_CACHE"]))
+
+__all__ = [
+    "CACHE",
+    "CROSSWALK",
+    "CROSSWALK_KINDS",
+    "DEFAULT_CROSSWALK_TTL",
+    "DEFAULT_MISS_TTL",
+    "DEFAULT_TTL",
+    "MISSES",
+    "REFERENCES",
+    "RENDERED",
+    "Crosswalk",
+    "MissCache",
+    "ReferenceCache",
+    "RenderCache",
+    "ResponseCache",
+    "cache_key",
+    "default_path",
+    "link_identifiers",
+    "linked_identifiers",
+    "reference_key",
+    "set_cache",
+    "set_crosswalk",
+    "set_miss_cache",
+    "set_reference_cache",
+    "set_render_cache",
+]
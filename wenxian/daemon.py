@@ -0,0 +1,478 @@
+"""Long-running lookup daemon and its client.
+
+``wenxian serve`` keeps one process warm: the journal abbreviator is loaded,
+connections to the services stay pooled, the rate limiters are shared by
+every request, and responses, per-source misses, merged references,
+rendered output and identifier links are cached in memory and on disk. It
+answers a small HTTP/JSON API on a Unix socket (the default where available)
+or a local TCP port:
+
+``GET /health``
+    Liveness check.
+``GET /lookup?id=<identifier>&format=<format>&fields=<a,b>&sources=<profile>``
+    Resolve one identifier into ``bibtex``, ``markdown`` or ``text``.
+``POST /lookup``
+    Resolve ``{"identifiers": [...], "format": ..., "fields": [...],
+    "sources": ...}`` concurrently.
+``GET /metrics``
+    :data:`wenxian.metrics.METRICS` in the Prometheus text format.
+
+Each result is ``{"identifier", "reference", "key", "rendered", "error"}``,
+where ``reference`` is serialized by
+:func:`wenxian.serialization.reference_to_dict`.
+
+When ``fields`` are given, only those are looked up and returned; see
+:mod:`wenxian.fields`. ``sources`` selects a profile or the online sources to
+consult; see :mod:`wenxian.sources`. ``wenxian from`` sends its identifiers to
+a running daemon found at :func:`default_address` and falls back to resolving
+them in-process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import http.client
+import json
+import os
+import socket
+import socketserver
+import stat
+import tempfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from urllib.parse import parse_qs, urlsplit
+
+from wenxian.fields import parse_fields, restrict
+from wenxian.from_identifier import async_from_identifiers
+from wenxian.logger import logger
+from wenxian.metrics import METRICS
+from wenxian.serialization import reference_to_dict
+from wenxian.sources import parse_sources
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+    from wenxian.reference import Reference
+
+DEFAULT_PORT = 8765
+"""TCP port used where Unix sockets are unavailable."""
+
+FORMATS = ("bibtex", "markdown", "text")
+"""Output formats the daemon renders."""
+
+CONNECT_TIMEOUT = 5.0
+"""Seconds a client waits for a daemon to accept a request."""
+
+IDENTIFIER_TIMEOUT = 30.0
+"""Seconds a client waits for a daemon per identifier of a request."""
+
+
+def default_address() -> str:
+    """Return the address of the daemon.
+
+    ``WENXIAN_DAEMON`` takes precedence, either as ``unix:<path>`` or as
+    ``http://<host>:<port>``. Otherwise a per-user socket in
+    ``$XDG_RUNTIME_DIR`` or the temporary directory is used, or
+    ``http://127.0.0.1:8765`` on platforms without Unix sockets. Clients
+    only connect to that TCP port when ``WENXIAN_DAEMON`` names it, as any
+    local user could listen there.
+    """
+    address = os.environ.get("WENXIAN_DAEMON")
+    if address:
+        return address
+    if not hasattr(socket, "AF_UNIX"):
+        return f"http://127.0.0.1:{DEFAULT_PORT}"
+    directory = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return f"unix:{Path(directory) / f'wenxian-{uid}.sock'}"
+
+
+def _client_address() -> str | None:
+    """Return the address clients connect to without being told, if any."""
+    address = default_address()
+    if address.startswith("unix:") or os.environ.get("WENXIAN_DAEMON"):
+        return address
+    return None
+
+
+def _owned(path: str) -> bool:
+    """Check whether a Unix socket exists and belongs to the current user.
+
+    Another local user could otherwise create the socket first, e.g. in the
+    shared temporary directory, and answer lookups with forged references.
+    """
+    try:
+        status = os.stat(path)
+    except OSError:
+        return False
+    if not stat.S_ISSOCK(status.st_mode):
+        return False
+    if hasattr(os, "getuid") and status.st_uid != os.getuid():
+        logger.warning("Ignoring %s, which belongs to another user.", path)
+        return False
+    return True
+
+
+def _result(
+    identifier: str,
+    reference: Reference | Exception,
+    output_type: str,
+    fields: frozenset[str] | None = None,
+) -> dict[str, Any]:
+    """Convert a lookup result into a result record."""
+    result: dict[str, Any] = {
+        "identifier": identifier,
+        "reference": None,
+        "key": None,
+        "rendered": None,
+        "error": None,
+    }
+    if isinstance(reference, Exception):
+        result["error"] = str(reference)
+    elif not reference.is_empty():
+        if fields is not None:
+            reference = restrict(reference, fields)
+        result["reference"] = reference_to_dict(reference)
+        result["key"] = reference.key
+        result["rendered"] = getattr(reference, output_type)
+    return result
+
+
+async def resolve(
+    identifiers: Sequence[str],
+    output_type: str = "bibtex",
+    fields: Iterable[str] | None = None,
+    sources: str | Iterable[str] | None = None,
+) -> list[dict[str, Any]]:
+    """Resolve identifiers concurrently into result records.
+
+    Parameters
+    ----------
+    identifiers : Sequence[str]
+        The identifiers.
+    output_type : {"bibtex", "markdown", "text"}
+        The rendered format.
+    fields : Iterable[str], optional
+        The fields to look up and return. Defaults to all of them.
+    sources : str or Iterable[str], optional
+        A profile or the online sources to consult. Defaults to those of
+        the daemon.
+
+    Returns
+    -------
+    list[dict[str, Any]]
+        One result per identifier, in order.
+    """
+    if output_type not in FORMATS:
+        raise ValueError(f"Unknown output type: {output_type}")
+    requested = parse_fields(fields) if fields is not None else None
+    selected = parse_sources(sources) if sources is not None else None
+    results = {
+        identifier: _result(identifier, reference, output_type, requested)
+        async for identifier, reference in async_from_identifiers(
+            identifiers,
+            fields=requested,
+            sources=selected,
+        )
+    }
+    return [results[identifier.strip()] for identifier in identifiers]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Answer the daemon API."""
+
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except ConnectionError:
+            # clients stop waiting after a timeout and resolve in-process
+            logger.warning("A client left before its response was sent.")
+            self.close_connection = True
+
+    def _send_json(self, status: int, data: Any) -> None:
+        self._send(
+            status, json.dumps(data, ensure_ascii=False).encode(), "application/json"
+        )
+
+    def _lookup(
+        self,
+        identifiers: list[str],
+        output_type: str,
+        fields: str | list[str] | None = None,
+        sources: str | list[str] | None = None,
+    ) -> None:
+        try:
+            results = asyncio.run(resolve(identifiers, output_type, fields, sources))
+        except ValueError as exc:
+            self._send_json(400, {"error": str(exc)})
+            return
+        self._send_json(200, {"results": results})
+
+    def do_GET(self):
+        """Answer health, single lookup and metrics requests."""
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        if url.path == "/health":
+            self._send_json(200, {"status": "ok", "pid": os.getpid()})
+        elif url.path == "/metrics":
+            self._send(200, METRICS.prometheus().encode(), "text/plain; version=0.0.4")
+        elif url.path == "/lookup" and "id" in query:
+            self._lookup(
+                query["id"],
+                query.get("format", ["bibtex"])[0],
+                query["fields"][0] if "fields" in query else None,
+                query["sources"][0] if "sources" in query else None,
+            )
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        """Answer batch lookup requests."""
+        if urlsplit(self.path).path != "/lookup":
+            self._send_json(404, {"error": "Not found"})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            data = json.loads(self.rfile.read(length))
+            identifiers = [str(identifier) for identifier in data["identifiers"]]
+        except (ValueError, KeyError, TypeError):
+            self._send_json(400, {"error": "Expected {'identifiers': [...]}"})
+            return
+        self._lookup(
+            identifiers,
+            data.get("format", "bibtex"),
+            data.get("fields"),
+            data.get("sources"),
+        )
+
+    def address_string(self) -> str:
+        """Return the client address, which is empty on Unix sockets."""
+        return str(self.client_address[0]) if self.client_address else "local"
+
+    def log_message(self, format, *args):
+        """Log requests at debug level."""
+        logger.debug("%s %s", self.address_string(), format % args)
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _TCPHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+def make_server(address: str | None = None) -> socketserver.BaseServer:
+    """Create a daemon server bound to an address.
+
+    Parameters
+    ----------
+    address : str, optional
+        ``unix:<path>`` or ``http://<host>:<port>``. Defaults to
+        :func:`default_address`. A stale socket file is replaced.
+
+    Raises
+    ------
+    RuntimeError
+        If a daemon is already listening on the address.
+    """
+    address = address or default_address()
+    if ping(address):
+        raise RuntimeError(f"A wenxian daemon is already running at {address}")
+    if address.startswith("unix:"):
+        path = address.removeprefix("unix:")
+        Path(path).unlink(missing_ok=True)
+        # only the owner may connect, from the moment the socket is bound
+        umask = os.umask(0o177)
+        try:
+            server: socketserver.BaseServer = _UnixHTTPServer(path, _Handler)
+        finally:
+            os.umask(umask)
+        return server
+    url = urlsplit(address)
+    return _TCPHTTPServer(
+        (url.hostname or "127.0.0.1", url.port or DEFAULT_PORT), _Handler
+    )
+
+
+def serve(
+    address: str | None = None,
+    *,
+    cache: str | os.PathLike | None = None,
+    disk_cache: bool = True,
+) -> None:
+    """Run the daemon until interrupted.
+
+    Parameters
+    ----------
+    address : str, optional
+        Where to listen; see :func:`make_server`.
+    cache : str or os.PathLike, optional
+        SQLite file of the persistent caches. Defaults to
+        :func:`wenxian.cache.default_path`.
+    disk_cache : bool, default=True
+        Whether to persist the caches. Lookups are always cached in memory.
+    """
+    from wenxian.cache import (
+        Crosswalk,
+        MissCache,
+        ReferenceCache,
+        RenderCache,
+        ResponseCache,
+        default_path,
+        set_cache,
+        set_crosswalk,
+        set_miss_cache,
+        set_reference_cache,
+        set_render_cache,
+    )
+
+    address = address or default_address()
+    path = (cache or default_path()) if disk_cache else None
+    set_cache(ResponseCache(path))
+    set_miss_cache(MissCache(path))
+    set_reference_cache(ReferenceCache(path))
+    set_render_cache(RenderCache(path))
+    set_crosswalk(Crosswalk(path))
+    server = make_server(address)
+    logger.info("wenxian daemon listening at %s", address)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if address.startswith("unix:"):
+            Path(address.removeprefix("unix:")).unlink(missing_ok=True)
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a Unix socket."""
+
+    def __init__(self, path: str, timeout: float | None = None):
+        super().__init__("localhost", timeout=timeout)
+        self._path = path
+
+    def connect(self):
+        """Connect to the socket file."""
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._path)
+
+
+def _connection(address: str, timeout: float | None) -> http.client.HTTPConnection:
+    """Open an HTTP connection to a daemon address."""
+    if address.startswith("unix:"):
+        return _UnixHTTPConnection(address.removeprefix("unix:"), timeout=timeout)
+    url = urlsplit(address)
+    return http.client.HTTPConnection(
+        url.hostname or "127.0.0.1", url.port or DEFAULT_PORT, timeout=timeout
+    )
+
+
+def ping(address: str | None = None, timeout: float = 0.5) -> bool:
+    """Check whether a daemon answers at an address.
+
+    Unix sockets of other users are not trusted and never answer.
+    """
+    address = address or default_address()
+    if address.startswith("unix:") and not _owned(address.removeprefix("unix:")):
+        return False
+    connection = _connection(address, timeout)
+    try:
+        connection.request("GET", "/health")
+        response = connection.getresponse()
+        response.read()
+        return response.status == 200
+    except OSError:
+        return False
+    finally:
+        connection.close()
+
+
+def lookup(
+    identifiers: Sequence[str],
+    output_type: str = "bibtex",
+    *,
+    fields: Iterable[str] | None = None,
+    sources: str | Iterable[str] | None = None,
+    address: str | None = None,
+    timeout: float | None = None,
+) -> list[dict[str, Any]] | None:
+    """Resolve identifiers through a running daemon.
+
+    Parameters
+    ----------
+    identifiers : Sequence[str]
+        The identifiers.
+    output_type : {"bibtex", "markdown", "text"}
+        The rendered format.
+    fields : Iterable[str], optional
+        The fields to look up and return. Defaults to all of them.
+    sources : str or Iterable[str], optional
+        A profile or the online sources to consult. Defaults to those of
+        the daemon.
+    address : str, optional
+        The daemon address. Defaults to :func:`default_address`, unless
+        that is the TCP port of platforms without Unix sockets and
+        ``WENXIAN_DAEMON`` does not name it.
+    timeout : float, optional
+        Socket timeout in seconds. Defaults to :data:`CONNECT_TIMEOUT` plus
+        :data:`IDENTIFIER_TIMEOUT` per identifier.
+
+    Returns
+    -------
+    list[dict[str, Any]] or None
+        The daemon results, or None if no daemon is running.
+
+    Raises
+    ------
+    TimeoutError
+        If the daemon does not answer in time.
+    """
+    address = address or _client_address()
+    if address is None or not ping(address):
+        return None
+    request: dict[str, Any] = {"identifiers": list(identifiers), "format": output_type}
+    if fields is not None:
+        request["fields"] = sorted(fields)
+    if sources is not None:
+        request["sources"] = list(parse_sources(sources))
+    if timeout is None:
+        timeout = CONNECT_TIMEOUT + IDENTIFIER_TIMEOUT * len(identifiers)
+    connection = _connection(address, timeout)
+    try:
+        connection.request(
+            "POST",
+            "/lookup",
+            body=json.dumps(request),
+            headers={"Content-Type": "application/json"},
+        )
+        response = connection.getresponse()
+        data = json.loads(response.read())
+    finally:
+        connection.close()
+    if response.status != 200:
+        raise ValueError(data.get("error", f"Daemon returned {response.status}"))
+    return data["results"]
+
+
+__all__ = [
+    "CONNECT_TIMEOUT",
+    "DEFAULT_PORT",
+    "FORMATS",
+    "IDENTIFIER_TIMEOUT",
+    "default_address",
+    "lookup",
+    "make_server",
+    "ping",
+    "resolve",
+    "serve",
+]
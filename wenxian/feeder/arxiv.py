@@ -3,43 +3,57 @@
 from __future__ import annotations
 
 import re
-from typing import ClassVar
-from xml.etree import ElementTree
+from typing import TYPE_CHECKING, Any, ClassVar
 
+from wenxian.feeder.endpoints import Endpoint
 from wenxian.feeder.feeder import Feeder
 from wenxian.feeder.session import SESSION, async_get
+from wenxian.feeder.xml_backend import XPath, fromstring
 from wenxian.reference import Author, Reference
+from wenxian.tracing import span
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
 
 
 class Arxiv(Feeder):
     """Feeder for arXiv."""
 
+    API_URL = Endpoint("arxiv", "query")
+    BATCH_SIZE = 100
+    """Most identifiers fetched in one query."""
+    NAMESPACES: ClassVar[dict[str, str]] = {"atom": "http://www.w3.org/2005/Atom"}
+    """Namespace prefixes used in :attr:`ARXIV_PATH`."""
     ARXIV_PATH: ClassVar[dict[str, str]] = {
-        "author": r"{http://www.w3.org/2005/Atom}entry/{http://www.w3.org/2005/Atom}author/{http://www.w3.org/2005/Atom}name",
-        "title": r"{http://www.w3.org/2005/Atom}entry/{http://www.w3.org/2005/Atom}title",
-        "abstract": r"{http://www.w3.org/2005/Atom}entry/{http://www.w3.org/2005/Atom}summary",
-        "updated": r"{http://www.w3.org/2005/Atom}entry/{http://www.w3.org/2005/Atom}updated",
+        "author": "atom:author/atom:name",
+        "id": "atom:id",
+        "title": "atom:title",
+        "abstract": "atom:summary",
+        "updated": "atom:updated",
     }
-    """XPath for arXiv XML."""
+    """XPath of each field relative to an Atom ``entry`` element."""
     DOI_PREFIX = "10.48550/arXiv."
     """DOI prefix for arXiv."""
 
     def _from_content(self, content: bytes, arxiv: str) -> Reference | None:
         """Convert an arXiv Atom response into a reference."""
-        tree = ElementTree.fromstring(content)
-        entry = tree.find(r"{http://www.w3.org/2005/Atom}entry")
-        if entry is None:
-            return None
+        with span("parse", source="arXiv", size=len(content)):
+            entry = _ENTRY.first(fromstring(content))
+            if entry is None:
+                return None
+            return self._from_entry(entry, arxiv)
 
+    def _from_entry(self, entry: Any, arxiv: str) -> Reference:
+        """Convert an Atom ``entry`` element into a reference."""
         rets = {}
-        for key, path in self.ARXIV_PATH.items():
+        for key, path in _FIELD_PATHS.items():
             if key != "author":
-                value = self._text(tree.find(path))
+                value = self._text(path.first(entry))
                 if value is not None:
                     value = re.sub("[ \n]+", " ", value)
                 rets[key] = value
         author = []
-        for node in tree.findall(self.ARXIV_PATH["author"]):
+        for node in _FIELD_PATHS["author"](entry):
             name = self._text(node)
             if name is None:
                 continue
@@ -60,18 +74,57 @@ class Arxiv(Feeder):
             doi=f"{self.DOI_PREFIX}{arxiv}",
         )
 
+    def _from_batch_content(
+        self, content: bytes, arxivs: Sequence[str]
+    ) -> dict[str, Reference]:
+        """Convert an arXiv Atom response into references keyed by request."""
+        with span("parse", source="arXiv", size=len(content)):
+            entries = {}
+            for entry in _ENTRY(fromstring(content)):
+                url = self._text(_FIELD_PATHS["id"].first(entry)) or ""
+                versioned = url.rpartition("/abs/")[2]
+                entries[versioned] = entry
+                entries.setdefault(re.sub(r"v\d+$", "", versioned), entry)
+            return {
+                arxiv: self._from_entry(entries[arxiv], arxiv)
+                for arxiv in arxivs
+                if arxiv in entries
+            }
+
+    def _batch_params(self, arxivs: Sequence[str]) -> dict[str, str]:
+        """Return the query parameters of a batch lookup."""
+        return {"id_list": ",".join(arxivs), "max_results": str(len(arxivs))}
+
+    def from_arxivs(self, arxivs: Sequence[str]) -> dict[str, Reference]:
+        """Fetch references from up to :attr:`BATCH_SIZE` identifiers in one query.
+
+        Returns
+        -------
+        dict[str, Reference]
+            The references found, keyed by the requested identifier.
+        """
+        r = SESSION.get(self.API_URL, params=self._batch_params(arxivs))
+        if r.status_code != 200:
+            return {}
+        return self._from_batch_content(r.content, arxivs)
+
+    async def async_from_arxivs(self, arxivs: Sequence[str]) -> dict[str, Reference]:
+        """Fetch references from up to :attr:`BATCH_SIZE` identifiers asynchronously."""
+        r = await async_get(self.API_URL, params=self._batch_params(arxivs))
+        if r.status_code != 200:
+            return {}
+        return self._from_batch_content(r.content, arxivs)
+
     def from_arxiv(self, arxiv: str) -> Reference | None:
         """Fetch a reference from an arXiv identifier."""
-        r = SESSION.get("https://export.arxiv.org/api/query", params={"id_list": arxiv})
+        r = SESSION.get(self.API_URL, params={"id_list": arxiv})
         if r.status_code != 200:
             return None
         return self._from_content(r.content, arxiv)
 
     async def async_from_arxiv(self, arxiv: str) -> Reference | None:
         """Fetch a reference from an arXiv identifier asynchronously."""
-        r = await async_get(
-            "https://export.arxiv.org/api/query", params={"id_list": arxiv}
-        )
+        r = await async_get(self.API_URL, params={"id_list": arxiv})
         if r.status_code != 200:
             return None
         return self._from_content(r.content, arxiv)
@@ -87,3 +140,9 @@ class Arxiv(Feeder):
         if not doi.startswith(self.DOI_PREFIX):
             return None
         return await self.async_from_arxiv(doi[len(self.DOI_PREFIX) :])
+
+
+_ENTRY = XPath("atom:entry", Arxiv.NAMESPACES)
+_FIELD_PATHS = {
+    key: XPath(path, Arxiv.NAMESPACES) for key, path in Arxiv.ARXIV_PATH.items()
+}
@@ -5,8 +5,9 @@ from __future__ import annotations
 import sys
 from datetime import datetime
 
+from wenxian.feeder.endpoints import Endpoint
 from wenxian.feeder.feeder import Feeder
-from wenxian.feeder.session import SESSION, async_get
+from wenxian.feeder.session import SESSION, async_get, decode_json
 from wenxian.reference import Author, Reference
 
 
@@ -15,7 +16,7 @@ class Chemrxiv(Feeder):
 
     DOI_PREFIX = "10.26434/chemrxiv"
     """DOI prefix for ChemRxiv."""
-    API_URL = "https://chemrxiv.org/engage/chemrxiv/public-api/v1/items/doi"
+    API_URL = Endpoint("chemrxiv", "items/doi")
 
     @staticmethod
     def _from_data(data: dict, doi: str) -> Reference:
@@ -44,7 +45,7 @@ class Chemrxiv(Feeder):
         r = SESSION.get(f"{self.API_URL}/{doi}")
         if r.status_code == 404:
             return None
-        return self._from_data(r.json(), doi)
+        return self._from_data(decode_json(r), doi)
 
     async def async_from_doi(self, doi: str) -> Reference | None:
         """Fetch a reference from a DOI asynchronously."""
@@ -53,4 +54,4 @@ class Chemrxiv(Feeder):
         r = await async_get(f"{self.API_URL}/{doi}")
         if r.status_code == 404:
             return None
-        return self._from_data(r.json(), doi)
+        return self._from_data(decode_json(r), doi)
@@ -3,44 +3,115 @@
 from __future__ import annotations
 
 import html
+from typing import Any, ClassVar
 
+from wenxian import __email__
+from wenxian.feeder.endpoints import Endpoint
 from wenxian.feeder.feeder import Feeder
-from wenxian.feeder.session import SESSION, async_get
+from wenxian.feeder.session import SESSION, async_get, decode_json
+from wenxian.fields import requested_fields
 from wenxian.reference import Author, BibtexType, Reference
 
 
 class Crossref(Feeder):
     """Feeder for Crossref API."""
 
-    API_URL = "https://api.crossref.org/works"
+    API_URL = Endpoint("crossref", "works")
+    WORK_FIELDS: ClassVar[tuple[str, ...]] = (
+        "DOI",
+        "title",
+        "author",
+        "volume",
+        "issue",
+        "page",
+        "article-number",
+        "abstract",
+        "published-print",
+        "published-online",
+        "short-container-title",
+        "container-title",
+        "type",
+    )
+    """Work fields read by :meth:`_from_doi_data`.
+
+    Crossref only honours ``select`` on list queries, so DOIs are looked up
+    with a ``doi:`` filter instead of the single-work route. This skips
+    reference lists and other large fields that are never read, and the
+    abstract when it is not requested.
+    """
 
     @staticmethod
-    def _identifier_from_title_data(data: dict) -> str | None:
-        """Extract the best DOI from a Crossref title-search response."""
-        items = data.get("message", {}).get("items", [])
-        if not items:
-            return None
-        return items[0].get("DOI")
+    def _params(params: dict[str, str]) -> dict[str, str]:
+        """Add the polite-pool contact address to query parameters."""
+        return {**params, "mailto": __email__}
 
-    def from_title(self, title: str) -> str | None:
-        """Search for a paper by title and return its identifier."""
+    def _doi_request(self, doi: str) -> tuple[str, dict[str, str]]:
+        """Build the URL and parameters for a DOI lookup."""
+        if "," in doi:
+            # commas separate filters, so such DOIs use the single-work route
+            return f"{self.API_URL}/{doi}", self._params({})
+        fields = self.WORK_FIELDS
+        if "annote" not in requested_fields():
+            fields = tuple(field for field in fields if field != "abstract")
+        return self.API_URL, self._params(
+            {"filter": f"doi:{doi}", "select": ",".join(fields), "rows": "1"}
+        )
+
+    def _from_doi_response(self, data: dict[str, Any], doi: str) -> Reference | None:
+        """Convert a filtered list or single-work response into a reference."""
+        message = data["message"]
+        if "items" in message:
+            if not message["items"]:
+                return None
+            data = {"message": message["items"][0]}
+        return self._from_doi_data(data, doi)
+
+    @staticmethod
+    def _candidates_from_title_data(data: dict) -> list[tuple[str, str | None]]:
+        """Extract DOIs and titles from a Crossref title-search response."""
+        candidates = []
+        for item in data.get("message", {}).get("items", []):
+            doi = item.get("DOI")
+            if doi:
+                titles = item.get("title") or [None]
+                candidates.append((doi, titles[0]))
+        return candidates
+
+    def search_title(self, title: str, limit: int = 5) -> list[tuple[str, str | None]]:
+        """Search for papers by title and return DOIs with their titles."""
         r = SESSION.get(
             self.API_URL,
-            params={"query.title": title, "rows": "1"},
+            params=self._params(
+                {"query.title": title, "rows": str(limit), "select": "DOI,title"}
+            ),
         )
         if r.status_code != 200:
-            return None
-        return self._identifier_from_title_data(r.json())
+            return []
+        return self._candidates_from_title_data(decode_json(r))
 
-    async def async_from_title(self, title: str) -> str | None:
-        """Search for a paper by title asynchronously."""
+    async def async_search_title(
+        self, title: str, limit: int = 5
+    ) -> list[tuple[str, str | None]]:
+        """Search for papers by title asynchronously."""
         r = await async_get(
             self.API_URL,
-            params={"query.title": title, "rows": "1"},
+            params=self._params(
+                {"query.title": title, "rows": str(limit), "select": "DOI,title"}
+            ),
         )
         if r.status_code != 200:
-            return None
-        return self._identifier_from_title_data(r.json())
+            return []
+        return self._candidates_from_title_data(decode_json(r))
+
+    def from_title(self, title: str) -> str | None:
+        """Search for a paper by title and return its identifier."""
+        candidates = self.search_title(title, limit=1)
+        return candidates[0][0] if candidates else None
+
+    async def async_from_title(self, title: str) -> str | None:
+        """Search for a paper by title asynchronously."""
+        candidates = await self.async_search_title(title, limit=1)
+        return candidates[0][0] if candidates else None
 
     def _from_doi_data(self, data: dict, doi: str) -> Reference:
         """Convert Crossref work metadata into a reference."""
@@ -112,14 +183,16 @@ class Crossref(Feeder):
 
     def from_doi(self, doi: str) -> Reference | None:
         """Fetch a reference from a DOI."""
-        r = SESSION.get(f"{self.API_URL}/{doi}")
+        url, params = self._doi_request(doi)
+        r = SESSION.get(url, params=params)
         if r.status_code == 404:
             return None
-        return self._from_doi_data(r.json(), doi)
+        return self._from_doi_response(decode_json(r), doi)
 
     async def async_from_doi(self, doi: str) -> Reference | None:
         """Fetch a reference from a DOI asynchronously."""
-        r = await async_get(f"{self.API_URL}/{doi}")
+        url, params = self._doi_request(doi)
+        r = await async_get(url, params=params)
         if r.status_code == 404:
             return None
-        return self._from_doi_data(r.json(), doi)
+        return self._from_doi_response(decode_json(r), doi)
@@ -2,15 +2,16 @@
 
 from __future__ import annotations
 
+from wenxian.feeder.endpoints import Endpoint
 from wenxian.feeder.feeder import Feeder
-from wenxian.feeder.session import SESSION, async_get
+from wenxian.feeder.session import SESSION, async_get, decode_json
 from wenxian.reference import Author, BibtexType, Reference
 
 
 class Datacite(Feeder):
     """Feeder for the DataCite REST API."""
 
-    API_URL = "https://api.datacite.org/dois"
+    API_URL = Endpoint("datacite", "dois")
     ARXIV_DOI_PREFIX = "10.48550/arXiv."
 
     def from_doi(self, doi: str) -> Reference | None:
@@ -18,7 +19,7 @@ class Datacite(Feeder):
         r = SESSION.get(f"{self.API_URL}/{doi}")
         if r.status_code != 200:
             return None
-        data = r.json().get("data", {}).get("attributes", {})
+        data = decode_json(r).get("data", {}).get("attributes", {})
         if not data:
             return None
         return self._from_attributes(data, doi=doi)
@@ -28,7 +29,7 @@ class Datacite(Feeder):
         r = await async_get(f"{self.API_URL}/{doi}")
         if r.status_code != 200:
             return None
-        data = r.json().get("data", {}).get("attributes", {})
+        data = decode_json(r).get("data", {}).get("attributes", {})
         if not data:
             return None
         return self._from_attributes(data, doi=doi)
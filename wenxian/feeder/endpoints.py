@@ -0,0 +1,128 @@
+"""Registry of the service endpoints used by the feeders.
+
+Every service is addressed through a base URL that can be overridden, e.g.
+to route all traffic through a caching proxy or an internal mirror. Set
+``WENXIAN_ENDPOINT_<SERVICE>`` (for example ``WENXIAN_ENDPOINT_CROSSREF``)
+before importing wenxian, or call :func:`set_endpoint` at runtime. The
+per-service rate limiters and retries of the shared session follow the
+overridden URL.
+"""
+
+from __future__ import annotations
+
+import os
+from urllib.parse import urlsplit
+
+DEFAULT_ENDPOINTS = {
+    "crossref": "https://api.crossref.org",
+    "pmc": "https://www.ncbi.nlm.nih.gov/pmc/utils",
+    "eutils": "https://eutils.ncbi.nlm.nih.gov/entrez/eutils",
+    "arxiv": "https://export.arxiv.org/api",
+    "semanticscholar": "https://api.semanticscholar.org/graph/v1",
+    "datacite": "https://api.datacite.org",
+    "europepmc": "https://www.ebi.ac.uk/europepmc/webservices/rest",
+    "chemrxiv": "https://chemrxiv.org/engage/chemrxiv/public-api/v1",
+}
+"""Base URLs of the public services."""
+
+ENDPOINTS = {
+    service: (os.environ.get(f"WENXIAN_ENDPOINT_{service.upper()}") or default).rstrip(
+        "/"
+    )
+    for service, default in DEFAULT_ENDPOINTS.items()
+}
+"""Base URLs in use. Change them with :func:`set_endpoint`."""
+
+
+def endpoint(service: str) -> str:
+    """Return the base URL of a service.
+
+    Parameters
+    ----------
+    service : str
+        The service name, one of :data:`DEFAULT_ENDPOINTS`.
+
+    Returns
+    -------
+    str
+        The base URL without a trailing slash.
+
+    Raises
+    ------
+    ValueError
+        If the service is unknown.
+    """
+    try:
+        return ENDPOINTS[service]
+    except KeyError:
+        raise ValueError(f"Unknown service: {service}") from None
+
+
+def service_for(url: str) -> str:
+    """Return the service a URL belongs to.
+
+    URLs outside every endpoint are attributed to their host.
+    """
+    for service, base in ENDPOINTS.items():
+        if url.startswith(f"{base}/"):
+            return service
+    return urlsplit(url).netloc
+
+
+def set_endpoint(service: str, url: str | None) -> None:
+    """Override the base URL of a service.
+
+    Parameters
+    ----------
+    service : str
+        The service name, one of :data:`DEFAULT_ENDPOINTS`.
+    url : str or None
+        The new base URL, or None to restore the public service.
+
+    Raises
+    ------
+    ValueError
+        If the service is unknown.
+    """
+    if service not in DEFAULT_ENDPOINTS:
+        raise ValueError(f"Unknown service: {service}")
+    ENDPOINTS[service] = (url or DEFAULT_ENDPOINTS[service]).rstrip("/")
+
+    from wenxian.feeder import session
+
+    session.mount_adapters()
+
+
+class Endpoint:
+    """URL of a service route that follows endpoint overrides.
+
+    Used as a class attribute of a feeder, it reads as the current URL on
+    both the class and its instances.
+
+    Parameters
+    ----------
+    service : str
+        The service name, one of :data:`DEFAULT_ENDPOINTS`.
+    path : str
+        The route relative to the service base URL.
+    """
+
+    def __init__(self, service: str, path: str):
+        if service not in DEFAULT_ENDPOINTS:
+            raise ValueError(f"Unknown service: {service}")
+        self.service = service
+        self.path = path
+
+    def __get__(self, instance: object, owner: type | None = None) -> str:
+        """Return the current URL of the route."""
+        return f"{endpoint(self.service)}/{self.path}"
+
+
+__all__ = [
+    "DEFAULT_ENDPOINTS",
+    "ENDPOINTS",
+    "Endpoint",
+    "endpoint",
+    "service_for",
+    "set_endpoint",
+]
@@ -2,15 +2,17 @@
 
 from __future__ import annotations
 
+from wenxian.cache import link_identifiers
+from wenxian.feeder.endpoints import Endpoint
 from wenxian.feeder.feeder import Feeder
-from wenxian.feeder.session import SESSION, async_get
+from wenxian.feeder.session import SESSION, async_get, decode_json
 from wenxian.reference import Author, Reference
 
 
 class Europepmc(Feeder):
     """Feeder for the Europe PMC API."""
 
-    API_URL = "https://www.ebi.ac.uk/europepmc/webservices/rest/search"
+    API_URL = Endpoint("europepmc", "search")
 
     @staticmethod
     def _params(pmid: str | int) -> dict[str, str]:
@@ -27,7 +29,7 @@ class Europepmc(Feeder):
         r = SESSION.get(self.API_URL, params=self._params(pmid))
         if r.status_code != 200:
             return None
-        results = r.json().get("resultList", {}).get("result", [])
+        results = decode_json(r).get("resultList", {}).get("result", [])
         if not results:
             return None
         return self._from_result(results[0])
@@ -37,13 +39,16 @@ class Europepmc(Feeder):
         r = await async_get(self.API_URL, params=self._params(pmid))
         if r.status_code != 200:
             return None
-        results = r.json().get("resultList", {}).get("result", [])
+        results = decode_json(r).get("resultList", {}).get("result", [])
         if not results:
             return None
         return self._from_result(results[0])
 
     def _from_result(self, result: dict) -> Reference:
         """Convert a Europe PMC result into a reference."""
+        link_identifiers(
+            doi=result.get("doi"), pmid=result.get("pmid"), pmcid=result.get("pmcid")
+        )
         authors = []
         for item in result.get("authorList", {}).get("author", []):
             first = item.get("firstName")
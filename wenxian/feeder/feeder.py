@@ -25,6 +25,10 @@ class Feeder:
     def from_title(self, title: str) -> str | None:
         """Search for a paper by title and return its identifier."""
 
+    def search_title(self, title: str, limit: int = 5) -> list[tuple[str, str | None]]:
+        """Search for papers by title and return identifiers with their titles."""
+        return []
+
     @overload
     def _int(self, string: int) -> int: ...
 
@@ -0,0 +1,89 @@
+"""Feeder for a local offline mirror."""
+
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING, ClassVar
+
+from wenxian.feeder.feeder import Feeder
+from wenxian.logger import logger
+from wenxian.metrics import METRICS
+
+if TYPE_CHECKING:
+    from wenxian.reference import Reference
+
+
+class Mirror(Feeder):
+    """Feeder for a local mirror built by ``wenxian mirror build``.
+
+    The mirror is disabled unless :attr:`PATH` is set, either through the
+    ``WENXIAN_MIRROR`` environment variable or the ``--mirror`` option.
+    """
+
+    PATH: ClassVar[str | None] = os.environ.get("WENXIAN_MIRROR") or None
+    """Path to the mirror database."""
+
+    def _lookup(self, kind: str, identifier: str | int) -> Reference | None:
+        """Look up an identifier, treating an unreadable mirror as a miss."""
+        if self.PATH is None:
+            return None
+        import sqlite3
+
+        from wenxian.mirror import lookup
+
+        try:
+            reference = lookup(self.PATH, kind, identifier)
+        except sqlite3.Error as exc:
+            logger.warning("Mirror %s is unavailable: %s", self.PATH, exc)
+            return None
+        METRICS.record_cache("mirror", reference is not None)
+        return reference
+
+    def _search(self, title: str, limit: int) -> list[tuple[str, str | None]]:
+        """Search the local title index, treating a missing index as a miss."""
+        if self.PATH is None:
+            return []
+        import sqlite3
+
+        from wenxian.title_index import search
+
+        try:
+            return list(search(self.PATH, title, limit=limit))
+        except sqlite3.Error as exc:
+            logger.warning("Mirror title index %s is unavailable: %s", self.PATH, exc)
+            return []
+
+    def from_doi(self, doi: str) -> Reference | None:
+        """Fetch a reference from a DOI."""
+        return self._lookup("doi", doi)
+
+    async def async_from_doi(self, doi: str) -> Reference | None:
+        """Fetch a reference from a DOI asynchronously."""
+        return self._lookup("doi", doi)
+
+    def from_pmid(self, pmid: str | int) -> Reference | None:
+        """Fetch a reference from a PMID."""
+        return self._lookup("pmid", pmid)
+
+    async def async_from_pmid(self, pmid: str | int) -> Reference | None:
+        """Fetch a reference from a PMID asynchronously."""
+        return self._lookup("pmid", pmid)
+
+    def search_title(self, title: str, limit: int = 5) -> list[tuple[str, str | None]]:
+        """Search the local title index and return DOIs with their titles."""
+        return self._search(title, limit)
+
+    async def async_search_title(
+        self, title: str, limit: int = 5
+    ) -> list[tuple[str, str | None]]:
+        """Search the local title index asynchronously."""
+        return self._search(title, limit)
+
+    def from_title(self, title: str) -> str | None:
+        """Search for a paper by title and return its DOI."""
+        candidates = self._search(title, 1)
+        return candidates[0][0] if candidates else None
+
+    async def async_from_title(self, title: str) -> str | None:
+        """Search for a paper by title asynchronously."""
+        return self.from_title(title)
@@ -2,22 +2,36 @@
 
 from __future__ import annotations
 
-from json import JSONDecodeError
-from typing import ClassVar
+import re
+from io import BytesIO
+from typing import TYPE_CHECKING, Any, ClassVar
 from xml.etree import ElementTree
 
 from wenxian import __email__, __tool__
+from wenxian.cache import link_identifiers, linked_identifiers
+from wenxian.feeder.endpoints import Endpoint
 from wenxian.feeder.feeder import Feeder
-from wenxian.feeder.session import SESSION, async_get
+from wenxian.feeder.session import SESSION, async_get, decode_json
+from wenxian.feeder.xml_backend import XPath, iter_elements, resolve
 from wenxian.reference import Author, Reference
+from wenxian.tracing import span
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
+
+    from _typeshed import SupportsRead
+
+_PREDICATE = re.compile(r"(?P<path>[^\[]+)(?:\[@(?P<name>\w+)='(?P<value>[^']*)'\])?")
 
 
 class Pubmed(Feeder):
     """Feeder for PubMed."""
 
-    PMC_IDCONV_URL = "https://www.ncbi.nlm.nih.gov/pmc/utils/idconv/v1.0/"
-    ESEARCH_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
-    EFETCH_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
+    PMC_IDCONV_URL = Endpoint("pmc", "idconv/v1.0/")
+    ESEARCH_URL = Endpoint("eutils", "esearch.fcgi")
+    EFETCH_URL = Endpoint("eutils", "efetch.fcgi")
+    BATCH_SIZE = 200
+    """Most PMIDs fetched in one efetch request."""
 
     @staticmethod
     def _pmid_from_pmc_data(data: dict) -> str | None:
@@ -26,6 +40,11 @@ class Pubmed(Feeder):
             return None
         records = data["records"]
         if records and "pmid" in records[0]:
+            link_identifiers(
+                doi=records[0].get("doi"),
+                pmid=records[0]["pmid"],
+                pmcid=records[0].get("pmcid"),
+            )
             return records[0]["pmid"]
         return None
 
@@ -38,8 +57,8 @@ class Pubmed(Feeder):
         if r.status_code != 200:
             return None
         try:
-            return self._pmid_from_pmc_data(r.json())
-        except (JSONDecodeError, KeyError, TypeError):
+            return self._pmid_from_pmc_data(decode_json(r))
+        except (KeyError, TypeError, ValueError):
             return None
 
     async def _async_doi2pmid_pmc(self, doi: str) -> str | None:
@@ -51,7 +70,7 @@ class Pubmed(Feeder):
         if r.status_code != 200:
             return None
         try:
-            return self._pmid_from_pmc_data(r.json())
+            return self._pmid_from_pmc_data(decode_json(r))
         except (KeyError, TypeError, ValueError):
             return None
 
@@ -77,8 +96,8 @@ class Pubmed(Feeder):
         if r.status_code != 200:
             return None
         try:
-            return self._pmid_from_search_data(r.json())
-        except (JSONDecodeError, KeyError, TypeError):
+            return self._pmid_from_search_data(decode_json(r))
+        except (KeyError, TypeError, ValueError):
             return None
 
     async def _async_doi2pmid_search(self, doi: str) -> str | None:
@@ -97,27 +116,34 @@ class Pubmed(Feeder):
         if r.status_code != 200:
             return None
         try:
-            return self._pmid_from_search_data(r.json())
+            return self._pmid_from_search_data(decode_json(r))
         except (KeyError, TypeError, ValueError):
             return None
 
     PUBMED_PATH: ClassVar[dict[str, str]] = {
-        "author": "PubmedArticle/MedlineCitation/Article/AuthorList/Author",
-        "title": "PubmedArticle/MedlineCitation/Article/ArticleTitle",
-        "abstract": "PubmedArticle/MedlineCitation/Article/Abstract/AbstractText",
-        "journal": "PubmedArticle/MedlineCitation/Article/Journal/Title",
-        "volume": "PubmedArticle/MedlineCitation/Article/Journal/JournalIssue/Volume",
-        "issue": "PubmedArticle/MedlineCitation/Article/Journal/JournalIssue/Issue",
-        "year": "PubmedArticle/MedlineCitation/Article/Journal/JournalIssue/PubDate/Year",
-        "pages": "PubmedArticle/MedlineCitation/Article/Pagination/MedlinePgn",
-        "doi": "PubmedArticle/PubmedData/ArticleIdList/ArticleId[@IdType='doi']",
-        "pii": "PubmedArticle/MedlineCitation/Article/ELocationID[@EIdType='pii']",
+        "pmid": "MedlineCitation/PMID",
+        "author": "MedlineCitation/Article/AuthorList/Author",
+        "title": "MedlineCitation/Article/ArticleTitle",
+        "abstract": "MedlineCitation/Article/Abstract/AbstractText",
+        "journal": "MedlineCitation/Article/Journal/Title",
+        "volume": "MedlineCitation/Article/Journal/JournalIssue/Volume",
+        "issue": "MedlineCitation/Article/Journal/JournalIssue/Issue",
+        "year": "MedlineCitation/Article/Journal/JournalIssue/PubDate/Year",
+        "pages": "MedlineCitation/Article/Pagination/MedlinePgn",
+        "doi": "PubmedData/ArticleIdList/ArticleId[@IdType='doi']",
+        "pii": "MedlineCitation/Article/ELocationID[@EIdType='pii']",
     }
-    """XPath for PubMed XML."""
+    """XPath of each field relative to a ``PubmedArticle`` element."""
 
     def from_doi(self, doi: str) -> Reference | None:
-        """Fetch a reference from a DOI."""
-        pmid = self._doi2pmid_pmc(doi)
+        """Fetch a reference from a DOI.
+
+        A PMID linked to the DOI in :data:`wenxian.cache.CROSSWALK` is used
+        without converting the DOI.
+        """
+        pmid = linked_identifiers("doi", doi).get("pmid")
+        if pmid is None:
+            pmid = self._doi2pmid_pmc(doi)
         if pmid is None:
             pmid = self._doi2pmid_search(doi)
         if pmid is None:
@@ -126,7 +152,9 @@ class Pubmed(Feeder):
 
     async def async_from_doi(self, doi: str) -> Reference | None:
         """Fetch a reference from a DOI asynchronously."""
-        pmid = await self._async_doi2pmid_pmc(doi)
+        pmid = linked_identifiers("doi", doi).get("pmid")
+        if pmid is None:
+            pmid = await self._async_doi2pmid_pmc(doi)
         if pmid is None:
             pmid = await self._async_doi2pmid_search(doi)
         if pmid is None:
@@ -141,75 +169,180 @@ class Pubmed(Feeder):
         """Fetch a reference from a PMID asynchronously."""
         return await self._async_from_pmid(pmid)
 
+    def _efetch_params(self, pmids: str) -> dict[str, str]:
+        """Return the efetch parameters for comma-separated PMIDs."""
+        return {
+            "tool": __tool__,
+            "email": __email__,
+            "db": "pubmed",
+            "id": pmids,
+            "format": "xml",
+        }
+
+    def _from_batch_content(self, content: bytes) -> dict[str, Reference]:
+        """Convert PubMed XML into references keyed by PMID."""
+        with span("parse", source="PubMed", size=len(content)):
+            return {
+                pmid: reference
+                for pmid, reference in self._iter_articles(BytesIO(content))
+                if pmid is not None
+            }
+
+    def from_pmids(self, pmids: Sequence[str | int]) -> dict[str, Reference]:
+        """Fetch references from up to :attr:`BATCH_SIZE` PMIDs in one request.
+
+        Returns
+        -------
+        dict[str, Reference]
+            The references found, keyed by PMID.
+        """
+        r = SESSION.get(
+            self.EFETCH_URL,
+            params=self._efetch_params(",".join(str(pmid) for pmid in pmids)),
+        )
+        if r.status_code != 200:
+            return {}
+        return self._from_batch_content(r.content)
+
+    async def async_from_pmids(
+        self, pmids: Sequence[str | int]
+    ) -> dict[str, Reference]:
+        """Fetch references from up to :attr:`BATCH_SIZE` PMIDs asynchronously."""
+        r = await async_get(
+            self.EFETCH_URL,
+            params=self._efetch_params(",".join(str(pmid) for pmid in pmids)),
+        )
+        if r.status_code != 200:
+            return {}
+        return self._from_batch_content(r.content)
+
     def _from_content(
         self, content: bytes, validate_doi: str | None = None
     ) -> Reference | None:
-        """Convert PubMed XML into a reference."""
-        tree = ElementTree.fromstring(content)
-        fetched_doi = self._text(tree.find(self.PUBMED_PATH["doi"]))
-        if validate_doi is not None and fetched_doi != validate_doi:
+        """Convert PubMed XML into the reference of its first article."""
+        with span("parse", source="PubMed", size=len(content)):
+            for _, reference in self._iter_articles(BytesIO(content)):
+                if validate_doi is not None and reference.doi != validate_doi:
+                    return None
+                return reference
             return None
-        rets = {}
-        for key, path in self.PUBMED_PATH.items():
-            if key == "abstract":
-                abstract_sections = [
-                    self._text(node)
-                    for node in tree.findall(self.PUBMED_PATH["abstract"])
-                ]
-                rets[key] = (
-                    " ".join(section for section in abstract_sections if section)
-                    or None
-                )
-            elif key != "author":
-                rets[key] = self._text(tree.find(path))
-
-        if rets["journal"] == "Physical chemistry chemical physics : PCCP":
-            rets["journal"] = "Physical chemistry chemical physics"
-
-        author = []
-        for aa in tree.findall(self.PUBMED_PATH["author"]):
-            collective = self._text(aa.find("CollectiveName"))
-            if collective is not None:
-                author.append(Author(first="", last=collective))
+
+    def _iter_articles(
+        self, source: SupportsRead[bytes]
+    ) -> Iterator[tuple[str | None, Reference]]:
+        """Stream ``(pmid, reference)`` pairs from a ``PubmedArticleSet``.
+
+        Each article is cleared once its reference is built, so memory use
+        does not grow with the number of articles. With lxml the fields of
+        each article are read with precompiled XPath expressions; otherwise
+        they are collected in a single pass over the parse events. The PMID
+        and DOI of each article are linked in :data:`wenxian.cache.CROSSWALK`.
+        """
+        if resolve() == "lxml":
+            articles = self._iter_articles_xpath(source)
+        else:
+            articles = self._iter_articles_events(source)
+        for pmid, reference in articles:
+            link_identifiers(pmid=pmid, doi=reference.doi)
+            yield pmid, reference
+
+    def _iter_articles_xpath(
+        self, source: SupportsRead[bytes]
+    ) -> Iterator[tuple[str | None, Reference]]:
+        """Stream articles, evaluating :attr:`PUBMED_PATH` on each with lxml."""
+        for article in iter_elements(source, "PubmedArticle", "lxml"):
+            fields: dict[str, Any] = {
+                "author": [self._author(node) for node in _XPATHS["author"](article)],
+                "abstract": [self._text(node) for node in _XPATHS["abstract"](article)],
+            }
+            for key, path in _XPATHS.items():
+                if key not in fields:
+                    fields[key] = self._text(path.first(article))
+            pmid = fields.pop("pmid")
+            yield pmid, self._from_fields(fields)
+
+    def _iter_articles_events(
+        self, source: SupportsRead[bytes]
+    ) -> Iterator[tuple[str | None, Reference]]:
+        """Stream articles, collecting fields in one pass over the parse events.
+
+        Fields are read at the end events of the elements matching
+        :attr:`PUBMED_PATH`, so every article is walked once.
+        """
+        root = None
+        path: list[str] = []
+        fields: dict[str, Any] = {}
+        for event, element in ElementTree.iterparse(source, events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = element
+                if path or element.tag == "PubmedArticle":
+                    path.append(element.tag)
                 continue
-            first = self._text(aa.find("ForeName"))
-            if first is not None:
-                first = " ".join(f"{x}." if len(x) == 1 else x for x in first.split())
-            author.append(
-                Author(
-                    first=first,
-                    last=self._text(aa.find("LastName")),
-                    suffix=self._text(aa.find("Suffix")),
-                )
-            )
-        year = self._int(rets["year"])
+            if not path:
+                continue
+            if len(path) == 1:
+                path.pop()
+                pmid = fields.pop("pmid", None)
+                reference = self._from_fields(fields)
+                fields = {}
+                assert root is not None
+                root.clear()
+                yield pmid, reference
+                continue
+            for key, attribute in _FIELD_PATHS.get(tuple(path[1:]), ()):
+                if attribute is not None and element.get(attribute[0]) != attribute[1]:
+                    continue
+                if key == "author":
+                    fields.setdefault(key, []).append(self._author(element))
+                elif key == "abstract":
+                    fields.setdefault(key, []).append(self._text(element))
+                elif key not in fields:
+                    fields[key] = self._text(element)
+            path.pop()
+
+    def _author(self, element: ElementTree.Element) -> Author:
+        """Convert an ``Author`` element into an author."""
+        collective = self._text(element.find("CollectiveName"))
+        if collective is not None:
+            return Author(first="", last=collective)
+        first = self._text(element.find("ForeName"))
+        if first is not None:
+            first = " ".join(f"{x}." if len(x) == 1 else x for x in first.split())
+        return Author(
+            first=first,
+            last=self._text(element.find("LastName")),
+            suffix=self._text(element.find("Suffix")),
+        )
+
+    def _from_fields(self, fields: dict[str, Any]) -> Reference:
+        """Build a reference from the fields collected for one article."""
+        journal = fields.get("journal")
+        if journal == "Physical chemistry chemical physics : PCCP":
+            journal = "Physical chemistry chemical physics"
+        title = fields.get("title")
+        abstract = " ".join(
+            section for section in fields.get("abstract", ()) if section
+        )
+        year = self._int(fields.get("year"))
         if year is not None:
             assert isinstance(year, int)
         return Reference(
-            author=author,
-            title=rets["title"].rstrip(".") if rets["title"] is not None else None,
-            journal=rets["journal"],
+            author=fields.get("author", []),
+            title=title.rstrip(".") if title is not None else None,
+            journal=journal,
             year=year,
-            volume=self._int(rets["volume"]),
-            issue=self._int(rets["issue"]),
-            pages=self._pages(rets["pages"]) or rets["pii"],
-            annote=rets["abstract"],
-            doi=fetched_doi,
+            volume=self._int(fields.get("volume")),
+            issue=self._int(fields.get("issue")),
+            pages=self._pages(fields.get("pages")) or fields.get("pii"),
+            annote=abstract or None,
+            doi=fields.get("doi"),
         )
 
     def _from_pmid(
         self, pmid: str | int, validate_doi: str | None = None
     ) -> Reference | None:
-        r = SESSION.get(
-            self.EFETCH_URL,
-            params={
-                "tool": __tool__,
-                "email": __email__,
-                "db": "pubmed",
-                "id": str(pmid),
-                "format": "xml",
-            },
-        )
+        r = SESSION.get(self.EFETCH_URL, params=self._efetch_params(str(pmid)))
         if r.status_code != 200:
             return None
         return self._from_content(r.content, validate_doi)
@@ -217,16 +350,28 @@ class Pubmed(Feeder):
     async def _async_from_pmid(
         self, pmid: str | int, validate_doi: str | None = None
     ) -> Reference | None:
-        r = await async_get(
-            self.EFETCH_URL,
-            params={
-                "tool": __tool__,
-                "email": __email__,
-                "db": "pubmed",
-                "id": str(pmid),
-                "format": "xml",
-            },
-        )
+        r = await async_get(self.EFETCH_URL, params=self._efetch_params(str(pmid)))
         if r.status_code != 200:
             return None
         return self._from_content(r.content, validate_doi)
+
+
+def _compile_paths(
+    paths: dict[str, str],
+) -> dict[tuple[str, ...], list[tuple[str, tuple[str, str] | None]]]:
+    """Index field paths by element path for the single-pass extractor."""
+    compiled: dict[tuple[str, ...], list[tuple[str, tuple[str, str] | None]]] = {}
+    for key, xpath in paths.items():
+        match = _PREDICATE.fullmatch(xpath)
+        assert match is not None
+        attribute = (
+            (match["name"], match["value"]) if match["name"] is not None else None
+        )
+        compiled.setdefault(tuple(match["path"].split("/")), []).append(
+            (key, attribute)
+        )
+    return compiled
+
+
+_FIELD_PATHS = _compile_paths(Pubmed.PUBMED_PATH)
+_XPATHS = {key: XPath(path) for key, path in Pubmed.PUBMED_PATH.items()}
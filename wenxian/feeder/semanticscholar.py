@@ -5,8 +5,11 @@ from __future__ import annotations
 import html
 import sys
 
+from wenxian.cache import link_identifiers
+from wenxian.feeder.endpoints import Endpoint
 from wenxian.feeder.feeder import Feeder
-from wenxian.feeder.session import SESSION, async_get
+from wenxian.feeder.session import SESSION, async_get, decode_json
+from wenxian.fields import requested_fields
 from wenxian.reference import Author, Reference
 
 if sys.platform != "emscripten":
@@ -17,49 +20,91 @@ else:
     _REQUEST_ERRORS = (OSError,)
 
 
+def _link_external_ids(external_ids: dict) -> None:
+    """Record the identifiers Semantic Scholar links to a paper."""
+    link_identifiers(
+        doi=external_ids.get("DOI"),
+        pmid=external_ids.get("PubMed"),
+        pmcid=external_ids.get("PubMedCentral"),
+        arxiv=external_ids.get("ArXiv"),
+    )
+
+
 class Semanticscholar(Feeder):
     """Feeder for Semantic Scholar API."""
 
-    API_URL = "https://api.semanticscholar.org/graph/v1/paper"
+    API_URL = Endpoint("semanticscholar", "paper")
+    PAPER_FIELDS = "title,year,authors.name,journal,externalIds"
+    """Paper fields read by :meth:`_from_data`, besides the abstract."""
+
+    @classmethod
+    def _paper_fields(cls) -> str:
+        """Return the paper fields, with the abstract only if it is requested."""
+        if "annote" in requested_fields():
+            return f"{cls.PAPER_FIELDS},abstract"
+        return cls.PAPER_FIELDS
 
     @staticmethod
-    def _identifier_from_title_data(data: dict) -> str | None:
-        """Extract the preferred external identifier from search data."""
-        papers = data.get("data", [])
-        if not papers:
-            return None
-        external_ids = papers[0].get("externalIds", {})
-        return (
-            external_ids.get("DOI")
-            or external_ids.get("PubMed")
-            or external_ids.get("ArXiv")
-        )
+    def _candidates_from_title_data(data: dict) -> list[tuple[str, str | None]]:
+        """Extract preferred external identifiers and titles from search data."""
+        candidates = []
+        for paper in data.get("data", []):
+            external_ids = paper.get("externalIds") or {}
+            _link_external_ids(external_ids)
+            identifier = (
+                external_ids.get("DOI")
+                or external_ids.get("PubMed")
+                or external_ids.get("ArXiv")
+            )
+            if identifier:
+                candidates.append((identifier, paper.get("title")))
+        return candidates
 
-    def from_title(self, title: str) -> str | None:
-        """Search for a paper by title and return its identifier."""
+    def search_title(self, title: str, limit: int = 5) -> list[tuple[str, str | None]]:
+        """Search for papers by title and return identifiers with their titles."""
         try:
             r = SESSION.get(
                 f"{self.API_URL}/search",
-                params={"query": title, "limit": "1", "fields": "externalIds"},
+                params={
+                    "query": title,
+                    "limit": str(limit),
+                    "fields": "externalIds,title",
+                },
             )
         except _REQUEST_ERRORS:
-            return None
+            return []
         if r.status_code != 200:
-            return None
-        return self._identifier_from_title_data(r.json())
+            return []
+        return self._candidates_from_title_data(decode_json(r))
 
-    async def async_from_title(self, title: str) -> str | None:
-        """Search for a paper by title asynchronously."""
+    async def async_search_title(
+        self, title: str, limit: int = 5
+    ) -> list[tuple[str, str | None]]:
+        """Search for papers by title asynchronously."""
         try:
             r = await async_get(
                 f"{self.API_URL}/search",
-                params={"query": title, "limit": "1", "fields": "externalIds"},
+                params={
+                    "query": title,
+                    "limit": str(limit),
+                    "fields": "externalIds,title",
+                },
             )
         except _REQUEST_ERRORS:
-            return None
+            return []
         if r.status_code != 200:
-            return None
-        return self._identifier_from_title_data(r.json())
+            return []
+        return self._candidates_from_title_data(decode_json(r))
+
+    def from_title(self, title: str) -> str | None:
+        """Search for a paper by title and return its identifier."""
+        candidates = self.search_title(title, limit=1)
+        return candidates[0][0] if candidates else None
+
+    async def async_from_title(self, title: str) -> str | None:
+        """Search for a paper by title asynchronously."""
+        candidates = await self.async_search_title(title, limit=1)
+        return candidates[0][0] if candidates else None
 
     @staticmethod
     def _from_data(data: dict) -> Reference:
@@ -75,12 +120,13 @@ class Semanticscholar(Feeder):
         else:
             journal = None
         external_ids = data.get("externalIds") or {}
+        _link_external_ids(external_ids)
         return Reference(
             author=authors,
             title=data["title"],
             journal=journal,
             year=data["year"],
-            annote=data["abstract"],
+            annote=data.get("abstract"),
             doi=external_ids.get("DOI"),
         )
 
@@ -89,30 +135,26 @@ class Semanticscholar(Feeder):
         try:
             r = SESSION.get(
                 f"{self.API_URL}/{identifier}",
-                params={
-                    "fields": "title,year,abstract,authors.name,journal,externalIds"
-                },
+                params={"fields": self._paper_fields()},
             )
         except _REQUEST_ERRORS:
             return None
         if r.status_code == 404:
             return None
-        return self._from_data(r.json())
+        return self._from_data(decode_json(r))
 
     async def _async_from_identifier(self, identifier: str) -> Reference | None:
         """Fetch a reference from an identifier asynchronously."""
         try:
             r = await async_get(
                 f"{self.API_URL}/{identifier}",
-                params={
-                    "fields": "title,year,abstract,authors.name,journal,externalIds"
-                },
+                params={"fields": self._paper_fields()},
             )
         except _REQUEST_ERRORS:
             return None
         if r.status_code == 404:
             return None
-        return self._from_data(r.json())
+        return self._from_data(decode_json(r))
 
     def from_doi(self, doi: str) -> Reference | None:
         """Fetch a reference from a DOI."""
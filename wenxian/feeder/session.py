@@ -3,23 +3,176 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import json
+import os
+import socket
 import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass
 from typing import TYPE_CHECKING
 from urllib.parse import urlencode
 
+from wenxian import cache as response_cache
+from wenxian.cache import cache_key
+from wenxian.feeder.endpoints import endpoint, service_for
+from wenxian.logger import logger
+from wenxian.metrics import METRICS
+from wenxian.tracing import span
+
 if TYPE_CHECKING:
     from asyncio import AbstractEventLoop
-    from collections.abc import Mapping
+    from collections.abc import Callable, Iterator, Mapping
     from typing import Any
 
 if sys.platform != "emscripten":
     from pyrate_limiter import Duration, Limiter, Rate
-    from requests import Session
+    from requests import Response, Session
     from requests.adapters import HTTPAdapter, Retry
     from requests_ratelimiter import LimiterAdapter
     from requests_ratelimiter.requests_ratelimiter import HostBucketFactory
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+def _json_loads() -> Callable[[bytes | str], Any]:
+    """Return the fastest available JSON decoder.
+
+    orjson and msgspec are optional; the standard library is used when
+    neither is installed and always in Pyodide, which only loads the
+    packages a snippet imports.
+    """
+    if sys.platform != "emscripten":
+        try:
+            import orjson
+        except ImportError:
+            pass
+        else:
+            return orjson.loads
+        try:
+            import msgspec  # type: ignore[import-not-found]
+        except ImportError:
+            pass
+        else:
+            return msgspec.json.decode
+    return json.loads
+
+
+json_loads = _json_loads()
+"""Decode a JSON document from bytes or str.
+
+Invalid documents raise a :class:`ValueError` subclass.
+"""
+
+
+def decode_json(response: Any) -> Any:
+    """Decode the body of a response as JSON.
+
+    Parameters
+    ----------
+    response : requests.Response or Pyodide response
+        A response whose ``content`` holds the raw body.
+
+    Returns
+    -------
+    Any
+        The decoded document.
+
+    Raises
+    ------
+    ValueError
+        If the body is not valid JSON.
+    """
+    with span("decode_json", size=len(response.content)):
+        return json_loads(response.content)
+
+
+_STATUSES: ContextVar[list[int] | None] = ContextVar("wenxian_statuses", default=None)
+
+
+@contextmanager
+def collect_statuses() -> Iterator[list[int]]:
+    """Collect the final status of every request made in this context.
+
+    Requests made by :func:`async_get` in worker threads are included. A
+    request that raised is collected as 0.
+
+    Yields
+    ------
+    list[int]
+        The statuses, filled in as requests complete.
+    """
+    statuses: list[int] = []
+    token = _STATUSES.set(statuses)
+    try:
+        yield statuses
+    finally:
+        _STATUSES.reset(token)
+
+
+def _collect_status(status: int) -> None:
+    """Add a status to the statuses being collected, if any."""
+    statuses = _STATUSES.get()
+    if statuses is not None:
+        statuses.append(status)
+
+
+BASE_URL: str | None = None
+"""Base URL of a stand-in server receiving all service requests, if any."""
+
+
+def _rewrite_url(url: str) -> str:
+    """Redirect a service URL to :data:`BASE_URL` when it is set."""
+    if BASE_URL is None or not url.startswith("https://"):
+        return url
+    return f"{BASE_URL}/{url.removeprefix('https://')}"
+
+
+def set_base_url(url: str | None) -> None:
+    """Send all service requests to a stand-in server.
+
+    ``https://<host>/<path>`` is requested as ``<url>/<host>/<path>``, e.g.
+    from a :class:`wenxian.testing.MockServer`. The per-service rate limiters
+    and retries apply to the redirected requests as they would to the real
+    services.
+
+    Parameters
+    ----------
+    url : str or None
+        The base URL of the server, or None to contact the real services.
+    """
+    global BASE_URL
+    BASE_URL = url.rstrip("/") if url else None
+    mount_adapters()
+
+
+_MOUNTED: list[str] = []
+
+
+def mount_adapters() -> None:
+    """Mount the per-service adapters under the current endpoints.
+
+    Called whenever :func:`set_base_url` or
+    :func:`wenxian.feeder.endpoints.set_endpoint` moves a service, so that
+    its rate limiter and retries follow the requests.
+    """
+    if sys.platform == "emscripten":
+        return
+    for prefix in _MOUNTED:
+        SESSION.adapters.pop(prefix, None)
+    _MOUNTED.clear()
+    mounts = [
+        (_rewrite_url(f"{endpoint(service)}/"), adapter)
+        for service, adapter in _ADAPTERS.items()
+    ]
+    if BASE_URL is not None:
+        mounts.append((f"{BASE_URL}/", _DEFAULT_ADAPTER))
+    for prefix, adapter in mounts:
+        SESSION.mount(prefix, adapter)
+        _MOUNTED.append(prefix)
 
 
 @dataclass
@@ -31,7 +184,7 @@ class _BrowserResponse:
 
     def json(self) -> Any:
         """Decode the response body as JSON."""
-        return json.loads(self.content)
+        return json_loads(self.content)
 
 
 @dataclass
@@ -81,9 +234,84 @@ if sys.platform != "emscripten":
         """Requests session that applies a bounded timeout by default."""
 
         def request(self, method, url, **kwargs):
-            """Send a request with the shared default timeout unless overridden."""
+            """Send a request with the shared default timeout unless overridden.
+
+            The request is recorded in :data:`wenxian.metrics.METRICS` under
+            the service of the original URL.
+            """
             kwargs.setdefault("timeout", _DEFAULT_TIMEOUT)
-            return super().request(method, url, **kwargs)
+            cache = response_cache.CACHE
+            key = None
+            if cache is not None and method == "GET" and not kwargs.get("stream"):
+                key = cache_key(url, kwargs.get("params"))
+                body = cache.get(key)
+                if body is not None:
+                    _collect_status(200)
+                    return _cached_response(url, body)
+            service = service_for(url)
+            _LIMITER_WAIT.seconds = 0.0
+            with span("http", service=service, method=method, url=url) as current:
+                start = time.perf_counter()
+                try:
+                    response = super().request(method, _rewrite_url(url), **kwargs)
+                except Exception:
+                    _collect_status(0)
+                    METRICS.record_request(
+                        service,
+                        time.perf_counter() - start,
+                        wait=_LIMITER_WAIT.seconds,
+                    )
+                    raise
+                _collect_status(response.status_code)
+                history = getattr(getattr(response.raw, "retries", None), "history", ())
+                size = 0 if kwargs.get("stream") else len(response.content)
+                METRICS.record_request(
+                    service,
+                    time.perf_counter() - start,
+                    status=response.status_code,
+                    size=size,
+                    retries=len(history),
+                    wait=_LIMITER_WAIT.seconds,
+                )
+                current.set_attribute("status", response.status_code)
+                current.set_attribute("size", size)
+                current.set_attribute("retries", len(history))
+            if key is not None and cache is not None and response.status_code == 200:
+                cache.set(key, response.content)
+            return response
+
+    def _cached_response(url: str, body: bytes) -> Response:
+        """Build a response for a body served from the response cache."""
+        response = Response()
+        response.status_code = 200
+        response.url = url
+        response._content = body
+        response.headers["X-Wenxian-Cache"] = "hit"
+        return response
+
+    _LIMITER_WAIT = threading.local()
+    """Time the current thread spent in rate limiters during its request."""
+
+    class _TimedLimiter:
+        """Limiter proxy that adds acquire time to :data:`_LIMITER_WAIT`."""
+
+        def __init__(self, limiter: Limiter):
+            self._limiter = limiter
+
+        def try_acquire(self, *args, **kwargs):
+            """Acquire the wrapped limiter and record the wait."""
+            start = time.perf_counter()
+            try:
+                with span("rate_limit", bucket=args[0] if args else None):
+                    return self._limiter.try_acquire(*args, **kwargs)
+            finally:
+                _LIMITER_WAIT.seconds = (
+                    getattr(_LIMITER_WAIT, "seconds", 0.0) + time.perf_counter() - start
+                )
+
+        def __getattr__(self, name: str) -> Any:
+            """Delegate everything else to the wrapped limiter."""
+            return getattr(self._limiter, name)
 
     SESSION = _TimeoutSession()
 
@@ -101,19 +329,66 @@ if sys.platform != "emscripten":
     )
 
     adapter_ncbi = LimiterAdapter(per_second=3, max_retries=retries)
-    SESSION.mount("https://www.ncbi.nlm.nih.gov/pmc/utils/", adapter_ncbi)
-    SESSION.mount("https://eutils.ncbi.nlm.nih.gov/", adapter_ncbi)
     adapter_crossref = LimiterAdapter(per_second=50, max_retries=retries)
-    SESSION.mount("https://api.crossref.org/", adapter_crossref)
     adapter_arxiv = LimiterAdapter(
         limiter=Limiter(HostBucketFactory([Rate(1, Duration.SECOND * 3)])),
         burst=1,
         max_retries=retries,
     )
-    SESSION.mount("https://export.arxiv.org/api", adapter_arxiv)
     adapter_semanticscholar = LimiterAdapter(per_second=1, max_retries=retries)
-    SESSION.mount("https://api.semanticscholar.org/", adapter_semanticscholar)
-    SESSION.mount("https://", HTTPAdapter(max_retries=retries))
+    for _adapter in (
+        adapter_ncbi,
+        adapter_crossref,
+        adapter_arxiv,
+        adapter_semanticscholar,
+    ):
+        _adapter.limiter = _TimedLimiter(_adapter.limiter)  # type: ignore[assignment]
+    _DEFAULT_ADAPTER = HTTPAdapter(max_retries=retries)
+    _ADAPTERS: dict[str, HTTPAdapter] = {
+        "pmc": adapter_ncbi,
+        "eutils": adapter_ncbi,
+        "crossref": adapter_crossref,
+        "arxiv": adapter_arxiv,
+        "semanticscholar": adapter_semanticscholar,
+        "datacite": _DEFAULT_ADAPTER,
+        "europepmc": _DEFAULT_ADAPTER,
+        "chemrxiv": _DEFAULT_ADAPTER,
+    }
+    """Adapter of each service, mounted under its endpoint."""
+    SESSION.mount("https://", _DEFAULT_ADAPTER)
+
+    @functools.cache
+    def _counted(connection_class: type[HTTPConnection]) -> type[HTTPConnection]:
+        """Return a subclass of a connection class that records its connections."""
+
+        class Counted(connection_class):  # type: ignore[valid-type,misc]
+            def connect(self) -> None:
+                super().connect()
+                METRICS.record_connection(
+                    self.host, tls=isinstance(self, HTTPSConnection)
+                )
+
+        Counted.__name__ = Counted.__qualname__ = connection_class.__name__
+        return Counted
+
+    class _CountedHTTPConnectionPool(HTTPConnectionPool):
+        """HTTP pool whose new connections are recorded in the metrics."""
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.ConnectionCls = _counted(self.ConnectionCls)
+
+    class _CountedHTTPSConnectionPool(HTTPSConnectionPool):
+        """HTTPS pool whose connections and TLS handshakes are recorded."""
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.ConnectionCls = _counted(self.ConnectionCls)
+
+    _POOL_CLASSES = {
+        "http": _CountedHTTPConnectionPool,
+        "https": _CountedHTTPSConnectionPool,
+    }
 else:
     SESSION = _BrowserSession()
 
@@ -123,13 +398,13 @@ _BROWSER_TIMEOUT = 20.0
 _BROWSER_RETRIES = 2
 _BROWSER_BACKOFF = 0.1
 _BROWSER_NCBI_LIMITER = _AsyncSpacingLimiter(1 / 3)
-_BROWSER_LIMITERS = (
-    ("https://www.ncbi.nlm.nih.gov/pmc/utils/", _BROWSER_NCBI_LIMITER),
-    ("https://eutils.ncbi.nlm.nih.gov/", _BROWSER_NCBI_LIMITER),
-    ("https://api.crossref.org/", _AsyncSpacingLimiter(1 / 50)),
-    ("https://export.arxiv.org/api", _AsyncSpacingLimiter(3)),
-    ("https://api.semanticscholar.org/", _AsyncSpacingLimiter(1)),
-)
+_BROWSER_LIMITERS = {
+    "pmc": _BROWSER_NCBI_LIMITER,
+    "eutils": _BROWSER_NCBI_LIMITER,
+    "crossref": _AsyncSpacingLimiter(1 / 50),
+    "arxiv": _AsyncSpacingLimiter(3),
+    "semanticscholar": _AsyncSpacingLimiter(1),
+}
 
 
 def _url_with_params(url: str, params: Mapping[str, str | int] | None) -> str:
@@ -142,8 +417,8 @@ def _url_with_params(url: str, params: Mapping[str, str | int] | None) -> str:
 
 def _browser_limiter_for(url: str) -> _AsyncSpacingLimiter | None:
     """Return the configured browser-side limiter for a URL."""
-    for prefix, limiter in _BROWSER_LIMITERS:
-        if url.startswith(prefix):
+    for service, limiter in _BROWSER_LIMITERS.items():
+        if url.startswith(f"{endpoint(service)}/"):
             return limiter
     return None
 
@@ -155,7 +430,9 @@ async def _browser_get(
     from pyodide.http import pyfetch  # type: ignore[import-not-found]
 
     async def fetch_and_read() -> _BrowserResponse:
-        response = await pyfetch(_url_with_params(url, params), method="GET")
+        response = await pyfetch(
+            _url_with_params(_rewrite_url(url), params), method="GET"
+        )
         return _BrowserResponse(response.status, await response.bytes())
 
     return await asyncio.wait_for(fetch_and_read(), timeout=_BROWSER_TIMEOUT)
@@ -167,22 +444,191 @@ async def async_get(url: str, *, params: Mapping[str, str | int] | None = None)
     Native Python runs the existing rate-limited requests session in a worker
     thread. Pyodide cannot start threads, so it uses ``pyfetch`` instead.
     """
-    if sys.platform != "emscripten":
-        return await asyncio.to_thread(SESSION.get, url, params=params)
+    with span("async_get", service=service_for(url), url=url):
+        if sys.platform != "emscripten":
+            return await asyncio.to_thread(SESSION.get, url, params=params)
+        return await _async_browser_get(url, params)
 
+
+async def _async_browser_get(
+    url: str, params: Mapping[str, str | int] | None
+) -> _BrowserResponse:
+    """Perform a rate-limited, retried browser request."""
     limiter = _browser_limiter_for(url)
     response: _BrowserResponse | None = None
+    start = time.perf_counter()
+    wait = 0.0
     for attempt in range(_BROWSER_RETRIES + 1):
         if limiter is not None:
-            await limiter.wait()
-        response = await _browser_get(url, params)
+            wait_start = time.perf_counter()
+            with span("rate_limit"):
+                await limiter.wait()
+            wait += time.perf_counter() - wait_start
+        try:
+            with span("http", service=service_for(url), url=url) as current:
+                response = await _browser_get(url, params)
+                current.set_attribute("status", response.status_code)
+        except Exception:
+            _collect_status(0)
+            METRICS.record_request(
+                service_for(url),
+                time.perf_counter() - start,
+                retries=attempt,
+                wait=wait,
+            )
+            raise
         if response.status_code not in _BROWSER_RETRY_STATUSES:
-            return response
+            break
         if attempt < _BROWSER_RETRIES:
             await asyncio.sleep(_BROWSER_BACKOFF * (2**attempt))
 
     assert response is not None
+    _collect_status(response.status_code)
+    METRICS.record_request(
+        service_for(url),
+        time.perf_counter() - start,
+        status=response.status_code,
+        size=len(response.content),
+        retries=attempt,
+        wait=wait,
+    )
     return response
 
 
-__all__ = ["SESSION", "async_get"]
+def default_concurrency() -> int:
+    """Return the number of requests expected in flight at once.
+
+    ``WENXIAN_CONCURRENCY`` takes precedence. The default matches the size
+    of asyncio's default executor, which runs the requests of
+    :func:`async_get`.
+    """
+    return int(
+        os.environ.get("WENXIAN_CONCURRENCY") or min(32, (os.cpu_count() or 1) + 4)
+    )
+
+
+CONCURRENCY = default_concurrency()
+"""Number of requests the connection pools are sized for."""
+
+POOL_LIMITS = {"arxiv": 2, "semanticscholar": 2}
+"""Connections kept per host of services whose rate limits allow only one
+request at a time."""
+
+_HTTP2 = False
+
+
+def _socket_options(keepalive: float | None) -> list[tuple[int, int, int]]:
+    """Return the socket options of pooled connections."""
+    options = list(HTTPConnection.default_socket_options)
+    if keepalive is None:
+        return options
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    # TCP_KEEPALIVE is the macOS name of TCP_KEEPIDLE
+    for names, value in (
+        (("TCP_KEEPIDLE", "TCP_KEEPALIVE"), keepalive),
+        (("TCP_KEEPINTVL",), min(keepalive, 15)),
+    ):
+        option = next((getattr(socket, n) for n in names if hasattr(socket, n)), None)
+        if option is not None:
+            options.append((socket.IPPROTO_TCP, option, max(1, int(value))))
+    return options
+
+
+def _set_http2(enabled: bool) -> bool:
+    """Switch urllib3's experimental HTTP/2 support on or off.
+
+    Returns
+    -------
+    bool
+        Whether HTTP/2 is in use.
+    """
+    global _HTTP2
+    if enabled == _HTTP2:
+        return _HTTP2
+    try:
+        import urllib3.http2
+
+        if enabled:
+            urllib3.http2.inject_into_urllib3()
+        else:
+            urllib3.http2.extract_from_urllib3()
+    except ImportError:
+        logger.warning("HTTP/2 needs urllib3>=2.3 and h2 4.x; using HTTP/1.1.")
+        return _HTTP2
+    _HTTP2 = enabled
+    return _HTTP2
+
+
+def configure_pools(
+    concurrency: int | None = None,
+    *,
+    sizes: Mapping[str, int] | None = None,
+    keepalive: float | None = 60.0,
+    http2: bool | None = None,
+) -> None:
+    """Size and tune the connection pools of the service adapters.
+
+    Each adapter keeps up to ``concurrency`` idle connections per host, so
+    that concurrent lookups reuse connections instead of discarding them
+    when the pool is full and handshaking again. New connections and TLS
+    handshakes are recorded per host in :data:`wenxian.metrics.METRICS`.
+
+    Parameters
+    ----------
+    concurrency : int, optional
+        Number of requests expected in flight at once. Defaults to
+        :func:`default_concurrency`.
+    sizes : Mapping[str, int], optional
+        Connections kept per host of a service, overriding the size derived
+        from ``concurrency`` and :data:`POOL_LIMITS`.
+    keepalive : float or None, default=60.0
+        Idle seconds before TCP keep-alive probes are sent on a pooled
+        connection, or None to disable TCP keep-alive.
+    http2 : bool, optional
+        Whether to negotiate HTTP/2 with urllib3's experimental support,
+        which requires the ``h2`` package and servers offering HTTP/2.
+        Defaults to the ``WENXIAN_HTTP2`` environment variable.
+    """
+    global CONCURRENCY
+    if sys.platform == "emscripten":
+        return
+    CONCURRENCY = concurrency or default_concurrency()
+    sizes = sizes or {}
+    if http2 is None:
+        http2 = os.environ.get("WENXIAN_HTTP2", "") not in ("", "0")
+    _set_http2(http2)
+    maxsizes: dict[HTTPAdapter, int] = {}
+    for service, adapter in _ADAPTERS.items():
+        size = sizes.get(service) or min(
+            CONCURRENCY, POOL_LIMITS.get(service, CONCURRENCY)
+        )
+        maxsizes[adapter] = max(maxsizes.get(adapter, 0), size)
+    options = _socket_options(keepalive)
+    for adapter, maxsize in maxsizes.items():
+        adapter.poolmanager.clear()
+        adapter.init_poolmanager(
+            adapter._pool_connections,  # type: ignore[attr-defined]
+            maxsize,
+            block=adapter._pool_block,  # type: ignore[attr-defined]
+            socket_options=options,
+        )
+        adapter.poolmanager.pool_classes_by_scheme = _POOL_CLASSES
+
+
+set_base_url(os.environ.get("WENXIAN_BASE_URL") or None)
+configure_pools()
+
+__all__ = [
+    "BASE_URL",
+    "CONCURRENCY",
+    "POOL_LIMITS",
+    "SESSION",
+    "async_get",
+    "collect_statuses",
+    "configure_pools",
+    "decode_json",
+    "default_concurrency",
+    "json_loads",
+    "mount_adapters",
+    "set_base_url",
+]
@@ -0,0 +1,158 @@
+"""XML parsing backends for the Atom and PubMed feeders.
+
+lxml is used when it is installed, and the standard library ElementTree
+otherwise and always in Pyodide. The backend is selected by :data:`BACKEND`,
+which defaults to the ``WENXIAN_XML`` environment variable or ``auto``. Both
+backends expose the ElementTree element API, and :class:`XPath` evaluates a
+path with whichever backend parsed the element.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from importlib.util import find_spec
+from typing import TYPE_CHECKING, Any
+from xml.etree import ElementTree
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Mapping
+
+    from _typeshed import SupportsRead
+
+BACKENDS = ("etree", "lxml")
+"""Names of the supported backends."""
+
+_HAS_LXML = sys.platform != "emscripten" and find_spec("lxml") is not None
+
+BACKEND = os.environ.get("WENXIAN_XML", "auto")
+"""Name of the backend used by :func:`fromstring` and :func:`iter_elements`."""
+
+
+def resolve(backend: str | None = None) -> str:
+    """Return the concrete backend for a configured name.
+
+    Parameters
+    ----------
+    backend : str, optional
+        ``etree``, ``lxml`` or ``auto``, which selects lxml when it is
+        installed. Defaults to :data:`BACKEND`.
+
+    Returns
+    -------
+    str
+        ``etree`` or ``lxml``.
+    """
+    backend = backend or BACKEND
+    if backend == "auto":
+        return "lxml" if _HAS_LXML else "etree"
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown XML backend: {backend}")
+    return backend
+
+
+def fromstring(content: bytes, backend: str | None = None) -> Any:
+    """Parse an XML document.
+
+    Parameters
+    ----------
+    content : bytes
+        The XML document.
+    backend : str, optional
+        ``etree``, ``lxml`` or ``auto``. Defaults to :data:`BACKEND`.
+
+    Returns
+    -------
+    Element
+        The root element.
+    """
+    if resolve(backend) == "lxml":
+        from lxml import etree  # type: ignore[import-not-found,import-untyped]
+
+        return etree.fromstring(content)
+    return ElementTree.fromstring(content)
+
+
+def iter_elements(
+    source: SupportsRead[bytes], tag: str, backend: str | None = None
+) -> Iterator[Any]:
+    """Stream the complete elements with a given tag from a document.
+
+    Each element is released once the caller moves on to the next one, so
+    memory use does not grow with the number of elements.
+
+    Parameters
+    ----------
+    source : file-like
+        A binary stream.
+    tag : str
+        The tag of the elements to yield.
+    backend : str, optional
+        ``etree``, ``lxml`` or ``auto``. Defaults to :data:`BACKEND`.
+
+    Yields
+    ------
+    Element
+        Each matching element after its end tag has been parsed.
+    """
+    if resolve(backend) == "lxml":
+        from lxml import etree  # type: ignore[import-not-found,import-untyped]
+
+        for _, element in etree.iterparse(source, events=("end",), tag=tag):
+            yield element
+            element.clear(keep_tail=True)
+            parent = element.getparent()
+            while parent is not None and element.getprevious() is not None:
+                del parent[0]
+        return
+    root = None
+    for event, element in ElementTree.iterparse(source, events=("start", "end")):
+        if root is None:
+            root = element
+        if event == "end" and element.tag == tag:
+            yield element
+            element.clear()
+            root.clear()
+
+
+class XPath:
+    """A path expression evaluated with the backend of the element.
+
+    The expression must be valid both as an ElementTree path and as an XPath
+    location path, e.g. ``atom:entry/atom:title`` or ``a/b[@type='doi']``.
+    With lxml it is compiled once per thread, on first use, because compiled
+    lxml expressions must not be shared between threads.
+
+    Parameters
+    ----------
+    path : str
+        The path expression, relative to the element it is applied to.
+    namespaces : Mapping[str, str], optional
+        Namespace prefixes used in ``path``.
+    """
+
+    def __init__(self, path: str, namespaces: Mapping[str, str] | None = None):
+        self.path = path
+        self.namespaces = dict(namespaces) if namespaces else None
+        self._local = threading.local()
+
+    def __call__(self, element: Any) -> list[Any]:
+        """Return all elements matching the path below ``element``."""
+        if isinstance(element, ElementTree.Element):
+            return element.findall(self.path, self.namespaces)
+        compiled = getattr(self._local, "compiled", None)
+        if compiled is None:
+            from lxml import etree  # type: ignore[import-not-found,import-untyped]
+
+            compiled = etree.XPath(self.path, namespaces=self.namespaces)
+            self._local.compiled = compiled
+        return compiled(element)
+
+    def first(self, element: Any) -> Any:
+        """Return the first element matching the path, or None."""
+        matches = self(element)
+        return matches[0] if matches else None
+
+
+__all__ = ["BACKEND", "BACKENDS", "XPath", "fromstring", "iter_elements", "resolve"]
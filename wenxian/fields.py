@@ -0,0 +1,131 @@
+"""Reference fields requested by the output being generated.
+
+Lookups read :func:`requested_fields` to request lighter payloads from the
+sources and to stop merging once every requested field is filled. Markdown
+and plain text never show the abstract, so generating them skips it.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from wenxian.reference import Reference
+
+FIELDS = frozenset(
+    ("author", "title", "journal", "year", "volume", "issue", "pages", "annote", "doi")
+)
+"""All fields of :class:`wenxian.reference.Reference`."""
+
+OUTPUT_FIELDS = {
+    "bibtex": FIELDS,
+    "markdown": FIELDS - {"issue", "annote"},
+    "text": FIELDS - {"issue", "annote"},
+}
+"""Fields rendered by each output type, including those of the BibTeX key."""
+
+KEY_FIELDS = frozenset(("author", "journal", "year", "volume", "pages"))
+"""Fields of the BibTeX key, which every output needs."""
+
+_ALIASES = {"abstract": "annote", "authors": "author", "number": "issue"}
+
+_REQUESTED: ContextVar[frozenset[str]] = ContextVar("requested_fields", default=FIELDS)
+
+
+def parse_fields(fields: str | Iterable[str]) -> frozenset[str]:
+    """Parse field names, given as a comma-separated string or an iterable.
+
+    ``abstract``, ``authors`` and ``number`` are accepted as aliases of
+    ``annote``, ``author`` and ``issue``.
+
+    Raises
+    ------
+    ValueError
+        If a field is unknown.
+    """
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    parsed = set()
+    for name in fields:
+        name = name.strip().lower()
+        if not name:
+            continue
+        name = _ALIASES.get(name, name)
+        if name not in FIELDS:
+            raise ValueError(f"Unknown field: {name}")
+        parsed.add(name)
+    return frozenset(parsed)
+
+
+def requested_fields() -> frozenset[str]:
+    """Return the fields requested in this context, all of them by default."""
+    return _REQUESTED.get()
+
+
+@contextmanager
+def request_fields(fields: Iterable[str] | None) -> Iterator[frozenset[str]]:
+    """Request only some fields from lookups made in this context.
+
+    Parameters
+    ----------
+    fields : Iterable[str] or None
+        The fields, or None for all of them.
+
+    Yields
+    ------
+    frozenset[str]
+        The requested fields.
+    """
+    requested = FIELDS if fields is None else parse_fields(fields)
+    token = _REQUESTED.set(requested)
+    try:
+        yield requested
+    finally:
+        _REQUESTED.reset(token)
+
+
+def is_complete(reference: Reference, fields: Iterable[str] | None = None) -> bool:
+    """Check whether a reference has every requested field.
+
+    Empty values do not count, as :meth:`wenxian.reference.Reference.__or__`
+    replaces them when merging.
+
+    Parameters
+    ----------
+    reference : Reference
+        The reference.
+    fields : Iterable[str], optional
+        The fields. Defaults to :func:`requested_fields`.
+    """
+    if fields is None:
+        fields = requested_fields()
+    return all(getattr(reference, name) for name in fields)
+
+
+def restrict(reference: Reference, fields: Iterable[str]) -> Reference:
+    """Return a reference with only some fields set.
+
+    Lookups stop merging once the requested fields are filled, so the
+    others are dropped before rendering to keep the output deterministic.
+    """
+    dropped: dict[str, Any] = dict.fromkeys(FIELDS.difference(fields))
+    if not any(getattr(reference, name) is not None for name in dropped):
+        return reference
+    return dataclasses.replace(reference, **dropped)
+
+
+__all__ = [
+    "FIELDS",
+    "KEY_FIELDS",
+    "OUTPUT_FIELDS",
+    "is_complete",
+    "parse_fields",
+    "request_fields",
+    "requested_fields",
+    "restrict",
+]
@@ -3,22 +3,40 @@
 from __future__ import annotations
 
 import asyncio
+import contextvars
 import sys
+import threading
+import time
 from concurrent.futures import ThreadPoolExecutor
-from difflib import SequenceMatcher
+from contextlib import contextmanager, nullcontext
 from typing import TYPE_CHECKING, TypeVar
 from xml.etree.ElementTree import ParseError
 
+from wenxian import cache
+from wenxian.breaker import circuit_breaker
+from wenxian.feeder import session
 from wenxian.feeder.arxiv import Arxiv
 from wenxian.feeder.chemrxiv import Chemrxiv
 from wenxian.feeder.crossref import Crossref
 from wenxian.feeder.datacite import Datacite
 from wenxian.feeder.europepmc import Europepmc
+from wenxian.feeder.mirror import Mirror
 from wenxian.feeder.pubmed import Pubmed
 from wenxian.feeder.semanticscholar import Semanticscholar
+from wenxian.fields import FIELDS, is_complete, request_fields, requested_fields
 from wenxian.identifier import Identifier, get_identifier_type
 from wenxian.logger import logger
+from wenxian.metrics import METRICS
 from wenxian.reference import Reference
+from wenxian.similarity import THRESHOLD, title_similarity
+from wenxian.sources import (
+    SOURCES,
+    parse_sources,
+    prioritize,
+    select_sources,
+    selected_sources,
+)
+from wenxian.tracing import span
 
 if sys.platform != "emscripten":
     from requests.exceptions import RequestException
@@ -28,34 +46,202 @@ else:
     _NETWORK_ERRORS = (OSError,)
 
 if TYPE_CHECKING:
-    from collections.abc import Awaitable, Callable, Iterable
+    from collections.abc import (
+        AsyncGenerator,
+        Awaitable,
+        Callable,
+        Generator,
+        Iterable,
+        Iterator,
+    )
+    from concurrent.futures import Future
+
+    from wenxian.breaker import Permit
 
 T = TypeVar("T")
 _SOURCE_DATA_ERRORS = (KeyError, IndexError, TypeError, ValueError, ParseError)
 _EXPECTED_FETCH_ERRORS = _NETWORK_ERRORS + _SOURCE_DATA_ERRORS
 
+# feeders keep no per-lookup state, so one instance of each serves every call
+_ARXIV = Arxiv()
+_CHEMRXIV = Chemrxiv()
+_CROSSREF = Crossref()
+_DATACITE = Datacite()
+_EUROPEPMC = Europepmc()
+_MIRROR = Mirror()
+_PUBMED = Pubmed()
+_SEMANTICSCHOLAR = Semanticscholar()
+
+_EXECUTOR: ThreadPoolExecutor | None = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def _executor() -> ThreadPoolExecutor:
+    """Return the process-wide pool running synchronous source lookups.
+
+    The pool is created on first use with one worker per request the
+    connection pools are sized for, :data:`wenxian.feeder.session.CONCURRENCY`.
+    Its tasks are single source lookups that never wait on the pool
+    themselves, so bounding it cannot deadlock.
+    """
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(
+                max_workers=session.CONCURRENCY, thread_name_prefix="wenxian"
+            )
+        return _EXECUTOR
+
 
 def _title_similarity(title1: str, title2: str) -> float:
     """Calculate similarity between two titles (0.0 to 1.0)."""
-    t1 = title1.lower().strip()
-    t2 = title2.lower().strip()
-    return SequenceMatcher(None, t1, t2).ratio()
+    return title_similarity(title1, title2)
+
+
+def _outcome(result: object) -> str:
+    """Classify a source result for :data:`wenxian.metrics.METRICS`."""
+    if result is None or (isinstance(result, Reference) and result.is_empty()):
+        return "empty"
+    if isinstance(result, (list, dict)) and not result:
+        return "empty"
+    return "hit"
+
+
+def _miss_key(source: str, fetcher: Callable, identifier: object) -> str | None:
+    """Return the key of a source lookup in :data:`wenxian.cache.MISSES`."""
+    stage = getattr(fetcher, "__name__", None)
+    if cache.MISSES is None or stage is None or not isinstance(identifier, str | int):
+        return None
+    return f"{source}|{stage.removeprefix('async_')}|{identifier}"
+
+
+def _known_miss(key: str | None) -> bool:
+    """Return whether a lookup is known to find nothing."""
+    misses = cache.MISSES
+    return key is not None and misses is not None and key in misses
+
+
+def _unanswered(statuses: list[int]) -> bool:
+    """Return whether requests were cut short by throttling or server errors."""
+    return any(status in (0, 429) or status >= 500 for status in statuses)
+
+
+def _remember_miss(key: str | None, statuses: list[int] | None = None) -> None:
+    """Record a lookup that found nothing.
+
+    Given the statuses of the requests of a source lookup, the miss is only
+    recorded if the source answered every request, which excludes lookups
+    made without requests and those cut short by throttling or server errors.
+    """
+    misses = cache.MISSES
+    if key is None or misses is None:
+        return
+    if statuses is not None and (not statuses or _unanswered(statuses)):
+        return
+    misses.add(key)
+
+
+_FAILED_SOURCES: contextvars.ContextVar[list[str] | None] = contextvars.ContextVar(
+    "failed_sources", default=None
+)
+
+
+@contextmanager
+def _tracking_failures() -> Iterator[list[str]]:
+    """Collect the sources that failed during the lookups made in this context.
+
+    Lookups in worker threads and tasks share the list through their copies
+    of the context.
+
+    Yields
+    ------
+    list[str]
+        The failed sources, filled in as lookups complete.
+    """
+    failed: list[str] = []
+    token = _FAILED_SOURCES.set(failed)
+    try:
+        yield failed
+    finally:
+        _FAILED_SOURCES.reset(token)
+
+
+def _record_failed_source(source: str) -> None:
+    """Add a source that raised, failed fast or was cut short, if tracked."""
+    failed = _FAILED_SOURCES.get()
+    if failed is not None:
+        failed.append(source)
+
+
+def _record_health(
+    source: str, permit: Permit, statuses: list[int], failed: bool = False
+) -> None:
+    """Report a lookup to the circuit breaker of its source.
+
+    A lookup fails if it raised a network error or any of its requests was
+    cut short; lookups made without requests say nothing about the source.
+    """
+    breaker = circuit_breaker(source)
+    if failed or _unanswered(statuses):
+        breaker.record_failure(permit)
+    elif statuses:
+        breaker.record_success(permit)
+    else:
+        breaker.release(permit)
 
 
 def _fetch_safely(
     source: str, fetcher: Callable[..., T | None], identifier: object
 ) -> T | None:
-    """Fetch from one source without aborting a fallback chain."""
-    try:
-        return fetcher(identifier)
-    except _EXPECTED_FETCH_ERRORS as exc:
-        logger.warning("%s lookup failed for %s: %s", source, identifier, exc)
-        return None
-    except Exception as exc:
-        if sys.platform != "emscripten":
-            raise
-        logger.warning("%s browser lookup failed for %s: %s", source, identifier, exc)
-        return None
+    """Fetch from one source without aborting a fallback chain.
+
+    Sources known to find nothing for the identifier and sources whose
+    circuit breaker is open are skipped.
+    """
+    with span(
+        "lookup",
+        source=source,
+        stage=getattr(fetcher, "__name__", None),
+        identifier=identifier,
+    ) as current:
+        key = _miss_key(source, fetcher, identifier)
+        if _known_miss(key):
+            current.set_attribute("outcome", "known miss")
+            return None
+        permit = circuit_breaker(source).allow()
+        if permit is None:
+            current.set_attribute("outcome", "circuit open")
+            _record_failed_source(source)
+            return None
+        start = time.perf_counter()
+        try:
+            with session.collect_statuses() as statuses:
+                result = fetcher(identifier)
+        except _EXPECTED_FETCH_ERRORS as exc:
+            _record_health(source, permit, statuses, isinstance(exc, _NETWORK_ERRORS))
+            _record_failed_source(source)
+            METRICS.record_lookup(source, time.perf_counter() - start, "error")
+            logger.warning("%s lookup failed for %s: %s", source, identifier, exc)
+            return None
+        except Exception as exc:
+            circuit_breaker(source).release(permit)
+            _record_failed_source(source)
+            METRICS.record_lookup(source, time.perf_counter() - start, "error")
+            if sys.platform != "emscripten":
+                raise
+            logger.warning(
+                "%s browser lookup failed for %s: %s", source, identifier, exc
+            )
+            return None
+        _record_health(source, permit, statuses)
+        if _unanswered(statuses):
+            _record_failed_source(source)
+        outcome = _outcome(result)
+        METRICS.record_lookup(source, time.perf_counter() - start, outcome)
+        current.set_attribute("outcome", outcome)
+        if outcome == "empty":
+            _remember_miss(key, statuses)
+        return result
 
 
 async def _async_fetch_safely(
@@ -63,55 +249,178 @@ async def _async_fetch_safely(
     fetcher: Callable[..., Awaitable[T | None]],
     identifier: object,
 ) -> T | None:
-    """Fetch from one source asynchronously without aborting other sources."""
-    try:
-        return await fetcher(identifier)
-    except _EXPECTED_FETCH_ERRORS as exc:
-        logger.warning("%s lookup failed for %s: %s", source, identifier, exc)
-        return None
-    except Exception as exc:
-        if sys.platform != "emscripten":
+    """Fetch from one source asynchronously without aborting other sources.
+
+    Sources known to find nothing for the identifier and sources whose
+    circuit breaker is open are skipped.
+    """
+    with span(
+        "lookup",
+        source=source,
+        stage=getattr(fetcher, "__name__", None),
+        identifier=identifier,
+    ) as current:
+        key = _miss_key(source, fetcher, identifier)
+        if _known_miss(key):
+            current.set_attribute("outcome", "known miss")
+            return None
+        permit = circuit_breaker(source).allow()
+        if permit is None:
+            current.set_attribute("outcome", "circuit open")
+            _record_failed_source(source)
+            return None
+        start = time.perf_counter()
+        try:
+            with session.collect_statuses() as statuses:
+                result = await fetcher(identifier)
+        except asyncio.CancelledError:
+            # a cancelled probe leaves the breaker to the next lookup
+            circuit_breaker(source).release(permit)
             raise
-        logger.warning("%s browser lookup failed for %s: %s", source, identifier, exc)
-        return None
+        except _EXPECTED_FETCH_ERRORS as exc:
+            _record_health(source, permit, statuses, isinstance(exc, _NETWORK_ERRORS))
+            _record_failed_source(source)
+            METRICS.record_lookup(source, time.perf_counter() - start, "error")
+            logger.warning("%s lookup failed for %s: %s", source, identifier, exc)
+            return None
+        except Exception as exc:
+            circuit_breaker(source).release(permit)
+            _record_failed_source(source)
+            METRICS.record_lookup(source, time.perf_counter() - start, "error")
+            if sys.platform != "emscripten":
+                raise
+            logger.warning(
+                "%s browser lookup failed for %s: %s", source, identifier, exc
+            )
+            return None
+        _record_health(source, permit, statuses)
+        if _unanswered(statuses):
+            _record_failed_source(source)
+        outcome = _outcome(result)
+        METRICS.record_lookup(source, time.perf_counter() - start, outcome)
+        current.set_attribute("outcome", outcome)
+        if outcome == "empty":
+            _remember_miss(key, statuses)
+        return result
 
 
 def _fetch_references_concurrently(
-    fetches: Iterable[tuple[str, Callable[..., Reference | None], str | int]],
-) -> list[Reference | None]:
-    """Run independent synchronous reference lookups concurrently."""
+    fetches: Iterable[tuple[str, Callable[..., T], str | int]],
+) -> Generator[T | None, None, None]:
+    """Run independent synchronous reference lookups concurrently.
+
+    Results are yielded in the order of the fetches. Lookups not started
+    when the generator is closed are cancelled.
+    """
     fetches = tuple(fetches)
     if sys.platform == "emscripten":
-        return [
-            _fetch_safely(source, fetcher, identifier)
-            for source, fetcher, identifier in fetches
-        ]
-    with ThreadPoolExecutor(max_workers=len(fetches)) as executor:
-        futures = [
-            executor.submit(_fetch_safely, source, fetcher, identifier)
-            for source, fetcher, identifier in fetches
-        ]
-        return [future.result() for future in futures]
+        for source, fetcher, identifier in fetches:
+            yield _fetch_safely(source, fetcher, identifier)
+        return
+    executor = _executor()
+    # each lookup sees the fields requested by the caller
+    futures: list[Future[T | None]] = [
+        executor.submit(
+            contextvars.copy_context().run, _fetch_safely, source, fetcher, identifier
+        )
+        for source, fetcher, identifier in fetches
+    ]
+    try:
+        for future in futures:
+            yield future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def _fetch_and_merge(
+    fetches: tuple[tuple[str, Callable[..., Reference | None], str | int], ...],
+) -> Reference:
+    """Fetch from sources concurrently and merge their results by priority.
+
+    Once the merged reference has every requested field, lower-priority
+    sources cannot change it and are no longer waited for.
+    """
+    fields = requested_fields()
+    references: list[Reference | None] = []
+    merged = Reference()
+    results = _fetch_references_concurrently(fetches)
+    try:
+        for reference in results:
+            references.append(reference)
+            merged = merged | reference
+            if is_complete(merged, fields):
+                break
+    finally:
+        results.close()
+    return _merge_references(
+        references, [source for source, *_ in fetches[: len(references)]]
+    )
 
 
-def _merge_references(references: Iterable[Reference | None]) -> Reference:
-    """Merge source results in their configured priority order."""
-    result = Reference()
-    for reference in references:
-        result = result | reference
-    return result
+async def _async_fetch_and_merge(
+    fetches: tuple[tuple[str, Callable[..., Awaitable[Reference | None]]], ...],
+    identifier: str | int,
+) -> Reference:
+    """Fetch from sources concurrently and merge their results by priority.
+
+    Once the merged reference has every requested field, the lookups of
+    lower-priority sources are cancelled.
+    """
+    fields = requested_fields()
+    tasks = [
+        asyncio.ensure_future(_async_fetch_safely(source, fetcher, identifier))
+        for source, fetcher in fetches
+    ]
+    references: list[Reference | None] = []
+    merged = Reference()
+    try:
+        for task in tasks:
+            reference = await task
+            references.append(reference)
+            merged = merged | reference
+            if is_complete(merged, fields):
+                break
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return _merge_references(
+        references, [source for source, _ in fetches[: len(references)]]
+    )
+
+
+def _merge_references(
+    references: Iterable[Reference | None], sources: Iterable[str] | None = None
+) -> Reference:
+    """Merge source results in their configured priority order.
+
+    When the source names are given, the fields each one contributed are
+    recorded in :data:`wenxian.metrics.METRICS`.
+    """
+    references = list(references)
+    with span("merge", count=len(references)):
+        result = Reference()
+        for reference in references:
+            result = result | reference
+        if sources is not None:
+            METRICS.record_merge(zip(sources, references, strict=True))
+        return result
 
 
 def from_doi(doi: str) -> Reference | None:
     """Fetch a reference from DOI sources concurrently."""
-    return _merge_references(
-        _fetch_references_concurrently(
+    reference = _fetch_safely("Mirror", _MIRROR.from_doi, doi)
+    if reference is not None and not reference.is_empty():
+        return reference
+    return _fetch_and_merge(
+        prioritize(
             (
-                ("PubMed", Pubmed().from_doi, doi),
-                ("Crossref", Crossref().from_doi, doi),
-                ("arXiv", Arxiv().from_doi, doi),
-                ("ChemRxiv", Chemrxiv().from_doi, doi),
-                ("Semantic Scholar", Semanticscholar().from_doi, doi),
+                ("PubMed", _PUBMED.from_doi, doi),
+                ("Crossref", _CROSSREF.from_doi, doi),
+                ("arXiv", _ARXIV.from_doi, doi),
+                ("ChemRxiv", _CHEMRXIV.from_doi, doi),
+                ("Semantic Scholar", _SEMANTICSCHOLAR.from_doi, doi),
             )
         )
     )
@@ -119,26 +428,37 @@ def from_doi(doi: str) -> Reference | None:
 
 async def async_from_doi(doi: str) -> Reference | None:
     """Fetch a reference from DOI sources concurrently."""
-    references = await asyncio.gather(
-        _async_fetch_safely("PubMed", Pubmed().async_from_doi, doi),
-        _async_fetch_safely("Crossref", Crossref().async_from_doi, doi),
-        _async_fetch_safely("arXiv", Arxiv().async_from_doi, doi),
-        _async_fetch_safely("ChemRxiv", Chemrxiv().async_from_doi, doi),
-        _async_fetch_safely("Semantic Scholar", Semanticscholar().async_from_doi, doi),
+    reference = await _async_fetch_safely("Mirror", _MIRROR.async_from_doi, doi)
+    if reference is not None and not reference.is_empty():
+        return reference
+    return await _async_fetch_and_merge(
+        prioritize(
+            (
+                ("PubMed", _PUBMED.async_from_doi),
+                ("Crossref", _CROSSREF.async_from_doi),
+                ("arXiv", _ARXIV.async_from_doi),
+                ("ChemRxiv", _CHEMRXIV.async_from_doi),
+                ("Semantic Scholar", _SEMANTICSCHOLAR.async_from_doi),
+            )
+        ),
+        doi,
     )
-    return _merge_references(references)
 
 
 def from_pmid(pmid: str | int) -> Reference | None:
     """Fetch a reference from a PMID."""
-    reference = _fetch_safely("PubMed", Pubmed().from_pmid, pmid)
+    reference = _fetch_safely("Mirror", _MIRROR.from_pmid, pmid)
     if reference is not None and not reference.is_empty():
         return reference
-    return _merge_references(
-        _fetch_references_concurrently(
+    if "PubMed" in selected_sources():
+        reference = _fetch_safely("PubMed", _PUBMED.from_pmid, pmid)
+        if reference is not None and not reference.is_empty():
+            return reference
+    return _fetch_and_merge(
+        prioritize(
             (
-                ("Europe PMC", Europepmc().from_pmid, pmid),
-                ("Semantic Scholar", Semanticscholar().from_pmid, pmid),
+                ("Europe PMC", _EUROPEPMC.from_pmid, pmid),
+                ("Semantic Scholar", _SEMANTICSCHOLAR.from_pmid, pmid),
             )
         )
     )
@@ -146,28 +466,35 @@ def from_pmid(pmid: str | int) -> Reference | None:
 
 async def async_from_pmid(pmid: str | int) -> Reference | None:
     """Fetch a reference from a PMID without blocking the event loop."""
-    reference = await _async_fetch_safely("PubMed", Pubmed().async_from_pmid, pmid)
+    reference = await _async_fetch_safely("Mirror", _MIRROR.async_from_pmid, pmid)
     if reference is not None and not reference.is_empty():
         return reference
-    fallbacks = await asyncio.gather(
-        _async_fetch_safely("Europe PMC", Europepmc().async_from_pmid, pmid),
-        _async_fetch_safely(
-            "Semantic Scholar", Semanticscholar().async_from_pmid, pmid
+    if "PubMed" in selected_sources():
+        reference = await _async_fetch_safely("PubMed", _PUBMED.async_from_pmid, pmid)
+        if reference is not None and not reference.is_empty():
+            return reference
+    return await _async_fetch_and_merge(
+        prioritize(
+            (
+                ("Europe PMC", _EUROPEPMC.async_from_pmid),
+                ("Semantic Scholar", _SEMANTICSCHOLAR.async_from_pmid),
+            )
         ),
+        pmid,
     )
-    return _merge_references(fallbacks)
 
 
 def from_arxiv(arxiv: str) -> Reference | None:
     """Fetch a reference from an arXiv identifier."""
-    reference = _fetch_safely("arXiv", Arxiv().from_arxiv, arxiv)
-    if reference is not None and not reference.is_empty():
-        return reference
-    return _merge_references(
-        _fetch_references_concurrently(
+    if "arXiv" in selected_sources():
+        reference = _fetch_safely("arXiv", _ARXIV.from_arxiv, arxiv)
+        if reference is not None and not reference.is_empty():
+            return reference
+    return _fetch_and_merge(
+        prioritize(
             (
-                ("DataCite", Datacite().from_arxiv, arxiv),
-                ("Semantic Scholar", Semanticscholar().from_arxiv, arxiv),
+                ("DataCite", _DATACITE.from_arxiv, arxiv),
+                ("Semantic Scholar", _SEMANTICSCHOLAR.from_arxiv, arxiv),
             )
         )
     )
@@ -175,23 +502,28 @@ def from_arxiv(arxiv: str) -> Reference | None:
 
 async def async_from_arxiv(arxiv: str) -> Reference | None:
     """Fetch an arXiv reference without blocking the event loop."""
-    reference = await _async_fetch_safely("arXiv", Arxiv().async_from_arxiv, arxiv)
-    if reference is not None and not reference.is_empty():
-        return reference
-    fallbacks = await asyncio.gather(
-        _async_fetch_safely("DataCite", Datacite().async_from_arxiv, arxiv),
-        _async_fetch_safely(
-            "Semantic Scholar", Semanticscholar().async_from_arxiv, arxiv
+    if "arXiv" in selected_sources():
+        reference = await _async_fetch_safely("arXiv", _ARXIV.async_from_arxiv, arxiv)
+        if reference is not None and not reference.is_empty():
+            return reference
+    return await _async_fetch_and_merge(
+        prioritize(
+            (
+                ("DataCite", _DATACITE.async_from_arxiv),
+                ("Semantic Scholar", _SEMANTICSCHOLAR.async_from_arxiv),
+            )
         ),
+        arxiv,
     )
-    return _merge_references(fallbacks)
 
 
 def _validate_title_result(title: str, result: Reference | None) -> Reference | None:
     """Reject a title-search result that is too dissimilar to the query."""
     if result and result.title:
-        similarity = _title_similarity(title, result.title)
-        if similarity < 0.6:
+        with span("validate_title") as current:
+            similarity = _title_similarity(title, result.title)
+            current.set_attribute("similarity", similarity)
+        if similarity < THRESHOLD:
             logger.warning(
                 f"Title mismatch: input='{title}' vs output='{result.title}' (similarity: {similarity:.2f})"
             )
@@ -199,42 +531,211 @@ def _validate_title_result(title: str, result: Reference | None) -> Reference |
     return result
 
 
-def from_title(title: str) -> Reference | None:
-    """Fetch a reference from a title."""
-    for source, fetcher in (
-        ("Crossref", Crossref().from_title),
-        ("Semantic Scholar", Semanticscholar().from_title),
-    ):
-        identifier_info = _fetch_safely(source, fetcher, title)
-        if identifier_info is None:
+def _linked_doi(identifier: str) -> str:
+    """Return the DOI linked to a PMID or arXiv identifier, if known."""
+    identifier_type = get_identifier_type(identifier)
+    if identifier_type == Identifier.PMID:
+        return cache.linked_identifiers("pmid", identifier).get("doi", identifier)
+    if identifier_type == Identifier.ARXIV:
+        return cache.linked_identifiers("arxiv", identifier).get("doi", identifier)
+    return identifier
+
+
+def _rank_title_candidates(
+    title: str, candidate_lists: Iterable[list[tuple[str, str | None]] | None]
+) -> list[str]:
+    """Order title-search candidates by local similarity to the query.
+
+    Candidates whose titles are too dissimilar are dropped before any full
+    lookup. Candidates without a title cannot be scored and are tried last.
+    Ties keep the order of the search sources. PMIDs and arXiv identifiers
+    linked to a DOI in :data:`wenxian.cache.CROSSWALK` are replaced by it, so
+    that hits of several sources for the same work are fetched once.
+    """
+    ranked: dict[str, tuple[float, str]] = {}
+    for candidates in candidate_lists:
+        for candidate, candidate_title in candidates or ():
+            identifier = _linked_doi(candidate)
+            key = identifier.lower()
+            if key in ranked:
+                continue
+            if candidate_title is None:
+                score = -1.0
+            else:
+                score = _title_similarity(title, candidate_title)
+                if score < THRESHOLD:
+                    continue
+            ranked[key] = (score, identifier)
+    return [
+        identifier
+        for _, identifier in sorted(ranked.values(), key=lambda item: -item[0])
+    ]
+
+
+def _title_miss_key(title: str, identifier: str) -> str | None:
+    """Return the key of a title candidate in :data:`wenxian.cache.MISSES`."""
+    if cache.MISSES is None:
+        return None
+    return f"title|{title}|{identifier.lower()}"
+
+
+def _resolve_title_candidates(
+    title: str, candidate_lists: Iterable[list[tuple[str, str | None]] | None]
+) -> Reference | None:
+    """Fetch the best-scoring title candidate that passes validation."""
+    for identifier in _rank_title_candidates(title, candidate_lists):
+        key = _title_miss_key(title, identifier)
+        if _known_miss(key):
             continue
-        assert isinstance(identifier_info, str)
-        result = _validate_title_result(title, from_identifier(identifier_info))
+        reference = from_identifier(identifier)
+        result = _validate_title_result(title, reference)
         if result is not None:
             return result
+        if reference is not None and reference.title:
+            _remember_miss(key)
     return None
 
 
-async def async_from_title(title: str) -> Reference | None:
-    """Fetch a reference from a title without blocking the event loop."""
-    for source, fetcher in (
-        ("Crossref", Crossref().async_from_title),
-        ("Semantic Scholar", Semanticscholar().async_from_title),
-    ):
-        identifier_info = await _async_fetch_safely(source, fetcher, title)
-        if identifier_info is None:
+async def _async_resolve_title_candidates(
+    title: str, candidate_lists: Iterable[list[tuple[str, str | None]] | None]
+) -> Reference | None:
+    """Fetch the best-scoring title candidate asynchronously."""
+    for identifier in _rank_title_candidates(title, candidate_lists):
+        key = _title_miss_key(title, identifier)
+        if _known_miss(key):
             continue
-        assert isinstance(identifier_info, str)
-        result = _validate_title_result(
-            title, await async_from_identifier(identifier_info)
-        )
+        reference = await async_from_identifier(identifier)
+        result = _validate_title_result(title, reference)
         if result is not None:
             return result
+        if reference is not None and reference.title:
+            _remember_miss(key)
     return None
 
 
-def from_identifier(identifier: str) -> Reference | None:
-    """Fetch a reference from an identifier."""
+def from_title(title: str) -> Reference | None:
+    """Fetch a reference from a title.
+
+    The local mirror is searched first. Otherwise Crossref and Semantic
+    Scholar are searched concurrently, their candidates are scored against
+    the query, and only the best match is fetched.
+    """
+    result = _resolve_title_candidates(
+        title, [_fetch_safely("Mirror", _MIRROR.search_title, title)]
+    )
+    if result is not None:
+        return result
+    return _resolve_title_candidates(
+        title,
+        _fetch_references_concurrently(
+            prioritize(
+                (
+                    ("Crossref", _CROSSREF.search_title, title),
+                    ("Semantic Scholar", _SEMANTICSCHOLAR.search_title, title),
+                )
+            )
+        ),
+    )
+
+
+async def async_from_title(title: str) -> Reference | None:
+    """Fetch a reference from a title without blocking the event loop."""
+    result = await _async_resolve_title_candidates(
+        title,
+        [await _async_fetch_safely("Mirror", _MIRROR.async_search_title, title)],
+    )
+    if result is not None:
+        return result
+    searches = prioritize(
+        (
+            ("Crossref", _CROSSREF.async_search_title),
+            ("Semantic Scholar", _SEMANTICSCHOLAR.async_search_title),
+        )
+    )
+    candidates = await asyncio.gather(
+        *(_async_fetch_safely(source, search, title) for source, search in searches)
+    )
+    return await _async_resolve_title_candidates(title, candidates)
+
+
+def _cached_reference(identifier: str) -> Reference | None:
+    """Return the merged reference cached for an identifier, if any."""
+    if cache.REFERENCES is None:
+        return None
+    return cache.REFERENCES.get_reference(identifier)
+
+
+def _cache_reference(identifier: str, reference: Reference | None) -> None:
+    """Cache the merged reference found for an identifier.
+
+    References looked up for only some fields, or from other than the
+    default sources, are not cached, as they may differ from a full lookup.
+    Neither are those merged while a source failed, as they may be partial.
+    """
+    if (
+        cache.REFERENCES is not None
+        and reference is not None
+        and requested_fields() == FIELDS
+        and selected_sources() == SOURCES
+        and not _FAILED_SOURCES.get()
+    ):
+        cache.REFERENCES.set_reference(identifier, reference)
+
+
+@contextmanager
+def _lookup_options(
+    fields: Iterable[str] | None, sources: str | Iterable[str] | None
+) -> Iterator[None]:
+    """Request fields and select sources for the lookups of a block.
+
+    Options that are None keep those of the calling context.
+    """
+    with (
+        request_fields(fields) if fields is not None else nullcontext(),
+        select_sources(sources) if sources is not None else nullcontext(),
+    ):
+        yield
+
+
+def from_identifier(
+    identifier: str,
+    *,
+    fields: Iterable[str] | None = None,
+    sources: str | Iterable[str] | None = None,
+) -> Reference | None:
+    """Fetch a reference from an identifier.
+
+    A merged reference cached for the identifier is returned without
+    contacting any source.
+
+    Parameters
+    ----------
+    identifier : str
+        The identifier.
+    fields : Iterable[str], optional
+        Fields the caller needs; see :mod:`wenxian.fields`. Sources are
+        asked for lighter payloads and merging stops once these are filled.
+        Defaults to those requested by the calling context, all fields
+        unless :func:`wenxian.fields.request_fields` is in effect.
+    sources : str or Iterable[str], optional
+        A profile or the online sources to consult, in priority order; see
+        :mod:`wenxian.sources`. Defaults to those selected by the calling
+        context.
+    """
+    with (
+        _lookup_options(fields, sources),
+        span("from_identifier", identifier=identifier) as current,
+    ):
+        reference = _cached_reference(identifier)
+        current.set_attribute("cached", reference is not None)
+        if reference is None:
+            with _tracking_failures():
+                reference = _from_identifier(identifier)
+                _cache_reference(identifier, reference)
+        return reference
+
+
+def _from_identifier(identifier: str) -> Reference | None:
     identifier_type = get_identifier_type(identifier)
     if identifier_type is None:
         raise ValueError(f"Unknown identifier: {identifier}")
@@ -250,8 +751,90 @@ def from_identifier(identifier: str) -> Reference | None:
         raise RuntimeError("Unknown identifier type.")
 
 
-async def async_from_identifier(identifier: str) -> Reference | None:
-    """Fetch a reference from an identifier asynchronously."""
+def from_identifiers(
+    identifiers: Iterable[str],
+    *,
+    concurrency: int | None = None,
+    fields: Iterable[str] | None = None,
+    sources: str | Iterable[str] | None = None,
+) -> Iterator[tuple[str, Reference | Exception]]:
+    """Fetch references from many identifiers concurrently.
+
+    The identifiers are resolved by up to ``concurrency`` lookups at once,
+    whose source requests share one bounded thread pool.
+
+    Parameters
+    ----------
+    identifiers : Iterable[str]
+        The identifiers.
+    concurrency : int, optional
+        Number of identifiers resolved at once. Defaults to
+        :data:`wenxian.feeder.session.CONCURRENCY`.
+    fields : Iterable[str], optional
+        Fields the caller needs; see :func:`from_identifier`.
+    sources : str or Iterable[str], optional
+        Online sources to consult; see :func:`from_identifier`.
+
+    Yields
+    ------
+    tuple[str, Reference or Exception]
+        Each identifier in input order with its reference, which is empty if
+        no source found it, or the exception its lookup raised.
+    """
+
+    def lookup(identifier: str) -> Reference | Exception:
+        # runs in a copy of the caller's context, which it may change
+        with _lookup_options(fields, sources):
+            try:
+                reference = from_identifier(identifier)
+            except Exception as exc:
+                return exc
+        return reference if reference is not None else Reference()
+
+    identifiers = list(identifiers)
+    if sys.platform == "emscripten":
+        for identifier in identifiers:
+            yield identifier, lookup(identifier)
+        return
+    with ThreadPoolExecutor(max_workers=concurrency or session.CONCURRENCY) as executor:
+        futures = [
+            executor.submit(contextvars.copy_context().run, lookup, identifier)
+            for identifier in identifiers
+        ]
+        try:
+            for identifier, future in zip(identifiers, futures, strict=True):
+                yield identifier, future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+async def async_from_identifier(
+    identifier: str,
+    *,
+    fields: Iterable[str] | None = None,
+    sources: str | Iterable[str] | None = None,
+) -> Reference | None:
+    """Fetch a reference from an identifier asynchronously.
+
+    A merged reference cached for the identifier is returned without
+    contacting any source. ``fields`` and ``sources`` are as in
+    :func:`from_identifier`.
+    """
+    with (
+        _lookup_options(fields, sources),
+        span("from_identifier", identifier=identifier) as current,
+    ):
+        reference = _cached_reference(identifier)
+        current.set_attribute("cached", reference is not None)
+        if reference is None:
+            with _tracking_failures():
+                reference = await _async_from_identifier(identifier)
+                _cache_reference(identifier, reference)
+        return reference
+
+
+async def _async_from_identifier(identifier: str) -> Reference | None:
     identifier_type = get_identifier_type(identifier)
     if identifier_type is None:
         raise ValueError(f"Unknown identifier: {identifier}")
@@ -265,3 +848,140 @@ async def async_from_identifier(identifier: str) -> Reference | None:
         return await async_from_title(identifier)
     else:
         raise RuntimeError("Unknown identifier type.")
+
+
+async def _async_prefetch(
+    identifier_type: Identifier, identifiers: list[str]
+) -> dict[str, Reference]:
+    """Resolve PMIDs or arXiv identifiers through batch requests.
+
+    PubMed and arXiv, the first online sources of these lookups, answer many
+    identifiers per request. As in single lookups, PMIDs are looked up in the
+    local mirror first.
+
+    Returns
+    -------
+    dict[str, Reference]
+        The references found, keyed by identifier.
+    """
+    found: dict[str, Reference] = {}
+    fetcher: Callable[[list[str]], Awaitable[dict[str, Reference]]]
+    if identifier_type == Identifier.PMID:
+        if Mirror.PATH is not None:
+            for pmid in identifiers:
+                reference = await _async_fetch_safely(
+                    "Mirror", _MIRROR.async_from_pmid, pmid
+                )
+                if reference is not None and not reference.is_empty():
+                    found[pmid] = reference
+        source, fetcher, size = "PubMed", _PUBMED.async_from_pmids, Pubmed.BATCH_SIZE
+    else:
+        source, fetcher, size = "arXiv", _ARXIV.async_from_arxivs, Arxiv.BATCH_SIZE
+    remaining = [identifier for identifier in identifiers if identifier not in found]
+    batches = await asyncio.gather(
+        *(
+            _async_fetch_safely(source, fetcher, remaining[start : start + size])
+            for start in range(0, len(remaining), size)
+        )
+    )
+    for batch in batches:
+        found.update(batch or {})
+    return found
+
+
+async def async_from_identifiers(
+    identifiers: Iterable[str],
+    *,
+    concurrency: int | None = None,
+    fields: Iterable[str] | None = None,
+    sources: str | Iterable[str] | None = None,
+) -> AsyncGenerator[tuple[str, Reference | Exception], None]:
+    """Fetch references from many identifiers, yielding them as they complete.
+
+    Duplicate identifiers are resolved once, and cached merged references
+    are yielded first. Other PMIDs and arXiv identifiers are fetched
+    together through the batch endpoints of PubMed and arXiv; the rest, and
+    those the batches missed, are resolved one by one with up to
+    ``concurrency`` lookups in flight. All lookups share the rate limiters and
+    connection pools of the process.
+
+    Parameters
+    ----------
+    identifiers : Iterable[str]
+        The identifiers. Surrounding whitespace is ignored.
+    concurrency : int, optional
+        Number of identifiers resolved at once. Defaults to
+        :data:`wenxian.feeder.session.CONCURRENCY`.
+    fields : Iterable[str], optional
+        Fields the caller needs; see :func:`from_identifier`.
+    sources : str or Iterable[str], optional
+        Online sources to consult; see :func:`from_identifier`.
+
+    Yields
+    ------
+    tuple[str, Reference or Exception]
+        Each distinct identifier with its reference, which is empty if no
+        source found it, or the exception its lookup raised.
+
+    Examples
+    --------
+    >>> async for identifier, result in async_from_identifiers(ids):  # doctest: +SKIP
+    ...     print(identifier, result)
+    """
+    unique = list(dict.fromkeys(identifier.strip() for identifier in identifiers))
+    remaining = []
+    for identifier in unique:
+        reference = _cached_reference(identifier)
+        if reference is not None:
+            yield identifier, reference
+        else:
+            remaining.append(identifier)
+    selected = parse_sources(sources) if sources is not None else selected_sources()
+    batched = {Identifier.PMID: "PubMed", Identifier.ARXIV: "arXiv"}
+    groups: dict[Identifier, list[str]] = {}
+    batch_types: dict[str, Identifier] = {}
+    for identifier in remaining:
+        identifier_type = get_identifier_type(identifier)
+        if identifier_type in batched and batched[identifier_type] in selected:
+            groups.setdefault(identifier_type, []).append(identifier)
+            batch_types[identifier] = identifier_type
+    prefetches = {
+        identifier_type: asyncio.ensure_future(_async_prefetch(identifier_type, group))
+        for identifier_type, group in groups.items()
+        if len(group) > 1
+    }
+    semaphore = asyncio.Semaphore(concurrency or session.CONCURRENCY)
+
+    async def lookup(identifier: str) -> tuple[str, Reference | Exception]:
+        # each task runs in its own copy of the context
+        with _lookup_options(fields, sources):
+            return await _lookup(identifier)
+
+    async def _lookup(identifier: str) -> tuple[str, Reference | Exception]:
+        identifier_type = batch_types.get(identifier)
+        prefetch = (
+            prefetches.get(identifier_type) if identifier_type is not None else None
+        )
+        if prefetch is not None:
+            try:
+                reference = (await prefetch).get(identifier)
+            except Exception:
+                reference = None
+            if reference is not None:
+                _cache_reference(identifier, reference)
+                return identifier, reference
+        async with semaphore:
+            try:
+                reference = await async_from_identifier(identifier)
+            except Exception as exc:
+                return identifier, exc
+        return identifier, reference if reference is not None else Reference()
+
+    tasks = [asyncio.ensure_future(lookup(identifier)) for identifier in remaining]
+    try:
+        for completed in asyncio.as_completed(tasks):
+            yield await completed
+    finally:
+        for task in (*tasks, *prefetches.values()):
+            task.cancel()
+        await asyncio.gather(*tasks, *prefetches.values(), return_exceptions=True)
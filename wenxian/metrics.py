@@ -0,0 +1,431 @@
+"""Per-source request, lookup and merge metrics.
+
+Every request sent by the shared session and every lookup made by
+:mod:`wenxian.from_identifier` is recorded in :data:`METRICS`. Requests are
+grouped by service (see :mod:`wenxian.feeder.endpoints`), and lookups and
+circuit breakers (see :mod:`wenxian.breaker`) by source. Read the counters
+with :meth:`Metrics.summary`, export them with :meth:`Metrics.prometheus`, or
+pass ``--stats`` to ``wenxian from``.
+"""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from wenxian.reference import Reference
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+"""Upper bounds of the latency histogram buckets in seconds."""
+
+MERGED_FIELDS = (
+    "author",
+    "title",
+    "journal",
+    "year",
+    "volume",
+    "issue",
+    "pages",
+    "annote",
+    "doi",
+)
+"""Reference fields attributed to a source when results are merged."""
+
+BREAKER_STATES = ("closed", "half-open", "open")
+"""States of the circuit breakers of :mod:`wenxian.breaker`."""
+
+
+@dataclass
+class Histogram:
+    """Cumulative latency histogram with fixed buckets."""
+
+    counts: list[int] = field(default_factory=lambda: [0] * (len(BUCKETS) + 1))
+    total: float = 0.0
+
+    @property
+    def count(self) -> int:
+        """Number of observations."""
+        return sum(self.counts)
+
+    def observe(self, seconds: float) -> None:
+        """Add one observation."""
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile as the upper bound of its bucket.
+
+        Returns ``inf`` when the quantile falls beyond the last bucket and
+        ``nan`` when nothing was observed.
+        """
+        count = self.count
+        if count == 0:
+            return float("nan")
+        rank = q * count
+        seen = 0
+        for bound, bucket in zip((*BUCKETS, float("inf")), self.counts, strict=True):
+            seen += bucket
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+@dataclass
+class ServiceStats:
+    """HTTP metrics of one service."""
+
+    requests: int = 0
+    errors: int = 0
+    """Requests that raised instead of returning a response."""
+    statuses: Counter[int] = field(default_factory=Counter)
+    bytes: int = 0
+    retries: int = 0
+    wait: float = 0.0
+    """Seconds spent waiting for the client-side rate limiter."""
+    latency: Histogram = field(default_factory=Histogram)
+
+
+@dataclass
+class SourceStats:
+    """Lookup metrics of one source."""
+
+    outcomes: Counter[str] = field(default_factory=Counter)
+    """Lookups that returned a reference (``hit``), nothing (``empty``) or
+    failed (``error``)."""
+    latency: Histogram = field(default_factory=Histogram)
+    fields: Counter[str] = field(default_factory=Counter)
+    """Merged reference fields taken from this source."""
+
+
+@dataclass
+class BreakerStats:
+    """Circuit breaker metrics of one source."""
+
+    state: str = "closed"
+    transitions: Counter[str] = field(default_factory=Counter)
+    """Transitions by the state entered."""
+    rejected: int = 0
+    """Lookups failed fast while the breaker was open."""
+
+
+class Metrics:
+    """Thread-safe registry of service, source, cache and connection metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all metrics."""
+        with self._lock:
+            self.services: defaultdict[str, ServiceStats] = defaultdict(ServiceStats)
+            self.sources: defaultdict[str, SourceStats] = defaultdict(SourceStats)
+            self.caches: defaultdict[str, Counter[str]] = defaultdict(Counter)
+            self.connections: defaultdict[str, Counter[str]] = defaultdict(Counter)
+            self.breakers: defaultdict[str, BreakerStats] = defaultdict(BreakerStats)
+
+    def record_request(
+        self,
+        service: str,
+        seconds: float,
+        *,
+        status: int | None = None,
+        size: int = 0,
+        retries: int = 0,
+        wait: float = 0.0,
+    ) -> None:
+        """Record one HTTP request.
+
+        Parameters
+        ----------
+        service : str
+            The service name.
+        seconds : float
+            Time until the final response, including retries and rate-limiter
+            waits.
+        status : int, optional
+            The final status code, or None if the request raised.
+        size : int, default=0
+            Size of the response body in bytes.
+        retries : int, default=0
+            Number of retried attempts.
+        wait : float, default=0.0
+            Seconds spent waiting for the client-side rate limiter.
+        """
+        with self._lock:
+            stats = self.services[service]
+            stats.requests += 1
+            if status is None:
+                stats.errors += 1
+            else:
+                stats.statuses[status] += 1
+            stats.bytes += size
+            stats.retries += retries
+            stats.wait += wait
+            stats.latency.observe(seconds)
+
+    def record_lookup(self, source: str, seconds: float, outcome: str) -> None:
+        """Record one lookup of a source.
+
+        Parameters
+        ----------
+        source : str
+            The source name, e.g. ``Crossref``.
+        seconds : float
+            Duration of the lookup.
+        outcome : {"hit", "empty", "error"}
+            Whether the lookup returned a result, nothing, or failed.
+        """
+        with self._lock:
+            stats = self.sources[source]
+            stats.outcomes[outcome] += 1
+            stats.latency.observe(seconds)
+
+    def record_merge(self, results: Iterable[tuple[str, Reference | None]]) -> None:
+        """Attribute each field of a merged reference to its source.
+
+        A field is contributed by the first source with a value, as in
+        :meth:`wenxian.reference.Reference.__or__`.
+        """
+        results = [(source, ref) for source, ref in results if ref is not None]
+        with self._lock:
+            for name in MERGED_FIELDS:
+                for source, reference in results:
+                    if getattr(reference, name):
+                        self.sources[source].fields[name] += 1
+                        break
+
+    def record_cache(self, cache: str, hit: bool) -> None:
+        """Record a cache hit or miss."""
+        with self._lock:
+            self.caches[cache]["hit" if hit else "miss"] += 1
+
+    def record_connection(self, host: str, tls: bool) -> None:
+        """Record a new connection to a host, and whether it did a TLS handshake."""
+        with self._lock:
+            counts = self.connections[host]
+            counts["connections"] += 1
+            counts["handshakes"] += tls
+
+    def record_breaker(self, source: str, state: str) -> None:
+        """Record a source's circuit breaker entering a state."""
+        with self._lock:
+            stats = self.breakers[source]
+            stats.state = state
+            stats.transitions[state] += 1
+
+    def record_breaker_rejection(self, source: str) -> None:
+        """Record a lookup failed fast by a source's circuit breaker."""
+        with self._lock:
+            self.breakers[source].rejected += 1
+
+    def summary(self) -> str:
+        """Return a plain-text summary table."""
+        with self._lock:
+            lines = [
+                f"{'service':<16} {'requests':>8} {'errors':>6} {'p50 ms':>7}"
+                f" {'p95 ms':>7} {'KiB':>8} {'retries':>7} {'wait s':>7}  statuses"
+            ]
+            for name, stats in sorted(self.services.items()):
+                statuses = " ".join(
+                    f"{status}:{count}"
+                    for status, count in sorted(stats.statuses.items())
+                )
+                lines.append(
+                    f"{name:<16} {stats.requests:>8} {stats.errors:>6}"
+                    f" {stats.latency.quantile(0.5) * 1000:>7.0f}"
+                    f" {stats.latency.quantile(0.95) * 1000:>7.0f}"
+                    f" {stats.bytes / 1024:>8.1f} {stats.retries:>7}"
+                    f" {stats.wait:>7.2f}  {statuses}"
+                )
+            lines.append("")
+            lines.append(
+                f"{'source':<16} {'hits':>6} {'empty':>6} {'errors':>6}"
+                f" {'p50 ms':>7} {'p95 ms':>7}  fields"
+            )
+            for name, source_stats in sorted(self.sources.items()):
+                fields = " ".join(
+                    f"{field_name}:{count}"
+                    for field_name, count in sorted(source_stats.fields.items())
+                )
+                lines.append(
+                    f"{name:<16} {source_stats.outcomes['hit']:>6} {source_stats.outcomes['empty']:>6}"
+                    f" {source_stats.outcomes['error']:>6}"
+                    f" {source_stats.latency.quantile(0.5) * 1000:>7.0f}"
+                    f" {source_stats.latency.quantile(0.95) * 1000:>7.0f}  {fields}"
+                )
+            if self.caches:
+                lines.append("")
+                lines.append(f"{'cache':<16} {'hits':>6} {'misses':>6}")
+                for name, counts in sorted(self.caches.items()):
+                    lines.append(f"{name:<16} {counts['hit']:>6} {counts['miss']:>6}")
+            if self.connections:
+                lines.append("")
+                lines.append(f"{'host':<32} {'connections':>11} {'TLS':>6}")
+                for name, counts in sorted(self.connections.items()):
+                    lines.append(
+                        f"{name:<32} {counts['connections']:>11}"
+                        f" {counts['handshakes']:>6}"
+                    )
+            if self.breakers:
+                lines.append("")
+                lines.append(
+                    f"{'breaker':<16} {'state':>9} {'opened':>6} {'failed fast':>11}"
+                )
+                for name, breaker in sorted(self.breakers.items()):
+                    lines.append(
+                        f"{name:<16} {breaker.state:>9}"
+                        f" {breaker.transitions['open']:>6} {breaker.rejected:>11}"
+                    )
+        return "\n".join(lines) + "\n"
+
+    def prometheus(self) -> str:
+        """Return the metrics in the Prometheus text exposition format."""
+        out: list[str] = []
+
+        def family(name: str, kind: str, help: str) -> None:
+            out.append(f"# HELP wenxian_{name} {help}")
+            out.append(f"# TYPE wenxian_{name} {kind}")
+
+        def histogram(name: str, labels: str, histogram: Histogram) -> None:
+            cumulative = 0
+            for bound, count in zip(BUCKETS, histogram.counts, strict=False):
+                cumulative += count
+                out.append(
+                    f'wenxian_{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+                )
+            out.append(f'wenxian_{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            out.append(f"wenxian_{name}_sum{{{labels}}} {histogram.total}")
+            out.append(f"wenxian_{name}_count{{{labels}}} {histogram.count}")
+
+        with self._lock:
+            services = sorted(self.services.items())
+            sources = sorted(self.sources.items())
+            family("http_requests_total", "counter", "HTTP requests by final status.")
+            for name, stats in services:
+                for status, count in sorted(stats.statuses.items()):
+                    out.append(
+                        f'wenxian_http_requests_total{{service="{name}",'
+                        f'status="{status}"}} {count}'
+                    )
+                if stats.errors:
+                    out.append(
+                        f'wenxian_http_requests_total{{service="{name}",'
+                        f'status="error"}} {stats.errors}'
+                    )
+            family(
+                "http_request_duration_seconds",
+                "histogram",
+                "Time until the final HTTP response.",
+            )
+            for name, stats in services:
+                histogram(
+                    "http_request_duration_seconds", f'service="{name}"', stats.latency
+                )
+            for metric, attr, kind, help in (
+                ("http_response_bytes_total", "bytes", "counter", "Response bytes."),
+                ("http_retries_total", "retries", "counter", "Retried attempts."),
+                (
+                    "rate_limit_wait_seconds_total",
+                    "wait",
+                    "counter",
+                    "Time spent waiting for client-side rate limiters.",
+                ),
+            ):
+                family(metric, kind, help)
+                for name, stats in services:
+                    out.append(
+                        f'wenxian_{metric}{{service="{name}"}} {getattr(stats, attr)}'
+                    )
+            family("lookups_total", "counter", "Source lookups by outcome.")
+            for name, source_stats in sources:
+                for outcome, count in sorted(source_stats.outcomes.items()):
+                    out.append(
+                        f'wenxian_lookups_total{{source="{name}",'
+                        f'outcome="{outcome}"}} {count}'
+                    )
+            family("lookup_duration_seconds", "histogram", "Source lookup time.")
+            for name, source_stats in sources:
+                histogram(
+                    "lookup_duration_seconds", f'source="{name}"', source_stats.latency
+                )
+            family(
+                "merged_fields_total",
+                "counter",
+                "Merged reference fields contributed by each source.",
+            )
+            for name, source_stats in sources:
+                for field_name, count in sorted(source_stats.fields.items()):
+                    out.append(
+                        f'wenxian_merged_fields_total{{source="{name}",'
+                        f'field="{field_name}"}} {count}'
+                    )
+            family("cache_requests_total", "counter", "Cache lookups by result.")
+            for name, counts in sorted(self.caches.items()):
+                for result, count in sorted(counts.items()):
+                    out.append(
+                        f'wenxian_cache_requests_total{{cache="{name}",'
+                        f'result="{result}"}} {count}'
+                    )
+            for metric, key, help in (
+                ("connections_total", "connections", "New connections by host."),
+                ("tls_handshakes_total", "handshakes", "TLS handshakes by host."),
+            ):
+                family(metric, "counter", help)
+                for name, counts in sorted(self.connections.items()):
+                    out.append(f'wenxian_{metric}{{host="{name}"}} {counts[key]}')
+            breakers = sorted(self.breakers.items())
+            family(
+                "circuit_breaker_state",
+                "gauge",
+                "Whether the circuit breaker of a source is in a state.",
+            )
+            for name, breaker in breakers:
+                for state in BREAKER_STATES:
+                    out.append(
+                        f'wenxian_circuit_breaker_state{{source="{name}",'
+                        f'state="{state}"}} {int(breaker.state == state)}'
+                    )
+            family(
+                "circuit_breaker_transitions_total",
+                "counter",
+                "Circuit breaker transitions by the state entered.",
+            )
+            for name, breaker in breakers:
+                for state, count in sorted(breaker.transitions.items()):
+                    out.append(
+                        f'wenxian_circuit_breaker_transitions_total{{source="{name}",'
+                        f'state="{state}"}} {count}'
+                    )
+            family(
+                "circuit_breaker_rejections_total",
+                "counter",
+                "Lookups failed fast by an open circuit breaker.",
+            )
+            for name, breaker in breakers:
+                out.append(
+                    f'wenxian_circuit_breaker_rejections_total{{source="{name}"}}'
+                    f" {breaker.rejected}"
+                )
+        return "\n".join(out) + "\n"
+
+
+METRICS = Metrics()
+"""Metrics of this process."""
+
+__all__ = [
+    "BREAKER_STATES",
+    "BUCKETS",
+    "METRICS",
+    "BreakerStats",
+    "Histogram",
+    "Metrics",
+    "ServiceStats",
+    "SourceStats",
+]
@@ -0,0 +1,314 @@
+"""Local offline mirror built from Crossref and PubMed bulk dumps.
+
+The mirror is a SQLite database with one row per (identifier, source) pair.
+Dumps are streamed record by record, so neither Crossref public-data files
+nor PubMed baseline files are ever loaded whole, and each dump file is
+recorded once it is complete so an interrupted build can be resumed.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import TYPE_CHECKING, TextIO
+
+from wenxian.feeder.session import json_loads
+from wenxian.logger import logger
+from wenxian.serialization import dumps, loads
+
+if TYPE_CHECKING:
+    import sqlite3
+    from collections.abc import Iterable, Iterator
+
+    from wenxian.reference import Reference
+
+SOURCE_PRIORITY = ("PubMed", "Crossref")
+"""Merge priority of mirrored sources, matching the online DOI lookup."""
+_BATCH_SIZE = 1000
+_CHUNK_SIZE = 1 << 16
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    source TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (kind, key, source)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS ingested (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    records INTEGER NOT NULL
+);
+"""
+_local = threading.local()
+
+
+def connect(
+    database: str | os.PathLike, *, readonly: bool = False
+) -> sqlite3.Connection:
+    """Open a mirror database.
+
+    Parameters
+    ----------
+    database : str or os.PathLike
+        Path to the SQLite database.
+    readonly : bool, default=False
+        Open the database read-only; otherwise create the schema if needed.
+
+    Returns
+    -------
+    sqlite3.Connection
+        The database connection.
+    """
+    import sqlite3
+
+    if readonly:
+        return sqlite3.connect(
+            f"{Path(database).resolve().as_uri()}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+        )
+    connection = sqlite3.connect(database, timeout=60)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(_SCHEMA)
+    return connection
+
+
+def reader(database: str | os.PathLike) -> sqlite3.Connection:
+    """Return a cached read-only connection for the current thread."""
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    key = os.fspath(database)
+    connection = connections.get(key)
+    if connection is None:
+        connection = connect(database, readonly=True)
+        connections[key] = connection
+    return connection
+
+
+def normalize_key(kind: str, identifier: str | int) -> str:
+    """Normalize an identifier into the key stored in the mirror."""
+    key = str(identifier).strip()
+    return key.lower() if kind == "doi" else key
+
+
+def lookup(
+    database: str | os.PathLike, kind: str, identifier: str | int
+) -> Reference | None:
+    """Look up one identifier in a mirror database.
+
+    Parameters
+    ----------
+    database : str or os.PathLike
+        Path to the mirror database.
+    kind : {"doi", "pmid"}
+        Identifier type.
+    identifier : str or int
+        The identifier to look up.
+
+    Returns
+    -------
+    Reference or None
+        The mirrored sources merged by priority, or None if nothing is mirrored.
+    """
+    rows = dict(
+        reader(database)
+        .execute(
+            "SELECT source, data FROM records WHERE kind = ? AND key = ?",
+            (kind, normalize_key(kind, identifier)),
+        )
+        .fetchall()
+    )
+    if not rows:
+        return None
+    references = [loads(rows[source]) for source in SOURCE_PRIORITY if source in rows]
+    result = references[0]
+    for reference in references[1:]:
+        result = result | reference
+    return result
+
+
+def _open_text(path: Path) -> TextIO:
+    """Open a possibly gzip-compressed dump as text."""
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return path.open(encoding="utf-8")
+
+
+def _iter_json_items(stream: TextIO) -> Iterator[dict]:
+    """Stream the objects of the top-level ``items`` array of a JSON document."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    while True:
+        start = buffer.find('"items"')
+        bracket = buffer.find("[", start) if start >= 0 else -1
+        if bracket >= 0:
+            buffer = buffer[bracket + 1 :]
+            break
+        chunk = stream.read(_CHUNK_SIZE)
+        if not chunk:
+            return
+        buffer += chunk
+    while True:
+        buffer = buffer.lstrip(" \t\r\n,")
+        if buffer.startswith("]"):
+            return
+        try:
+            item, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            chunk = stream.read(_CHUNK_SIZE)
+            if not chunk:
+                raise
+            buffer += chunk
+            continue
+        yield item
+        buffer = buffer[end:]
+
+
+def _iter_crossref(path: Path) -> Iterator[tuple[str, str, str, bytes]]:
+    """Yield mirror rows from a Crossref public-data file.
+
+    Both the ``{"items": [...]}`` layout and JSON Lines are supported.
+    """
+    from wenxian.feeder.crossref import Crossref
+
+    feeder = Crossref()
+    with _open_text(path) as stream:
+        if ".jsonl" in path.suffixes:
+            items: Iterable[dict] = (
+                json_loads(line) for line in stream if line.strip()
+            )
+        else:
+            items = _iter_json_items(stream)
+        for item in items:
+            doi = item.get("DOI")
+            if not doi:
+                continue
+            reference = feeder._from_doi_data({"message": item}, doi)
+            yield "doi", normalize_key("doi", doi), "Crossref", dumps(reference)
+
+
+def _iter_pubmed(path: Path) -> Iterator[tuple[str, str, str, bytes]]:
+    """Yield mirror rows from a PubMed baseline or update file."""
+    from wenxian.feeder.pubmed import Pubmed
+
+    feeder = Pubmed()
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rb") as stream:
+        for pmid, reference in feeder._iter_articles(stream):
+            if pmid is None:
+                continue
+            data = dumps(reference)
+            yield "pmid", normalize_key("pmid", pmid), "PubMed", data
+            if reference.doi:
+                yield "doi", normalize_key("doi", reference.doi), "PubMed", data
+
+
+def _iter_dump(path: Path) -> Iterator[tuple[str, str, str, bytes]]:
+    """Dispatch a dump file to the matching parser by file name."""
+    if ".xml" in path.suffixes:
+        return _iter_pubmed(path)
+    if ".json" in path.suffixes or ".jsonl" in path.suffixes:
+        return _iter_crossref(path)
+    raise ValueError(f"Unknown dump format: {path}")
+
+
+def _ingest(database: str, path: str) -> int:
+    """Ingest one dump file into the mirror and mark it as complete."""
+    dump = Path(path)
+    stat = dump.stat()
+    connection = connect(database)
+    count = 0
+    batch = []
+    try:
+        for row in _iter_dump(dump):
+            batch.append(row)
+            if len(batch) >= _BATCH_SIZE:
+                with connection:
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?)", batch
+                    )
+                count += len(batch)
+                batch.clear()
+        count += len(batch)
+        with connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?)", batch
+            )
+            connection.execute(
+                "INSERT OR REPLACE INTO ingested VALUES (?, ?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime, count),
+            )
+    finally:
+        connection.close()
+    return count
+
+
+def build(
+    database: str | os.PathLike,
+    files: Iterable[str | os.PathLike],
+    *,
+    jobs: int | None = None,
+) -> int:
+    """Build or resume a mirror database from bulk dump files.
+
+    Files that were completely ingested before, with unchanged size and
+    modification time, are skipped. Remaining files are parsed in parallel.
+
+    Parameters
+    ----------
+    database : str or os.PathLike
+        Path to the SQLite database to create or update.
+    files : iterable of str or os.PathLike
+        Crossref public-data files (``.json``, ``.jsonl``, optionally gzipped)
+        and PubMed baseline files (``.xml``, optionally gzipped).
+    jobs : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+
+    Returns
+    -------
+    int
+        The number of rows written by this run.
+    """
+    database = os.fspath(database)
+    connection = connect(database)
+    try:
+        done = {
+            path: (size, mtime)
+            for path, size, mtime in connection.execute(
+                "SELECT path, size, mtime FROM ingested"
+            )
+        }
+    finally:
+        connection.close()
+
+    pending = []
+    for file in files:
+        path = str(Path(file).resolve())
+        stat = os.stat(path)
+        if done.get(path) == (stat.st_size, stat.st_mtime):
+            logger.info("Skipping already ingested dump %s", path)
+            continue
+        pending.append(path)
+
+    jobs = min(jobs or os.cpu_count() or 1, len(pending))
+    if jobs <= 1:
+        return sum(_ingest(database, path) for path in pending)
+    total = 0
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {executor.submit(_ingest, database, path): path for path in pending}
+        for future in as_completed(futures):
+            count = future.result()
+            logger.info("Ingested %d rows from %s", count, futures[future])
+            total += count
+    return total
+
+
+__all__ = ["build", "connect", "lookup", "reader"]
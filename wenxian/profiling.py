@@ -0,0 +1,178 @@
+"""Profile a run and attribute its time to the stages of a lookup.
+
+:class:`Profiler` runs cProfile in the calling thread and in every thread
+started while it is active, which covers the worker threads of the
+asynchronous transport. The report adds up the own time of every profiled
+function by category (imports, network, waits, XML/JSON parsing, LaTeX
+encoding and journal abbreviation) and lists the most expensive functions.
+``wenxian from --profile`` prints it.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import os
+    from types import FrameType
+
+CATEGORIES: tuple[tuple[str, tuple[str, ...], tuple[str, ...]], ...] = (
+    ("import", ("<frozen importlib", "/importlib/"), ("_imp.", "marshal.loads")),
+    (
+        "network",
+        (
+            "/socket.py",
+            "/ssl.py",
+            "/http/client.py",
+            "/urllib3/",
+            "/requests/",
+            "/pyodide/http",
+        ),
+        ("_socket.", "_ssl.", "getaddrinfo"),
+    ),
+    (
+        "waits",
+        (
+            "/pyrate_limiter/",
+            "/requests_ratelimiter/",
+            "/threading.py",
+            "/queue.py",
+            "/selectors.py",
+            "/asyncio/",
+            "/concurrent/futures/",
+        ),
+        ("time.sleep", "_thread.", "_queue.", "select."),
+    ),
+    (
+        "XML/JSON parsing",
+        ("/xml/etree/", "/json/", "/wenxian/feeder/xml_backend.py"),
+        ("pyexpat", "xml.etree", "lxml", "_json", "orjson", "msgspec"),
+    ),
+    ("LaTeX encoding", ("/pylatexenc/", "/unidecode/"), ()),
+    ("journal abbreviation", ("/pyiso4/",), ()),
+)
+"""Categories as ``(name, file substrings, function substrings)``.
+
+A profiled function belongs to the first category that matches its file or,
+for built-in functions, its name. Other functions are reported as
+``wenxian`` or ``other``.
+"""
+
+
+def categorize(filename: str, function: str) -> str:
+    """Return the category of a profiled function."""
+    filename = filename.replace("\\", "/")
+    for category, files, functions in CATEGORIES:
+        if filename == "~":
+            if any(part in function for part in functions):
+                return category
+        elif any(part in filename for part in files):
+            return category
+    if "/wenxian/" in filename:
+        return "wenxian"
+    return "other"
+
+
+class Profiler:
+    """Profile the calling thread and the threads it starts.
+
+    Python 3.12 and later allow a single active cProfile profiler, so there
+    only the calling thread is profiled.
+
+    Examples
+    --------
+    >>> with Profiler() as profiler:  # doctest: +SKIP
+    ...     from_identifier("10.1063/5.0155600")
+    >>> print(profiler.report())  # doctest: +SKIP
+    """
+
+    def __init__(self) -> None:
+        self._profile = cProfile.Profile()
+        self._threads: list[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self.threads_profiled = sys.version_info < (3, 12)
+        self.startup = 0.0
+        """CPU seconds used before profiling, mostly start-up imports."""
+        self.wall = 0.0
+
+    def _start_thread(self, frame: FrameType, event: str, arg: Any) -> None:
+        """Start a profiler in a new thread on its first profile event."""
+        profile = cProfile.Profile()
+        with self._lock:
+            self._threads.append(profile)
+        profile.enable()
+
+    def __enter__(self) -> Profiler:
+        """Start profiling."""
+        self.startup = time.process_time()
+        self._start = time.perf_counter()
+        if self.threads_profiled:
+            threading.setprofile(self._start_thread)
+        self._profile.enable()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Stop profiling."""
+        self._profile.disable()
+        if self.threads_profiled:
+            threading.setprofile(None)
+        self.wall = time.perf_counter() - self._start
+
+    def stats(self) -> pstats.Stats:
+        """Return the combined statistics of all profiled threads."""
+        stats = pstats.Stats(self._profile, stream=io.StringIO())
+        with self._lock:
+            for profile in self._threads:
+                stats.add(profile)
+        return stats
+
+    def categories(self) -> dict[str, float]:
+        """Return the own time of all profiled functions per category."""
+        totals: dict[str, float] = {}
+        for (filename, _, function), row in self.stats().stats.items():  # type: ignore[attr-defined]
+            category = categorize(filename, function)
+            totals[category] = totals.get(category, 0.0) + row[2]
+        return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+    def report(self, top: int = 20) -> str:
+        """Return a plain-text report.
+
+        Parameters
+        ----------
+        top : int, default=20
+            Number of functions listed by own time.
+        """
+        categories = self.categories()
+        total = sum(categories.values()) or 1.0
+        threads = len(self._threads) + 1
+        lines = [
+            f"Profiled {self.wall:.3f} s wall time in {threads} thread(s);"
+            f" {self.startup:.3f} s CPU was spent before profiling (start-up"
+            " and imports).",
+        ]
+        if not self.threads_profiled:
+            lines.append("Only the main thread was profiled on this Python version.")
+        lines.append("")
+        lines.append(f"{'category':<22} {'seconds':>9} {'share':>7}")
+        for category, seconds in categories.items():
+            lines.append(f"{category:<22} {seconds:>9.3f} {seconds / total:>7.1%}")
+        stream = io.StringIO()
+        stats = self.stats()
+        stats.stream = stream  # type: ignore[attr-defined]
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(top)
+        lines.append("")
+        lines.append(stream.getvalue().strip("\n"))
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str | os.PathLike) -> None:
+        """Save the combined statistics for ``pstats`` or snakeviz."""
+        self.stats().dump_stats(path)
+
+
+__all__ = ["CATEGORIES", "Profiler", "categorize"]
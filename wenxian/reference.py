@@ -2,19 +2,47 @@
 
 from __future__ import annotations
 
+import functools
+import hashlib
 import re
 import textwrap
 from dataclasses import dataclass
 from enum import IntEnum
+from importlib.metadata import PackageNotFoundError, version
+from typing import TYPE_CHECKING
 
 import unidecode
 from pyiso4.ltwa import Abbreviate
 from pylatexenc.latexencode import unicode_to_latex
 
+from wenxian import cache
+from wenxian.tracing import span
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
 abbreviator = Abbreviate.create()
 XML_CLEANER = re.compile(r"<\/?[^<>]+>")
 """Regex to remove XML tags."""
 
+RENDERER_VERSION = 1
+"""Version of the rendered formats, to be bumped whenever their output changes."""
+
+
+@functools.cache
+def renderer_version() -> str:
+    """Return the version of the renderers and the libraries they depend on.
+
+    Rendered output memoized under another version is not reused.
+    """
+    versions = [str(RENDERER_VERSION)]
+    for package in ("pyiso4", "pylatexenc", "unidecode"):
+        try:
+            versions.append(version(package))
+        except PackageNotFoundError:
+            versions.append("unknown")
+    return "-".join(versions)
+
 
 def remove_xml_tags(text: str) -> str:
     """Remove XML tags.
@@ -116,9 +144,30 @@ class Reference:
             return self.journal.title()
         return abbr
 
+    @property
+    def content_hash(self) -> str:
+        """Hash of the fields of the reference."""
+        return hashlib.sha256(repr(self).encode()).hexdigest()
+
+    def _memoized(self, output_type: str, render: Callable[[], str]) -> str:
+        """Render the reference, reusing the output memoized for its content."""
+        memo = cache.RENDERED
+        if memo is None:
+            return render()
+        key = f"{renderer_version()}|{output_type}|{self.content_hash}"
+        rendered = memo.get(key)
+        if rendered is not None:
+            return rendered.decode()
+        result = render()
+        memo.set(key, result.encode())
+        return result
+
     @property
     def key(self) -> str:
         """Generate a BibTeX key."""
+        return self._memoized("key", self._key)
+
+    def _key(self) -> str:
         if self.author is None or len(self.author) == 0:
             # 10.1126/science.288.5473.1950
             last = "NoAuthor"
@@ -153,6 +202,10 @@ class Reference:
     @property
     def bibtex(self) -> str:
         """Generate a BibTeX entry."""
+        with span("render", format="bibtex"):
+            return self._memoized("bibtex", self._bibtex)
+
+    def _bibtex(self) -> str:
         if self.author is None:
             author_string = None
         else:
@@ -226,12 +279,18 @@ class Reference:
     @property
     def markdown(self) -> str:
         """Generate a Markdown for this reference."""
-        return self._markdown_or_text(markdown=True)
+        with span("render", format="markdown"):
+            return self._memoized(
+                "markdown", functools.partial(self._markdown_or_text, markdown=True)
+            )
 
     @property
     def text(self) -> str:
         """Generate a plain text for this reference."""
-        return self._markdown_or_text(markdown=False)
+        with span("render", format="text"):
+            return self._memoized(
+                "text", functools.partial(self._markdown_or_text, markdown=False)
+            )
 
     def _markdown_or_text(self, markdown: bool) -> str:
         if self.author is None:
@@ -0,0 +1,104 @@
+"""Compact serialization of references for local stores."""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from wenxian.reference import Author, BibtexType, Reference
+
+SCHEMA_VERSION = 1
+"""Version of the serialized reference layout."""
+
+
+def reference_to_dict(reference: Reference) -> dict[str, Any]:
+    """Convert a reference into a JSON-compatible dictionary.
+
+    Parameters
+    ----------
+    reference : Reference
+        The reference to convert.
+
+    Returns
+    -------
+    dict[str, Any]
+        A dictionary containing only the fields that are set.
+    """
+    data: dict[str, Any] = {"v": SCHEMA_VERSION}
+    if reference.author is not None:
+        data["author"] = [
+            [aa.first, aa.last, aa.suffix]
+            if aa.suffix is not None
+            else [aa.first, aa.last]
+            for aa in reference.author
+        ]
+    for key in ("title", "journal", "year", "volume", "issue", "annote", "doi"):
+        value = getattr(reference, key)
+        if value is not None:
+            data[key] = value
+    if reference.pages is not None:
+        data["pages"] = (
+            list(reference.pages)
+            if isinstance(reference.pages, tuple)
+            else reference.pages
+        )
+    if reference.type != BibtexType.article:
+        data["type"] = int(reference.type)
+    return data
+
+
+def reference_from_dict(data: dict[str, Any]) -> Reference:
+    """Convert a dictionary created by :func:`reference_to_dict` into a reference.
+
+    Parameters
+    ----------
+    data : dict[str, Any]
+        The serialized reference.
+
+    Returns
+    -------
+    Reference
+        The restored reference.
+
+    Raises
+    ------
+    ValueError
+        If the data was written with an unsupported schema version.
+    """
+    if data.get("v") != SCHEMA_VERSION:
+        raise ValueError(f"Unsupported reference schema version: {data.get('v')}")
+    author = data.get("author")
+    pages = data.get("pages")
+    return Reference(
+        author=[Author(*aa) for aa in author] if author is not None else None,
+        title=data.get("title"),
+        journal=data.get("journal"),
+        year=data.get("year"),
+        volume=data.get("volume"),
+        issue=data.get("issue"),
+        pages=tuple(pages) if isinstance(pages, list) else pages,
+        annote=data.get("annote"),
+        doi=data.get("doi"),
+        type=BibtexType(data.get("type", BibtexType.article)),
+    )
+
+
+def dumps(reference: Reference) -> bytes:
+    """Serialize a reference into compact bytes."""
+    return json.dumps(
+        reference_to_dict(reference), ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+
+def loads(data: bytes) -> Reference:
+    """Deserialize a reference from bytes created by :func:`dumps`."""
+    return reference_from_dict(json.loads(data))
+
+
+__all__ = [
+    "SCHEMA_VERSION",
+    "dumps",
+    "loads",
+    "reference_from_dict",
+    "reference_to_dict",
+]
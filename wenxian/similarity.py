@@ -0,0 +1,133 @@
+"""Title similarity scoring.
+
+Titles returned by metadata services differ from user input in case,
+punctuation, accents and embedded markup, so every engine except
+``difflib`` compares normalized titles. The engine used by title lookups is
+selected by :data:`ENGINE`, which defaults to the ``WENXIAN_SIMILARITY``
+environment variable or ``difflib``. Other engines accept or reject some
+titles differently at :data:`THRESHOLD`, so they are opt-in until
+``python -m benchmarks.similarity`` shows they agree with ``difflib``.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from importlib.util import find_spec
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+THRESHOLD = 0.6
+"""Minimum similarity for a title-search result to be accepted."""
+
+_MARKUP = re.compile(r"</?(?:[A-Za-z][\w.-]*:)?[A-Za-z][\w.-]*(?:\s[^<>]*)?/?>")
+_LATEX_COMMAND = re.compile(r"\\(?:[A-Za-z]+|.)")
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_title(title: str) -> str:
+    """Normalize a title for comparison.
+
+    XML and MathML tags and LaTeX commands are removed while their text is
+    kept, accents are folded, and punctuation is replaced by single spaces.
+
+    Parameters
+    ----------
+    title : str
+        A title string.
+
+    Returns
+    -------
+    str
+        The case-folded title containing only words separated by spaces.
+    """
+    text = _LATEX_COMMAND.sub(" ", _MARKUP.sub(" ", title))
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def _difflib(title1: str, title2: str) -> float:
+    """Character-level ratio of the lowercased titles."""
+    return SequenceMatcher(None, title1.lower().strip(), title2.lower().strip()).ratio()
+
+
+def _token(title1: str, title2: str) -> float:
+    """Ratio of matching words between the normalized titles."""
+    normalized1 = normalize_title(title1)
+    normalized2 = normalize_title(title2)
+    if normalized1 == normalized2:
+        return 1.0
+    tokens1 = normalized1.split()
+    tokens2 = normalized2.split()
+    if not tokens1 or not tokens2:
+        return 0.0
+    return SequenceMatcher(None, tokens1, tokens2, autojunk=False).ratio()
+
+
+def _rapidfuzz(title1: str, title2: str) -> float:
+    """Character-level ratio of the normalized titles using rapidfuzz."""
+    from rapidfuzz.fuzz import ratio
+
+    return ratio(normalize_title(title1), normalize_title(title2)) / 100
+
+
+ENGINES: dict[str, Callable[[str, str], float]] = {
+    "difflib": _difflib,
+    "token": _token,
+    "rapidfuzz": _rapidfuzz,
+}
+"""Registered similarity engines, each returning a score from 0.0 to 1.0."""
+
+_HAS_RAPIDFUZZ = find_spec("rapidfuzz") is not None
+
+ENGINE = os.environ.get("WENXIAN_SIMILARITY", "difflib")
+"""Name of the engine used by :func:`title_similarity`."""
+
+
+def available_engines() -> list[str]:
+    """Return the registered engines whose dependencies are installed."""
+    return [name for name in ENGINES if name != "rapidfuzz" or _HAS_RAPIDFUZZ]
+
+
+def _resolve(engine: str) -> Callable[[str, str], float]:
+    """Return the scoring function for an engine name."""
+    if engine == "auto":
+        return _rapidfuzz if _HAS_RAPIDFUZZ else _token
+    try:
+        return ENGINES[engine]
+    except KeyError:
+        raise ValueError(f"Unknown similarity engine: {engine}") from None
+
+
+def title_similarity(title1: str, title2: str, engine: str | None = None) -> float:
+    """Calculate similarity between two titles.
+
+    Parameters
+    ----------
+    title1, title2 : str
+        The titles to compare.
+    engine : str, optional
+        Name of a registered engine, or ``auto`` to use rapidfuzz when it is
+        installed and the token engine otherwise. Defaults to :data:`ENGINE`.
+
+    Returns
+    -------
+    float
+        Similarity from 0.0 to 1.0.
+    """
+    return _resolve(engine or ENGINE)(title1, title2)
+
+
+__all__ = [
+    "ENGINE",
+    "ENGINES",
+    "THRESHOLD",
+    "available_engines",
+    "normalize_title",
+    "title_similarity",
+]
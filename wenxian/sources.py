@@ -0,0 +1,142 @@
+"""Online sources consulted by lookups, and named profiles of them.
+
+Lookups read :func:`selected_sources` to decide which online sources to
+contact and in which priority order to merge their results. A profile
+names a selection; ``--sources`` and the ``WENXIAN_SOURCES`` environment
+variable accept a profile or a comma-separated list of sources. The local
+mirror is not an online source and is always consulted when configured.
+"""
+
+from __future__ import annotations
+
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+T = TypeVar("T", bound=tuple)
+
+SOURCES = (
+    "PubMed",
+    "Europe PMC",
+    "Crossref",
+    "arXiv",
+    "DataCite",
+    "ChemRxiv",
+    "Semantic Scholar",
+)
+"""All online sources, in their default priority order."""
+
+PROFILES: dict[str, tuple[str, ...]] = {
+    "default": SOURCES,
+    "biomed": ("PubMed", "Europe PMC", "Crossref", "ChemRxiv", "Semantic Scholar"),
+    "physics": ("Crossref", "arXiv", "DataCite", "Semantic Scholar"),
+    "fast": ("Crossref", "PubMed", "arXiv", "DataCite"),
+}
+"""Named selections of sources, in priority order.
+
+``biomed`` skips the preprint servers of physics, ``physics`` skips PubMed,
+Europe PMC and ChemRxiv, and ``fast`` skips Europe PMC, ChemRxiv and the
+heavily rate-limited Semantic Scholar.
+"""
+
+
+def parse_sources(sources: str | Iterable[str]) -> tuple[str, ...]:
+    """Parse a profile name or source names into sources in priority order.
+
+    Source names are matched case-insensitively. A string is either the
+    name of a :data:`PROFILES` entry or a comma-separated list of sources.
+
+    Raises
+    ------
+    ValueError
+        If a profile or source is unknown.
+    """
+    if isinstance(sources, str):
+        if sources.strip().lower() in PROFILES:
+            return PROFILES[sources.strip().lower()]
+        sources = sources.split(",")
+    names = {source.lower(): source for source in SOURCES}
+    parsed = []
+    for name in sources:
+        name = name.strip()
+        if not name:
+            continue
+        if name.lower() not in names:
+            raise ValueError(
+                f"Unknown source or profile: {name}. Choose from"
+                f" {', '.join(SOURCES)} or {', '.join(PROFILES)}."
+            )
+        parsed.append(names[name.lower()])
+    return tuple(dict.fromkeys(parsed))
+
+
+_SELECTED: ContextVar[tuple[str, ...]] = ContextVar(
+    "selected_sources",
+    default=parse_sources(os.environ.get("WENXIAN_SOURCES") or "default"),
+)
+
+
+def selected_sources() -> tuple[str, ...]:
+    """Return the sources selected in this context.
+
+    Defaults to the ``WENXIAN_SOURCES`` environment variable, or all sources.
+    """
+    return _SELECTED.get()
+
+
+@contextmanager
+def select_sources(sources: str | Iterable[str] | None) -> Iterator[tuple[str, ...]]:
+    """Select the sources of lookups made in this context.
+
+    Parameters
+    ----------
+    sources : str or Iterable[str] or None
+        A profile name or source names, or None for all sources.
+
+    Yields
+    ------
+    tuple[str, ...]
+        The selected sources, in priority order.
+    """
+    selected = SOURCES if sources is None else parse_sources(sources)
+    token = _SELECTED.set(selected)
+    try:
+        yield selected
+    finally:
+        _SELECTED.reset(token)
+
+
+def prioritize(fetches: Iterable[T]) -> tuple[T, ...]:
+    """Keep the fetches of selected sources, ordered by their priority.
+
+    Parameters
+    ----------
+    fetches : Iterable[tuple]
+        Fetches whose first item is a source name.
+
+    Returns
+    -------
+    tuple
+        The fetches of :func:`selected_sources`, in their order.
+    """
+    priority = {source: index for index, source in enumerate(selected_sources())}
+    return tuple(
+        sorted(
+            (fetch for fetch in fetches if fetch[0] in priority),
+            key=lambda fetch: priority[fetch[0]],
+        )
+    )
+
+
+__all__ = [
+    "PROFILES",
+    "SOURCES",
+    "parse_sources",
+    "prioritize",
+    "select_sources",
+    "selected_sources",
+]
@@ -0,0 +1,15 @@
+"""Offline stand-ins for the metadata services.
+
+:class:`Corpus` renders synthetic records in the response layout of every
+feeder endpoint, and :class:`MockServer` serves such a table over loopback
+HTTP with injected latency, slow tails and per-client rate limits. Point the
+shared session at a server with :meth:`MockServer.install` or the
+``WENXIAN_BASE_URL`` environment variable.
+"""
+
+from __future__ import annotations
+
+from wenxian.testing.corpus import KINDS, Corpus, Responses, request_key
+from wenxian.testing.server import Conditions, MockServer
+
+__all__ = ["KINDS", "Conditions", "Corpus", "MockServer", "Responses", "request_key"]
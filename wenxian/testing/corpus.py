@@ -0,0 +1,361 @@
+"""Synthetic records answered in the layout of each metadata service."""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+from typing import TYPE_CHECKING, Protocol
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit
+from xml.sax.saxutils import escape
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from wenxian.reference import Reference
+
+IGNORED_PARAMS = frozenset({"email", "mailto", "tool"})
+"""Query parameters that identify the client rather than the request."""
+
+KINDS = ("doi", "pmid", "arxiv", "title")
+"""Identifier kinds a corpus can generate."""
+
+
+def request_key(url: str) -> str:
+    """Return the lookup key of a request URL.
+
+    The scheme and client-identifying parameters are dropped and the
+    remaining query parameters are sorted, so that equivalent requests share
+    a key.
+    """
+    parts = urlsplit(url)
+    query = sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name not in IGNORED_PARAMS
+    )
+    key = f"{parts.netloc}{unquote(parts.path)}"
+    return f"{key}?{urlencode(query)}" if query else key
+
+
+class Responses(Protocol):
+    """A response table keyed by :func:`request_key`."""
+
+    def get(self, key: str, /) -> tuple[int, bytes] | None:
+        """Return the status and body for a key, or None if it is unknown."""
+
+
+def render_pubmed_article(pmid: int, reference: Reference) -> str:
+    """Render a reference as an efetch ``PubmedArticle`` element.
+
+    MeSH headings and a reference list are included so that documents have
+    the size of real records.
+    """
+    authors = "".join(
+        f"<Author ValidYN='Y'><LastName>{escape(author.last or '')}</LastName>"
+        f"<ForeName>{escape(author.first or '')}</ForeName>"
+        "<AffiliationInfo><Affiliation>Example University</Affiliation>"
+        "</AffiliationInfo></Author>"
+        for author in reference.author or ()
+    )
+    pages = "-".join(str(page) for page in reference.pages or ())
+    return (
+        f"<PubmedArticle><MedlineCitation Status='MEDLINE' Owner='NLM'>"
+        f"<PMID Version='1'>{pmid}</PMID><Article PubModel='Print'>"
+        f"<Journal><JournalIssue CitedMedium='Internet'>"
+        f"<Volume>{reference.volume}</Volume><Issue>{reference.issue}</Issue>"
+        f"<PubDate><Year>{reference.year}</Year></PubDate></JournalIssue>"
+        f"<Title>{escape(reference.journal or '')}</Title></Journal>"
+        f"<ArticleTitle>{escape(reference.title or '')}.</ArticleTitle>"
+        f"<Pagination><MedlinePgn>{pages}</MedlinePgn></Pagination>"
+        f"<ELocationID EIdType='doi' ValidYN='Y'>{reference.doi}</ELocationID>"
+        f"<Abstract><AbstractText>{escape(reference.annote or '')}</AbstractText>"
+        f"</Abstract><AuthorList CompleteYN='Y'>{authors}</AuthorList>"
+        "<Language>eng</Language></Article>"
+        "<MeshHeadingList>"
+        + "<MeshHeading><DescriptorName>Models, Molecular</DescriptorName>"
+        "</MeshHeading>"
+        * 10
+        + "</MeshHeadingList></MedlineCitation><PubmedData><ArticleIdList>"
+        f"<ArticleId IdType='pubmed'>{pmid}</ArticleId>"
+        f"<ArticleId IdType='doi'>{reference.doi}</ArticleId></ArticleIdList>"
+        "<ReferenceList>" + "<Reference><Citation>Cited work.</Citation><ArticleIdList>"
+        "<ArticleId IdType='doi'>10.1000/cited</ArticleId></ArticleIdList>"
+        "</Reference>" * 40 + "</ReferenceList></PubmedData></PubmedArticle>"
+    )
+
+
+def render_atom_entry(arxiv: str, reference: Reference) -> str:
+    """Render a reference as an arXiv export API Atom ``entry`` element."""
+    authors = "".join(
+        f"<author><name>{escape(f'{author.first} {author.last}')}</name></author>"
+        for author in reference.author or ()
+    )
+    return (
+        f"<entry><id>http://arxiv.org/abs/{arxiv}v1</id>"
+        f"<updated>{reference.year}-01-01T00:00:00Z</updated>"
+        f"<published>{reference.year}-01-01T00:00:00Z</published>"
+        f"<title>{escape(reference.title or '')}</title>"
+        f"<summary>{escape(reference.annote or '')}</summary>{authors}"
+        "<arxiv:primary_category term='physics.comp-ph'/>"
+        "<category term='physics.comp-ph'/></entry>"
+    )
+
+
+def _atom_feed(entries: list[str]) -> str:
+    """Wrap Atom entries in an arXiv export API feed."""
+    return (
+        "<?xml version='1.0' encoding='UTF-8'?>"
+        "<feed xmlns='http://www.w3.org/2005/Atom'"
+        " xmlns:arxiv='http://arxiv.org/schemas/atom'"
+        " xmlns:opensearch='http://a9.com/-/spec/opensearch/1.1/'>"
+        "<title>arXiv Query</title><id>http://arxiv.org/api/query</id>"
+        f"<opensearch:totalResults>{len(entries)}</opensearch:totalResults>"
+        f"{''.join(entries)}</feed>"
+    )
+
+
+def render_atom_feed(arxiv: str, reference: Reference) -> str:
+    """Render a reference as an arXiv export API Atom feed."""
+    return _atom_feed([render_atom_entry(arxiv, reference)])
+
+
+def _json(data: object) -> tuple[int, bytes]:
+    """Return a successful JSON response."""
+    return 200, json.dumps(data).encode()
+
+
+class Corpus:
+    """Synthetic records answered in the layout of each metadata service.
+
+    Record ``i`` copies template ``i % len(templates)`` with a unique title
+    and the identifiers ``10.5555/wenxian.<i>``, PMID ``40000000 + i`` and
+    arXiv ``2401.<i>``. Responses are rendered on demand, so a corpus of any
+    size costs no memory beyond its title index.
+
+    Parameters
+    ----------
+    templates : Sequence[Reference]
+        Journal-article references to copy.
+    size : int
+        The number of records.
+    """
+
+    PMID_OFFSET = 40_000_000
+    DOI_PREFIX = "10.5555/wenxian."
+    ARXIV_PREFIX = "2401."
+
+    def __init__(self, templates: Sequence[Reference], size: int):
+        if not templates:
+            raise ValueError("A corpus needs at least one template reference")
+        self.templates = list(templates)
+        self.size = size
+        self._titles = {self.title(i): i for i in range(size)}
+
+    def title(self, index: int) -> str:
+        """Return the unique title of a record."""
+        template = self.templates[index % len(self.templates)]
+        return f"{template.title} {index}"
+
+    def reference(self, index: int) -> Reference:
+        """Return the reference of a record."""
+        return dataclasses.replace(
+            self.templates[index % len(self.templates)],
+            title=self.title(index),
+            doi=f"{self.DOI_PREFIX}{index}",
+        )
+
+    def identifiers(self, kind: str, count: int) -> list[str]:
+        """Return identifiers of one kind for the first ``count`` records."""
+        if count > self.size:
+            raise ValueError(f"The corpus only has {self.size} records")
+        if kind == "doi":
+            return [f"{self.DOI_PREFIX}{i}" for i in range(count)]
+        if kind == "pmid":
+            return [str(self.PMID_OFFSET + i) for i in range(count)]
+        if kind == "arxiv":
+            return [f"{self.ARXIV_PREFIX}{i:05d}" for i in range(count)]
+        if kind == "title":
+            return [self.title(i) for i in range(count)]
+        raise ValueError(f"Unknown identifier kind: {kind}")
+
+    def _index(self, kind: str, identifier: str) -> int | None:
+        """Return the record of an identifier, if it is in the corpus."""
+        if kind == "title":
+            return self._titles.get(identifier)
+        prefix = {"doi": self.DOI_PREFIX, "arxiv": self.ARXIV_PREFIX}.get(kind, "")
+        if not identifier.lower().startswith(prefix.lower()):
+            return None
+        try:
+            index = int(identifier[len(prefix) :])
+        except ValueError:
+            return None
+        if kind == "pmid":
+            index -= self.PMID_OFFSET
+        return index if 0 <= index < self.size else None
+
+    def _crossref_work(self, index: int) -> dict:
+        """Render a Crossref work."""
+        reference = self.reference(index)
+        return {
+            "DOI": reference.doi,
+            "title": [reference.title],
+            "author": [
+                {"given": author.first, "family": author.last}
+                for author in reference.author or ()
+            ],
+            "container-title": [reference.journal],
+            "volume": str(reference.volume),
+            "issue": str(reference.issue),
+            "page": "-".join(str(page) for page in reference.pages or ()),
+            "published-print": {"date-parts": [[reference.year]]},
+            "abstract": reference.annote,
+            "type": "journal-article",
+        }
+
+    def _semanticscholar_paper(self, index: int) -> dict:
+        """Render a Semantic Scholar paper."""
+        reference = self.reference(index)
+        return {
+            "title": reference.title,
+            "year": reference.year,
+            "abstract": reference.annote,
+            "authors": [
+                {"name": f"{author.first} {author.last}"}
+                for author in reference.author or ()
+            ],
+            "journal": {"name": reference.journal},
+            "externalIds": {
+                "DOI": reference.doi,
+                "PubMed": str(self.PMID_OFFSET + index),
+            },
+        }
+
+    def _datacite_doi(self, index: int, arxiv: str) -> dict:
+        """Render the DataCite record of an arXiv preprint."""
+        reference = self.reference(index)
+        return {
+            "data": {
+                "attributes": {
+                    "doi": f"10.48550/arXiv.{arxiv}",
+                    "creators": [
+                        {"givenName": author.first, "familyName": author.last}
+                        for author in reference.author or ()
+                    ],
+                    "titles": [{"title": reference.title}],
+                    "publisher": "arXiv",
+                    "publicationYear": reference.year,
+                    "descriptions": [
+                        {"description": reference.annote, "descriptionType": "Abstract"}
+                    ],
+                    "types": {"bibtex": "misc"},
+                }
+            }
+        }
+
+    def _europepmc_result(self, index: int) -> dict:
+        """Render a Europe PMC core search result."""
+        reference = self.reference(index)
+        return {
+            "title": reference.title,
+            "doi": reference.doi,
+            "pubYear": str(reference.year),
+            "pageInfo": "-".join(str(page) for page in reference.pages or ()),
+            "abstractText": reference.annote,
+            "authorList": {
+                "author": [
+                    {"firstName": author.first, "lastName": author.last}
+                    for author in reference.author or ()
+                ]
+            },
+            "journalInfo": {
+                "volume": str(reference.volume),
+                "issue": str(reference.issue),
+                "journal": {"title": reference.journal},
+            },
+        }
+
+    def get(self, key: str) -> tuple[int, bytes] | None:
+        """Render the response to a request key, or None if it is unknown."""
+        location, _, query = key.partition("?")
+        params = dict(parse_qsl(query))
+        host, _, path = location.partition("/")
+        path = f"/{path}"
+        if host == "api.crossref.org" and path == "/works":
+            if "filter" in params:
+                index = self._index("doi", params["filter"].removeprefix("doi:"))
+                items = [self._crossref_work(index)] if index is not None else []
+            else:
+                index = self._index("title", params.get("query.title", ""))
+                items = (
+                    [{"DOI": f"{self.DOI_PREFIX}{index}", "title": [self.title(index)]}]
+                    if index is not None
+                    else []
+                )
+            return _json({"message": {"items": items}})
+        if host == "www.ncbi.nlm.nih.gov" and path.endswith("/idconv/v1.0/"):
+            index = self._index("doi", params.get("ids", ""))
+            if index is None:
+                return _json({"status": "error", "records": []})
+            pmid = str(self.PMID_OFFSET + index)
+            record = {"doi": params["ids"], "pmid": pmid, "pmcid": f"PMC{pmid}"}
+            return _json({"status": "ok", "records": [record]})
+        if host == "eutils.ncbi.nlm.nih.gov" and path.endswith("/esearch.fcgi"):
+            index = self._index("doi", params.get("term", ""))
+            idlist = [str(self.PMID_OFFSET + index)] if index is not None else []
+            return _json({"esearchresult": {"idlist": idlist}})
+        if host == "eutils.ncbi.nlm.nih.gov" and path.endswith("/efetch.fcgi"):
+            articles = "".join(
+                render_pubmed_article(self.PMID_OFFSET + index, self.reference(index))
+                for pmid in params.get("id", "").split(",")
+                if (index := self._index("pmid", pmid)) is not None
+            )
+            return 200, f"<PubmedArticleSet>{articles}</PubmedArticleSet>".encode()
+        if host == "export.arxiv.org" and path == "/api/query":
+            entries = [
+                render_atom_entry(arxiv, self.reference(index))
+                for arxiv in params.get("id_list", "").split(",")
+                if (index := self._index("arxiv", arxiv)) is not None
+            ]
+            return 200, _atom_feed(entries).encode()
+        if host == "api.datacite.org" and path.startswith("/dois/10.48550/arXiv."):
+            arxiv = path.removeprefix("/dois/10.48550/arXiv.")
+            index = self._index("arxiv", arxiv)
+            if index is not None:
+                return _json(self._datacite_doi(index, arxiv))
+        if host == "www.ebi.ac.uk" and path.endswith("/rest/search"):
+            pmid = params.get("query", "").removeprefix("EXT_ID:").split(" ")[0]
+            index = self._index("pmid", pmid)
+            results = [self._europepmc_result(index)] if index is not None else []
+            return _json({"resultList": {"result": results}})
+        if host == "api.semanticscholar.org" and path == "/graph/v1/paper/search":
+            index = self._index("title", params.get("query", ""))
+            data = (
+                [
+                    {
+                        "title": self.title(index),
+                        "externalIds": {"DOI": f"{self.DOI_PREFIX}{index}"},
+                    }
+                ]
+                if index is not None
+                else []
+            )
+            return _json({"data": data})
+        if host == "api.semanticscholar.org" and path.startswith("/graph/v1/paper/"):
+            identifier = path.removeprefix("/graph/v1/paper/")
+            kind, _, value = identifier.rpartition(":")
+            kind = {"PMID": "pmid", "ARXIV": "arxiv"}.get(kind, "doi")
+            index = self._index(kind, value if kind != "doi" else identifier)
+            if index is not None:
+                return _json(self._semanticscholar_paper(index))
+        return None
+
+
+__all__ = [
+    "KINDS",
+    "Corpus",
+    "Responses",
+    "render_atom_entry",
+    "render_atom_feed",
+    "render_pubmed_article",
+    "request_key",
+]
@@ -0,0 +1,228 @@
+"""Loopback HTTP stand-in for the metadata services."""
+
+from __future__ import annotations
+
+import math
+import random
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING
+
+from wenxian.testing.corpus import request_key
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from wenxian.testing.corpus import Responses
+
+
+@dataclass
+class Conditions:
+    """Service behaviour injected into every response.
+
+    Parameters
+    ----------
+    latency : float, default=0.0
+        Median response time in seconds.
+    jitter : float, default=0.0
+        Spread of the log-normal response time. Larger values give slower
+        tails; 0 makes every response take ``latency``.
+    rate_limits : dict[str, float]
+        Requests per second that each service host accepts from one client.
+        Requests over the limit within a one-second window are answered with
+        429 and a ``Retry-After`` header.
+    retry_after : int, default=1
+        Seconds announced in ``Retry-After``.
+    seed : int, default=0
+        Seed of the latency sampler.
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    rate_limits: dict[str, float] = field(default_factory=dict)
+    retry_after: int = 1
+    seed: int = 0
+    statuses: Counter[int] = field(default_factory=Counter)
+    """Number of responses sent with each status."""
+
+    def __post_init__(self) -> None:
+        """Initialize the shared sampler and rate-limit windows."""
+        self._lock = threading.Lock()
+        self._random = random.Random(self.seed)
+        self._windows: dict[tuple[str, str], deque[float]] = {}
+
+    def delay(self) -> float:
+        """Sample a response time in seconds."""
+        if self.latency <= 0:
+            return 0.0
+        if self.jitter <= 0:
+            return self.latency
+        with self._lock:
+            return self._random.lognormvariate(math.log(self.latency), self.jitter)
+
+    def throttled(self, client: str, host: str) -> bool:
+        """Count a request against a per-client host limit.
+
+        Returns
+        -------
+        bool
+            Whether the request is over the limit.
+        """
+        limit = self.rate_limits.get(host)
+        if limit is None:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.setdefault((client, host), deque())
+            while window and window[0] <= now - 1:
+                window.popleft()
+            if len(window) >= limit:
+                return True
+            window.append(now)
+            return False
+
+    def respond(
+        self, responses: Responses, client: str, url: str
+    ) -> tuple[int, bytes, dict[str, str]]:
+        """Wait for the sampled latency and answer one request.
+
+        Parameters
+        ----------
+        responses : Responses
+            The response table. Unknown requests are answered with 404.
+        client : str
+            The client address rate limits are counted against.
+        url : str
+            The original service URL.
+
+        Returns
+        -------
+        tuple[int, bytes, dict[str, str]]
+            The status, body and extra headers.
+        """
+        time.sleep(self.delay())
+        key = request_key(url)
+        headers = {}
+        if self.throttled(client, key.partition("/")[0]):
+            status, body = 429, b""
+            headers["Retry-After"] = str(self.retry_after)
+        else:
+            status, body = responses.get(key) or (404, b"")
+        with self._lock:
+            self.statuses[status] += 1
+        return status, body, headers
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Answer ``/<service host>/<path>`` requests from the server's table."""
+
+    protocol_version = "HTTP/1.1"
+    server: _Server
+
+    def do_GET(self):
+        """Answer a GET request for the service URL encoded in the path."""
+        status, body, headers = self.server.conditions.respond(
+            self.server.responses, self.client_address[0], f"https:/{self.path}"
+        )
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Do not log requests."""
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, responses: Responses, conditions: Conditions):
+        super().__init__(address, _Handler)
+        self.responses = responses
+        self.conditions = conditions
+
+
+class MockServer:
+    """Serve a response table over loopback HTTP.
+
+    A service URL ``https://<host>/<path>`` is served at
+    ``<url>/<host>/<path>``, which is where the shared session sends its
+    requests after :func:`wenxian.feeder.session.set_base_url`.
+
+    Parameters
+    ----------
+    responses : Responses
+        The response table, e.g. a :class:`wenxian.testing.Corpus`.
+    conditions : Conditions, optional
+        Injected latency and rate limits.
+    host : str, default="127.0.0.1"
+        The address to listen on.
+    port : int, default=0
+        The port to listen on; 0 picks a free port.
+
+    Examples
+    --------
+    >>> with MockServer(corpus).install():  # doctest: +SKIP
+    ...     reference = from_identifier("10.5555/wenxian.0")
+    """
+
+    def __init__(
+        self,
+        responses: Responses,
+        conditions: Conditions | None = None,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.conditions = conditions if conditions is not None else Conditions()
+        self._host = host
+        self._server = _Server((host, port), responses, self.conditions)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """The base URL of the server."""
+        return f"http://{self._host}:{self._server.server_port}"
+
+    def start(self) -> None:
+        """Start serving in a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving and close the listening socket."""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> MockServer:
+        """Start serving."""
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Stop serving."""
+        self.stop()
+
+    @contextmanager
+    def install(self) -> Iterator[MockServer]:
+        """Serve and route the shared session to this server."""
+        from wenxian.feeder import session
+
+        previous = session.BASE_URL
+        with self:
+            session.set_base_url(self.url)
+            try:
+                yield self
+            finally:
+                session.set_base_url(previous)
+
+
+__all__ = ["Conditions", "MockServer"]
@@ -0,0 +1,201 @@
+"""Inverted title index for offline title resolution.
+
+The index lives next to the mirrored records in the mirror database. Each
+title gets a dense integer id, and every token maps to the ascending list of
+ids whose titles contain it. Posting lists are stored as varint-encoded
+deltas, so common tokens stay compact and new titles are appended without
+rewriting existing lists.
+"""
+
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+from typing import TYPE_CHECKING
+
+from wenxian.mirror import connect, reader
+from wenxian.serialization import loads
+from wenxian.similarity import normalize_title
+
+if TYPE_CHECKING:
+    import os
+    import sqlite3
+    from collections.abc import Iterable
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS titles (
+    id INTEGER PRIMARY KEY,
+    doi TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    token TEXT PRIMARY KEY,
+    count INTEGER NOT NULL,
+    last INTEGER NOT NULL,
+    data BLOB NOT NULL
+) WITHOUT ROWID;
+"""
+_STOPWORDS = frozenset(
+    "a an and are as at by for from in into is of on or the to with".split()
+)
+_FLUSH_SIZE = 100_000
+_RAREST_TOKENS = 4
+"""Number of rarest query tokens whose postings are read to find candidates."""
+
+
+def tokenize(title: str) -> list[str]:
+    """Split a title into distinct, case- and accent-folded index tokens."""
+    return list(
+        dict.fromkeys(
+            token for token in normalize_title(title).split() if token not in _STOPWORDS
+        )
+    )
+
+
+def _encode(ids: Iterable[int], previous: int) -> bytes:
+    """Encode ascending ids as varint deltas from ``previous``."""
+    out = bytearray()
+    for doc_id in ids:
+        delta = doc_id - previous
+        previous = doc_id
+        while delta >= 0x80:
+            out.append((delta & 0x7F) | 0x80)
+            delta >>= 7
+        out.append(delta)
+    return bytes(out)
+
+
+def _decode(data: bytes) -> list[int]:
+    """Decode varint deltas produced by :func:`_encode` starting from zero."""
+    ids = []
+    doc_id = delta = shift = 0
+    for byte in data:
+        delta |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        doc_id += delta
+        ids.append(doc_id)
+        delta = shift = 0
+    return ids
+
+
+def _flush(connection: sqlite3.Connection, postings: dict[str, list[int]]) -> None:
+    """Append buffered postings to the stored lists."""
+    for token, ids in postings.items():
+        row = connection.execute(
+            "SELECT count, last, data FROM postings WHERE token = ?", (token,)
+        ).fetchone()
+        count, last, data = row if row is not None else (0, 0, b"")
+        connection.execute(
+            "INSERT OR REPLACE INTO postings VALUES (?, ?, ?, ?)",
+            (token, count + len(ids), ids[-1], data + _encode(ids, last)),
+        )
+    postings.clear()
+
+
+def index_titles(database: str | os.PathLike) -> int:
+    """Index the titles of mirrored DOI records that are not indexed yet.
+
+    Parameters
+    ----------
+    database : str or os.PathLike
+        Path to a mirror database built by :func:`wenxian.mirror.build`.
+
+    Returns
+    -------
+    int
+        The number of newly indexed titles.
+    """
+    connection = connect(database)
+    snapshot = connect(database)
+    try:
+        connection.executescript(_SCHEMA)
+        next_id = connection.execute(
+            "SELECT COALESCE(MAX(id), 0) + 1 FROM titles"
+        ).fetchone()[0]
+        first_id = next_id
+        postings: dict[str, list[int]] = defaultdict(list)
+        # a separate connection reads a stable snapshot while titles are written
+        pending = snapshot.execute(
+            "SELECT key, data FROM records WHERE kind = 'doi'"
+            " AND key NOT IN (SELECT doi FROM titles) ORDER BY key, source"
+        )
+        with connection:
+            previous = None
+            for doi, data in pending:
+                if doi == previous:
+                    continue
+                title = loads(data).title
+                if not title:
+                    continue
+                previous = doi
+                tokens = tokenize(title)
+                connection.execute(
+                    "INSERT INTO titles VALUES (?, ?, ?, ?)",
+                    (next_id, doi, title, len(tokens)),
+                )
+                for token in tokens:
+                    postings[token].append(next_id)
+                next_id += 1
+                if (next_id - first_id) % _FLUSH_SIZE == 0:
+                    _flush(connection, postings)
+            _flush(connection, postings)
+    finally:
+        snapshot.close()
+        connection.close()
+    return next_id - first_id
+
+
+def search(
+    database: str | os.PathLike, title: str, *, limit: int = 5
+) -> list[tuple[str, str]]:
+    """Find indexed titles sharing the most tokens with a query.
+
+    Only the posting lists of the rarest query tokens are read, so the cost
+    depends on the number of query terms rather than the size of the mirror.
+
+    Parameters
+    ----------
+    database : str or os.PathLike
+        Path to an indexed mirror database.
+    title : str
+        The title to search for.
+    limit : int, default=5
+        Maximum number of candidates to return.
+
+    Returns
+    -------
+    list[tuple[str, str]]
+        ``(doi, title)`` pairs ranked by token overlap with the query.
+    """
+    tokens = tokenize(title)
+    if not tokens:
+        return []
+    connection = reader(database)
+    rows = connection.execute(
+        f"SELECT count, data FROM postings WHERE token IN ({','.join('?' * len(tokens))})"
+        " ORDER BY count LIMIT ?",
+        (*tokens, _RAREST_TOKENS),
+    ).fetchall()
+    matches: Counter[int] = Counter()
+    for _, data in rows:
+        matches.update(_decode(data))
+    if not matches:
+        return []
+    candidates = matches.most_common(limit * 4)
+    found = {
+        doc_id: (doi, candidate, length)
+        for doc_id, doi, candidate, length in connection.execute(
+            f"SELECT id, doi, title, length FROM titles WHERE id IN ({','.join('?' * len(candidates))})",
+            [doc_id for doc_id, _ in candidates],
+        )
+    }
+    ranked = sorted(
+        (doc_id for doc_id, _ in candidates if doc_id in found),
+        key=lambda doc_id: (-matches[doc_id], abs(found[doc_id][2] - len(tokens))),
+    )
+    return [(found[doc_id][0], found[doc_id][1]) for doc_id in ranked[:limit]]
+
+
+__all__ = ["index_titles", "search", "tokenize"]
@@ -0,0 +1,233 @@
+"""Span hooks around the fetch, parse, merge and render stages.
+
+wenxian opens a span around every HTTP request, rate-limiter wait, source
+lookup, response parse, title validation, merge and rendering. Spans are
+dropped unless a tracer is installed with :func:`set_tracer`:
+
+- :class:`ChromeTracer` collects the spans and writes them as Chrome
+  trace-event JSON, which ``chrome://tracing`` and Perfetto display as a
+  timeline. ``wenxian from --trace FILE`` uses it.
+- :class:`OpenTelemetryTracer` forwards the spans to OpenTelemetry, which is
+  an optional dependency.
+
+Any object with a compatible ``span(name, attributes)`` method can be
+installed as well.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Protocol
+
+if TYPE_CHECKING:
+    from contextlib import AbstractContextManager
+    from types import TracebackType
+
+
+class Span(Protocol):
+    """An open span."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach an attribute to the span."""
+
+
+class Tracer(Protocol):
+    """Receiver of wenxian spans."""
+
+    def span(
+        self, name: str, attributes: dict[str, Any]
+    ) -> AbstractContextManager[Span]:
+        """Open a span covering the body of a ``with`` block."""
+
+
+class _NoopSpan:
+    """Span that records nothing."""
+
+    def __enter__(self) -> _NoopSpan:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        pass
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Drop the attribute."""
+
+
+_NOOP_SPAN = _NoopSpan()
+_TRACER: Tracer | None = None
+
+
+def set_tracer(tracer: Tracer | None) -> None:
+    """Install a tracer, or None to drop spans again."""
+    global _TRACER
+    _TRACER = tracer
+
+
+def span(name: str, **attributes: Any) -> AbstractContextManager[Span]:
+    """Open a span with the installed tracer.
+
+    Parameters
+    ----------
+    name : str
+        The stage, e.g. ``http`` or ``merge``.
+    **attributes
+        Attributes of the span.
+
+    Returns
+    -------
+    AbstractContextManager[Span]
+        A context manager yielding the span. Without a tracer, a shared
+        no-op span is returned.
+    """
+    tracer = _TRACER
+    if tracer is None:
+        return _NOOP_SPAN
+    return tracer.span(name, attributes)
+
+
+class _ChromeSpan:
+    """Span recorded as a Chrome complete event."""
+
+    def __init__(self, tracer: ChromeTracer, name: str, attributes: dict[str, Any]):
+        self._tracer = tracer
+        self._name = name
+        self._attributes = attributes
+
+    def __enter__(self) -> _ChromeSpan:
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self._attributes["error"] = exc_type.__name__
+        self._tracer._add(self._name, self._start, end, self._attributes)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach an attribute to the event arguments."""
+        self._attributes[key] = value
+
+
+class ChromeTracer:
+    """Collect spans as Chrome trace events.
+
+    Spans opened inside an asyncio task are placed on a lane of that task,
+    and other spans on a lane of their thread, so concurrent lookups do not
+    overlap on the timeline.
+
+    Examples
+    --------
+    >>> tracer = ChromeTracer()
+    >>> set_tracer(tracer)  # doctest: +SKIP
+    >>> tracer.save("trace.json")  # doctest: +SKIP
+    """
+
+    def __init__(self) -> None:
+        self.events: list[dict[str, Any]] = []
+        self._origin = time.perf_counter_ns()
+        self._lock = threading.Lock()
+        self._lanes: dict[tuple[str, int], int] = {}
+
+    def span(self, name: str, attributes: dict[str, Any]) -> _ChromeSpan:
+        """Open a span recorded when the ``with`` block exits."""
+        return _ChromeSpan(self, name, attributes)
+
+    def _lane(self) -> int:
+        """Return the timeline lane of the current task or thread."""
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        key = (
+            ("task", id(task))
+            if task is not None
+            else ("thread", threading.get_ident())
+        )
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = self._lanes[key] = len(self._lanes) + 1
+            name = (
+                task.get_name() if task is not None else threading.current_thread().name
+            )
+            self.events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": os.getpid(),
+                    "tid": lane,
+                    "args": {"name": name},
+                }
+            )
+        return lane
+
+    def _add(self, name: str, start: int, end: int, attributes: dict[str, Any]) -> None:
+        """Append a complete event."""
+        with self._lock:
+            self.events.append(
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": (start - self._origin) / 1000,
+                    "dur": (end - start) / 1000,
+                    "pid": os.getpid(),
+                    "tid": self._lane(),
+                    "args": attributes,
+                }
+            )
+
+    def save(self, path: str | os.PathLike) -> None:
+        """Write the collected events as Chrome trace-event JSON."""
+        with self._lock:
+            data = {"traceEvents": list(self.events), "displayTimeUnit": "ms"}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, default=str)
+
+
+class OpenTelemetryTracer:
+    """Forward spans to OpenTelemetry.
+
+    Parameters
+    ----------
+    tracer : opentelemetry.trace.Tracer, optional
+        The tracer to use. Defaults to the ``wenxian`` tracer of the global
+        tracer provider.
+    """
+
+    def __init__(self, tracer: Any = None):
+        if tracer is None:
+            from opentelemetry import trace  # type: ignore[import-not-found]
+
+            tracer = trace.get_tracer("wenxian")
+        self._tracer = tracer
+
+    def span(
+        self, name: str, attributes: dict[str, Any]
+    ) -> AbstractContextManager[Span]:
+        """Open an OpenTelemetry span as the current span."""
+        return self._tracer.start_as_current_span(
+            f"wenxian.{name}",
+            attributes={
+                key: value if isinstance(value, (bool, int, float, str)) else str(value)
+                for key, value in attributes.items()
+                if value is not None
+            },
+        )
+
+
+__all__ = [
+    "ChromeTracer",
+    "OpenTelemetryTracer",
+    "Span",
+    "Tracer",
+    "set_tracer",
+    "span",
+]